@@ -3,12 +3,70 @@
 
 # admin.site.register(User)
 
-from django.contrib import admin
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import redirect, render
+from django.urls import path
+
 from .models import User
+from .provisioning import credentials_csv, provision_students, read_rows
+
+
+class StudentCSVForm(forms.Form):
+    csv_file = forms.FileField(
+        label="CSV file",
+        help_text="Columns: username, email, first_name, last_name, password. "
+                  "Rows without a password get a generated one.",
+    )
+
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     list_display = ('username', 'email', 'role', 'is_staff', 'is_active')
     list_filter = ('role', 'is_staff')
+    change_list_template = 'admin/accounts/user/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('upload-csv/', self.admin_site.admin_view(self.upload_csv), name='accounts_user_upload_csv'),
+        ] + super().get_urls()
+
+    def upload_csv(self, request):
+        """
+        Bulk-create students from an uploaded CSV (see accounts/provisioning.py).
+        """
+        if not self.has_add_permission(request):
+            return redirect('admin:accounts_user_changelist')
+
+        form = StudentCSVForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            try:
+                text = io.TextIOWrapper(form.cleaned_data["csv_file"].file, encoding="utf-8-sig")
+                result = provision_students(list(read_rows(text)))
+            except (UnicodeDecodeError, ValueError) as e:
+                form.add_error("csv_file", str(e))
+            else:
+                if result.error:
+                    messages.error(request, result.summary())
+                else:
+                    messages.success(request, result.summary())
+                for line, message in result.invalid[:20]:
+                    messages.warning(request, f"Line {line}: {message}")
 
+                # Generated passwords are only ever shown once, as a download
+                if result.credentials:
+                    response = HttpResponse(credentials_csv(result.credentials), content_type="text/csv")
+                    response["Content-Disposition"] = 'attachment; filename="student-credentials.csv"'
+                    return response
+                return redirect('admin:accounts_user_changelist')
 
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Upload students",
+            "form": form,
+        }
+        return render(request, 'admin/accounts/user/upload_csv.html', context)
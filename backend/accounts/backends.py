@@ -0,0 +1,111 @@
+"""
+Authentication backend that caches the logged-in user in each process.
+
+AuthenticationMiddleware loads request.user through the backend's
+get_user() on every request, one query per authenticated page view or
+API call. CachedModelBackend keeps the user in this process's
+AUTH_LOCAL_CACHE for up to USER_CACHE_TIMEOUT seconds, stamped with the
+user's auth epoch.
+
+The epoch is a random token in the shared USER_CACHE, replaced whenever
+the user is saved or deleted (including the last_login update on login,
+password changes and deactivation) and whenever one of their sessions is
+saved or ended (accounts/sessions.py). A copy stamped with an older
+epoch is ignored, so a change made by one worker takes effect in all of
+them on their next request. Checking costs one shared-cache read per
+request, and the session store's check of the same epoch is reused here
+(accounts/middleware.py), so the session and the user together cost one
+read instead of one each.
+"""
+import contextvars
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+# (user id, epoch) already read from the shared cache by this request
+_known_epoch = contextvars.ContextVar("known_auth_epoch", default=None)
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def auth_epoch_key(user_id):
+    return f"auth:epoch:{user_id}"
+
+
+def _cache():
+    return caches[settings.USER_CACHE]
+
+
+def _local():
+    return caches[settings.AUTH_LOCAL_CACHE]
+
+
+def auth_epoch(user_id):
+    """
+    The user's current epoch, starting one if the shared cache has none.
+    """
+    key = auth_epoch_key(user_id)
+    epoch = _cache().get(key)
+    if epoch is None:
+        _cache().add(key, uuid.uuid4().hex, None)
+        epoch = _cache().get(key)
+    return epoch
+
+
+def bump_auth_epoch(user_id):
+    """
+    Invalidate every process's copies of the user and their sessions.
+    Returns the new epoch.
+    """
+    epoch = uuid.uuid4().hex
+    _cache().set(auth_epoch_key(user_id), epoch, None)
+    return epoch
+
+
+@contextmanager
+def known_auth_epoch(user_id, epoch):
+    """
+    Let get_user() use `epoch` for user_id instead of reading it again.
+    """
+    token = _known_epoch.set(None if user_id is None or epoch is None else (str(user_id), epoch))
+    try:
+        yield
+    finally:
+        _known_epoch.reset(token)
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        known = _known_epoch.get()
+        epoch = known[1] if known is not None and known[0] == str(user_id) else auth_epoch(user_id)
+
+        key = user_cache_key(user_id)
+        cached = _local().get(key)
+        if cached is not None and cached[0] == epoch:
+            return cached[1]
+
+        # The epoch was read first: a change after it bumps it again
+        user = super().get_user(user_id)
+        if user is not None:
+            _local().set(key, (epoch, user), settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    # After the commit, so no worker caches the old row under the new epoch
+    transaction.on_commit(lambda: bump_auth_epoch(instance.pk))
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid="invalidate_cached_user_save")
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid="invalidate_cached_user_delete")
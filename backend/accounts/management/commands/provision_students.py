@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import credentials_csv, provision_students, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create student accounts from a CSV file (username, email, first_name, "
+        "last_name, password), hashing passwords across a process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path", help="CSV file with a header row.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Password hashing processes.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users per INSERT batch.")
+        parser.add_argument(
+            "--credentials",
+            help="Where to write generated passwords (required if any row has no password).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8-sig") as fh:
+                rows = list(read_rows(fh))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if not options["credentials"] and any(not row["password"] for _, row in rows):
+            raise CommandError("Some rows have no password; pass --credentials to write the generated ones.")
+        if options["credentials"] and os.path.exists(options["credentials"]):
+            raise CommandError(f"{options['credentials']} already exists.")
+
+        result = provision_students(rows, workers=options["workers"], batch_size=options["batch_size"])
+
+        for line, message in result.invalid:
+            self.stderr.write(f"line {line}: {message}")
+        if result.credentials:
+            with open(options["credentials"], "x", newline="") as fh:
+                fh.write(credentials_csv(result.credentials))
+            os.chmod(options["credentials"], 0o600)
+            self.stdout.write(f"Wrote {len(result.credentials)} generated passwords to {options['credentials']}")
+
+        if result.error:
+            raise CommandError(result.summary())
+        self.stdout.write(self.style.SUCCESS(result.summary()))
@@ -0,0 +1,27 @@
+"""
+AuthenticationMiddleware whose request.user reuses the auth epoch the
+session was just checked against (accounts/sessions.py), so the session
+and the user cost one shared-cache read together.
+"""
+from django.contrib import auth
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware as BaseAuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from accounts.backends import known_auth_epoch
+
+
+def get_user(request):
+    if not hasattr(request, "_cached_user"):
+        # Loading the session reads the epoch
+        user_id = request.session.get(SESSION_KEY)
+        with known_auth_epoch(user_id, getattr(request.session, "auth_epoch", None)):
+            request._cached_user = auth.get_user(request)
+    return request._cached_user
+
+
+class AuthenticationMiddleware(BaseAuthenticationMiddleware):
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
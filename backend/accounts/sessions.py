@@ -0,0 +1,97 @@
+"""
+Session engine keeping logged-in sessions in each process's memory.
+
+Like cached_db, sessions are written to the database and the shared
+cache (SESSION_CACHE_ALIAS). A process also keeps its own copy of each
+logged-in session in AUTH_LOCAL_CACHE, stamped with the user's auth
+epoch (accounts/backends.py), and serves it for as long as that epoch is
+current. Saving or ending any of the user's sessions, on any worker,
+replaces the epoch, so a logout is seen everywhere on the next request.
+
+The epoch is read before a session is loaded from the shared cache or
+the database, so a copy can be stale only under an epoch that a later
+change has replaced. A process's first request for a session only
+remembers whose it is; it is kept from the second request on.
+
+    SESSION_ENGINE = 'accounts.sessions'
+"""
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.core.cache import caches
+
+from accounts.backends import auth_epoch, bump_auth_epoch
+
+KEY_PREFIX = "accounts.sessions"
+
+
+class SessionStore(CachedDBStore):
+
+    def __init__(self, session_key=None):
+        self._local = caches[settings.AUTH_LOCAL_CACHE]
+        # Epoch the loaded session was checked against, for request.user
+        self.auth_epoch = None
+        super().__init__(session_key)
+
+    def _local_key(self, session_key):
+        return KEY_PREFIX + session_key
+
+    def load(self):
+        key = self._local_key(self.session_key) if self.session_key else None
+        local = self._local.get(key) if key else None
+
+        self.auth_epoch = None
+        if local is not None:
+            user_id, epoch, data = local
+            self.auth_epoch = auth_epoch(user_id)
+            if epoch == self.auth_epoch:
+                return data
+
+        data = super().load()
+        user_id = data.get(SESSION_KEY)
+        if key is None or user_id is None:
+            self.auth_epoch = None
+            return data
+
+        timeout = self.get_expiry_age(expiry=data.get("_session_expiry"))
+        if local is not None and local[0] == user_id:
+            self._local.set(key, (user_id, self.auth_epoch, data), timeout)
+        else:
+            # Epoch not read before this load: remember only whose it is
+            self.auth_epoch = None
+            self._local.set(key, (user_id, None, None), timeout)
+        return data
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        data = self._get_session(no_load=must_create)
+        user_id = data.get(SESSION_KEY)
+        if user_id is not None:
+            self.auth_epoch = bump_auth_epoch(user_id)
+            self._local.set(
+                self._local_key(self.session_key), (user_id, self.auth_epoch, data),
+                self.get_expiry_age(),
+            )
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        local = self._local.get(self._local_key(session_key))
+        user_id = local[0] if local is not None else None
+        if user_id is None and session_key == self.session_key:
+            user_id = getattr(self, "_session_cache", {}).get(SESSION_KEY)
+
+        super().delete(session_key)
+        self._local.delete(self._local_key(session_key))
+        if user_id is not None:
+            bump_auth_epoch(user_id)
+
+    def flush(self):
+        # clear() forgets whose session it was before delete() runs
+        user_id = self.get(SESSION_KEY)
+        super().flush()
+        if user_id is not None:
+            bump_auth_epoch(user_id)
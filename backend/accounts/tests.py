@@ -1,3 +1,209 @@
-from django.test import TestCase
+import copy
+import io
+import os
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import check_password
+from django.core.cache.backends import locmem
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.db.models.query import QuerySet
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.provisioning import hash_passwords, provision_students, read_rows
+
+
+class OtherProcess:
+    """
+    Runs code as another worker process would: on its own thread (so with
+    its own cache and database connections) and with its own local-memory
+    caches, which persist from one run() to the next.
+    """
+
+    def __init__(self):
+        self.memory = ({}, {}, {})
+
+    def run(self, func):
+        result = {}
+
+        def target():
+            saved = (locmem._caches, locmem._expire_info, locmem._locks)
+            locmem._caches, locmem._expire_info, locmem._locks = self.memory
+            try:
+                result["value"] = func()
+            except Exception as e:
+                result["error"] = e
+            finally:
+                locmem._caches, locmem._expire_info, locmem._locks = saved
+                connections.close_all()
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+
+
+# Pages link plain static names without a collectstatic manifest
+@override_settings(STORAGES={
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class CrossProcessAuthTest(TransactionTestCase):
+    """
+    Sessions and the cached user are read by every worker; ending or
+    changing them in one must take effect in the others.
+    """
+    page = "/assessments/history/"
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client = Client()
+        self.client.force_login(self.user)
+        # The browser's session cookie, as sent to the other worker
+        self.cookies = copy.deepcopy(self.client.cookies)
+        self.other = OtherProcess()
+
+    def get_in_other_process(self, count_queries=False):
+        def get():
+            client = Client()
+            client.cookies = copy.deepcopy(self.cookies)
+            with CaptureQueriesContext(connection) as ctx:
+                status = client.get(self.page).status_code
+            return (status, ctx.captured_queries) if count_queries else status
+
+        return self.other.run(get)
+
+    def warm_other_process(self):
+        # The second request keeps the session and the user in its memory
+        self.assertEqual(self.get_in_other_process(), 200)
+        self.assertEqual(self.get_in_other_process(), 200)
+
+    def test_warm_request_reads_only_the_auth_epoch(self):
+        self.warm_other_process()
+
+        status, queries = self.get_in_other_process(count_queries=True)
+        self.assertEqual(status, 200)
+        tables = ["django_session", get_user_model()._meta.db_table, settings.CACHES["shared"]["LOCATION"]]
+        auth = [q["sql"] for q in queries if any(table in q["sql"] for table in tables)]
+        self.assertEqual(len(auth), 1, auth)
+
+    def test_logout_ends_session_in_other_process(self):
+        self.warm_other_process()
+
+        self.client.get("/auth/logout/")
+
+        self.assertEqual(self.get_in_other_process(), 302)
+
+    def test_deactivated_user_is_logged_out_in_other_process(self):
+        self.warm_other_process()
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get_in_other_process(), 302)
+
+
+STRONG_PASSWORD = "correct-horse-battery-9"
+
+
+def csv_rows(text):
+    return list(read_rows(io.StringIO(text)))
+
+
+class ProvisioningTest(TestCase):
+
+    def setUp(self):
+        get_user_model().objects.create_user("taken", password=STRONG_PASSWORD, role="student")
+
+    def test_creates_new_students_and_reports_the_rest(self):
+        rows = csv_rows(
+            "Username,Email,Password\n"
+            f"alice,alice@example.com,{STRONG_PASSWORD}\n"
+            "bob,,\n"
+            "taken,,\n"
+            "bad name!,,\n"
+            "carol,not-an-email,\n"
+            "dave,,123\n"
+            "bob,,\n"
+            ",,\n"
+        )
+        result = provision_students(rows, workers=1)
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.existing, ["taken"])
+        self.assertEqual([line for line, _ in result.invalid], [5, 6, 7, 8, 9])
+        self.assertEqual([username for username, _ in result.credentials], ["bob"])
+
+        self.assertIsNotNone(authenticate(username="alice", password=STRONG_PASSWORD))
+        bob = authenticate(username="bob", password=result.credentials[0][1])
+        self.assertIsNotNone(bob)
+        self.assertEqual((bob.role, bob.is_staff), ("student", False))
+
+    def test_header_needs_a_username_column(self):
+        with self.assertRaises(ValueError):
+            csv_rows("email\nalice@example.com\n")
+
+    def test_username_taken_meanwhile_is_skipped_without_credentials(self):
+        rows = csv_rows("username\ntaken\nerin\n")
+        # Not seen by the lookup: created by someone else before the insert
+        with mock.patch("accounts.provisioning.existing_usernames", return_value=set()):
+            result = provision_students(rows, workers=1)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.existing, ["taken"])
+        self.assertEqual([username for username, _ in result.credentials], ["erin"])
+        self.assertTrue(check_password(STRONG_PASSWORD, get_user_model().objects.get(username="taken").password))
+
+    def test_database_error_keeps_credentials_of_committed_batches(self):
+        bulk_create = QuerySet.bulk_create
+        calls = []
+
+        def failing_second_batch(queryset, objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        rows = csv_rows("username\nfrank\ngrace\nheidi\n")
+        with mock.patch.object(QuerySet, "bulk_create", failing_second_batch):
+            result = provision_students(rows, workers=1, batch_size=1)
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.error, "disk full")
+        self.assertEqual([username for username, _ in result.credentials], ["frank"])
+        self.assertTrue(get_user_model().objects.filter(username="frank").exists())
+        self.assertFalse(get_user_model().objects.filter(username__in=["grace", "heidi"]).exists())
+
+    def test_command_writes_generated_passwords_privately(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "students.csv")
+            credentials = os.path.join(directory, "credentials.csv")
+            with open(source, "w") as fh:
+                fh.write("username,first_name\nivan,Ivan\njudy,Judy\n")
+
+            call_command("provision_students", source, workers=1, credentials=credentials, stdout=io.StringIO())
+
+            self.assertEqual(os.stat(credentials).st_mode & 0o777, 0o600)
+            with open(credentials) as fh:
+                lines = fh.read().splitlines()
+        self.assertEqual([line.split(",")[0] for line in lines], ["username", "ivan", "judy"])
+        username, password = lines[1].split(",")
+        self.assertIsNotNone(authenticate(username=username, password=password))
+
+
+class PasswordHashingTest(SimpleTestCase):
+
+    def test_process_pool_hashes_match_the_passwords(self):
+        passwords = [f"{STRONG_PASSWORD}-{i}" for i in range(4)]
+        hashes = hash_passwords(passwords, workers=2)
+
+        self.assertEqual(len(set(hashes)), 4)
+        for password, password_hash in zip(passwords, hashes):
+            self.assertTrue(check_password(password, password_hash))
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DigitalAddictionAssessment
+from .models import AssessmentRollup, DigitalAddictionAssessment, Institute, InstituteAlias
 
 
 @admin.register(DigitalAddictionAssessment)
@@ -15,3 +15,48 @@ class AssessmentAdmin(admin.ModelAdmin):
 
     list_filter = ("predicted_risk", "gender")
     search_fields = ("student__username",)
+
+
+@admin.register(AssessmentRollup)
+class AssessmentRollupAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "institute",
+        "month",
+        "gender",
+        "age",
+        "self_rated_da",
+        "count"
+    )
+
+    list_filter = ("month", "gender")
+    search_fields = ("institute__name",)
+
+
+class InstituteAliasInline(admin.TabularInline):
+    model = InstituteAlias
+    extra = 1
+
+
+@admin.register(Institute)
+class InstituteAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "name",
+        "created_at"
+    )
+
+    search_fields = ("name", "aliases__key")
+    inlines = [InstituteAliasInline]
+
+
+@admin.register(InstituteAlias)
+class InstituteAliasAdmin(admin.ModelAdmin):
+
+    list_display = (
+        "key",
+        "institute"
+    )
+
+    search_fields = ("key", "institute__name")
+    autocomplete_fields = ("institute",)
@@ -0,0 +1,275 @@
+"""
+Admission control for the predict endpoint, so that a mass assessment
+session slows down predictions instead of the whole site.
+
+Rate limits are DRF throttles with token buckets kept in the shared
+cache, so they hold across worker processes. A rate "N/period" (the
+predict_user and predict_global scopes in DEFAULT_THROTTLE_RATES) allows
+bursts of N requests and refills one token every period/N seconds:
+
+    PredictUserThrottle     one bucket per user
+    PredictGlobalThrottle   one bucket for the whole site
+
+An empty bucket gets 429 with Retry-After set to when the next token is
+due.
+
+A bucket is updated without locks, with cache.add() (atomic on every
+backend, DatabaseCache included) as a compare-and-swap: each state of
+the bucket is written once, under the next version number, and a
+request whose add() loses to another's reads the newer state and tries
+again, for as long as the bucket has tokens. A head key remembers
+roughly where the versions are up to, so a request reads it, the next
+few versions in one get_many() and, when admitted, writes one add().
+The limits are exact as long as the cache
+keeps its entries: a bucket whose versions were culled starts full
+again.
+
+Load shedding is per process: it looks at this worker only and shares
+no state, so the limits below hold for each worker separately and the
+site as a whole admits up to (workers x PREDICT_SHED_MAX_IN_FLIGHT)
+predictions at once. A request is turned away with 503 and Retry-After
+(PREDICT_SHED_RETRY_AFTER) before any work is done when:
+
+    queue       it waited longer than PREDICT_SHED_QUEUE_SECONDS between
+                the proxy and Django (an X-Request-Start header, as set by
+                nginx with `proxy_set_header X-Request-Start "t=${msec}"`)
+    in_flight   PREDICT_SHED_MAX_IN_FLIGHT predictions are already running
+                in this process (threaded or ASGI workers)
+    p99         the p99 latency of the predictions this process finished
+                in the last PREDICT_SHED_WINDOW_SECONDS is above
+                PREDICT_SHED_P99_SECONDS (once there are
+                PREDICT_SHED_MIN_SAMPLES of them)
+
+The in-flight check and the increment happen under one lock, so
+simultaneous requests can't all get past the last free slot. The p99 is
+recomputed at most every P99_REFRESH_SECONDS rather than on each
+request. The latency window only covers recent predictions, so shedding
+stops by itself once the slow ones age out.
+
+Throttled and shed requests are counted in daras_throttled_requests_total
+and daras_shed_requests_total.
+"""
+import collections
+import math
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.throttling import SimpleRateThrottle
+
+from monitoring.metrics import SHED_REQUESTS, THROTTLED_REQUESTS
+
+# Latencies kept for the p99, however busy the window
+MAX_SAMPLES = 10000
+# Seconds a computed p99 is reused before the window is sorted again
+P99_REFRESH_SECONDS = 1.0
+
+# Bucket versions read per get_many(), and failed add()s in a row, with no
+# other request getting a token meanwhile, before giving up on a bucket
+BUCKET_PROBE = 8
+BUCKET_ATTEMPTS = 5
+
+
+# ================================
+# TOKEN BUCKET RATE LIMITS
+# ================================
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    A SimpleRateThrottle whose rate is a token bucket: num_requests
+    tokens, refilled at num_requests per duration. Bucket states are
+    versioned cache entries, each created once with cache.add().
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        refill = self.num_requests / self.duration      # tokens per second
+        head_key = f"{self.key}:head"
+
+        seen = None
+        stalled = 0
+        while True:
+            version, state = self._latest(head_key)
+            if seen is not None and version <= seen:
+                # The add() failed without another request's succeeding,
+                # e.g. a database error swallowed by the cache backend
+                stalled += 1
+                if stalled >= BUCKET_ATTEMPTS:
+                    break
+            else:
+                stalled = 0
+            seen = version
+            now = self.timer()
+            # A state that expired is a bucket idle for a whole period: full
+            tokens, updated = state or (self.num_requests, now)
+            tokens = min(self.num_requests, tokens + (now - updated) * refill)
+
+            if tokens < 1:
+                self.retry_after = (1 - tokens) / refill
+                THROTTLED_REQUESTS.labels(scope=self.scope).inc()
+                return False
+
+            if self.cache.add(f"{self.key}:{version + 1}", (tokens - 1, now), self.duration):
+                if version + 1 >= self._head + BUCKET_PROBE // 2:
+                    self.cache.set(head_key, version + 1, None)
+                return True
+            # Another request wrote this version first: start from its
+            # state. Each lost race is a token taken, so this ends once
+            # the bucket is empty.
+
+        # The cache keeps refusing the write
+        self.retry_after = 1 / refill
+        THROTTLED_REQUESTS.labels(scope=self.scope).inc()
+        return False
+
+    def _latest(self, head_key):
+        """
+        (version, state) of the newest bucket state, state being None when
+        it has expired.
+        """
+        head = self.cache.get(head_key)
+        if head is None:
+            self.cache.add(head_key, 0, None)
+            head = self.cache.get(head_key, 0)
+        self._head = version = head
+
+        while True:
+            keys = [f"{self.key}:{v}" for v in range(version, version + BUCKET_PROBE + 1)]
+            states = self.cache.get_many(keys)
+            newest = version
+            while f"{self.key}:{newest + 1}" in states:
+                newest += 1
+            if newest < version + BUCKET_PROBE:
+                return newest, states.get(f"{self.key}:{newest}")
+            version = newest
+
+    def wait(self):
+        return self.retry_after
+
+
+class PredictUserThrottle(TokenBucketThrottle):
+    scope = "predict_user"
+
+    def get_cache_key(self, request, view):
+        ident = request.user.pk if request.user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class PredictGlobalThrottle(TokenBucketThrottle):
+    scope = "predict_global"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": "all"}
+
+
+# ================================
+# LOAD SHEDDING
+# ================================
+
+def queue_seconds(request):
+    """
+    How long the request waited between the proxy and Django, from an
+    X-Request-Start header ("t=<seconds>", milliseconds or microseconds
+    since the epoch), or None without one.
+    """
+    header = request.META.get("HTTP_X_REQUEST_START", "")
+    try:
+        started = float(header.removeprefix("t="))
+    except ValueError:
+        return None
+    if started > 1e14:
+        started /= 1e6
+    elif started > 1e11:
+        started /= 1e3
+    return max(time.time() - started, 0.0)
+
+
+class LoadShedder:
+    """
+    In-flight count and recent latencies of one endpoint in this process
+    (not site-wide: every worker has its own).
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.latencies = collections.deque(maxlen=MAX_SAMPLES)    # (finished at, seconds)
+        self._p99 = None
+        self._p99_at = None
+        self._lock = threading.Lock()
+
+    def p99(self):
+        """
+        p99 latency over the window, or None with too few samples.
+        Recomputed at most every P99_REFRESH_SECONDS.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._p99_at is not None and now - self._p99_at < P99_REFRESH_SECONDS:
+                return self._p99
+            cutoff = now - settings.PREDICT_SHED_WINDOW_SECONDS
+            while self.latencies and self.latencies[0][0] < cutoff:
+                self.latencies.popleft()
+            samples = sorted(seconds for _, seconds in self.latencies)
+            self._p99 = None
+            if len(samples) >= settings.PREDICT_SHED_MIN_SAMPLES:
+                self._p99 = samples[math.ceil(0.99 * len(samples)) - 1]
+            self._p99_at = now
+            return self._p99
+
+    def admit(self, request):
+        """
+        Take an in-flight slot for the request, or return the reason to
+        shed it.
+        """
+        waited = queue_seconds(request)
+        if waited is not None and waited > settings.PREDICT_SHED_QUEUE_SECONDS:
+            return "queue"
+        p99 = self.p99()
+        if p99 is not None and p99 > settings.PREDICT_SHED_P99_SECONDS:
+            return "p99"
+        with self._lock:
+            if self.in_flight >= settings.PREDICT_SHED_MAX_IN_FLIGHT:
+                return "in_flight"
+            self.in_flight += 1
+        return None
+
+    def __call__(self, handler):
+        """
+        Decorator for an APIView handler method: shed, or run and time it.
+        """
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            reason = self.admit(request)
+            if reason is not None:
+                SHED_REQUESTS.labels(reason=reason).inc()
+                return Response(
+                    {"detail": "The service is busy; please try again shortly."},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={"Retry-After": str(settings.PREDICT_SHED_RETRY_AFTER)},
+                )
+
+            started = time.monotonic()
+            try:
+                return handler(view, request, *args, **kwargs)
+            finally:
+                finished = time.monotonic()
+                with self._lock:
+                    self.in_flight -= 1
+                    self.latencies.append((finished, finished - started))
+        return wrapper
+
+
+predict_load = LoadShedder()
@@ -1,8 +1,11 @@
 from rest_framework import serializers
-from assessment.models import DigitalAddictionAssessment
+from assessment.models import DigitalAddictionAssessment, StudentRiskPointer
+from assessment.platforms import canonical_platforms, parse_platform
 
 class DigitalAddictionAssessmentSerializer(serializers.ModelSerializer):
     student = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    # Free text in, resolved to an Institute on save
+    institute = serializers.CharField(source="institute_name", max_length=255)
 
     class Meta:
         model = DigitalAddictionAssessment
@@ -85,13 +88,13 @@ class DigitalAddictionAssessmentSerializer(serializers.ModelSerializer):
         return self.validate_choice_field(value, ["None","<30m","30–60m","1–2h",">2h"], "Gaming time")
 
     def validate_platforms(self, value):
-        allowed = {"YouTube","TikTok","Instagram","Facebook","WhatsApp","X/Twitter","Snapchat","Gaming"}
+        # Canonical names or aliases (e.g. "X/Twitter" for "X"); stored canonical
         if not isinstance(value, list):
             raise serializers.ValidationError("Platforms must be a list.")
-        invalid = [p for p in value if p not in allowed]
+        invalid = [p for p in value if parse_platform(p) is None]
         if invalid:
             raise serializers.ValidationError(f"Invalid platforms: {invalid}")
-        return value
+        return canonical_platforms(value)
 
     def validate_self_rated_da(self, value):
         return self.validate_choice_field(value, ["not_at_risk","mild","moderate","severe"], "Self-rated DA")
@@ -120,4 +123,22 @@ class AssessmentHistorySerializer(serializers.ModelSerializer):
             "predicted_risk",
             "risk_confidence",
             "created_at",
-        ]
\ No newline at end of file
+        ]
+
+
+class TriageSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="student.username")
+    institute = serializers.CharField(source="institute.name")
+
+    class Meta:
+        model = StudentRiskPointer
+        fields = [
+            "student",
+            "username",
+            "institute",
+            "assessment",
+            "predicted_risk",
+            "risk_confidence",
+            "das_score",
+            "assessed_at",
+        ]
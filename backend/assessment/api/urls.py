@@ -1,8 +1,9 @@
 from django.urls import path
-from assessment.api.views import PredictAssessmentView, DigitalAddictionAssessmentDetailAPI, AssessmentHistoryAPIView
+from assessment.api.views import PredictAssessmentView, DigitalAddictionAssessmentDetailAPI, AssessmentHistoryAPIView, TriageQueueAPIView
 
 urlpatterns = [
     path("predict/", PredictAssessmentView.as_view(), name="predict-assessment"),
     path("<int:pk>/", DigitalAddictionAssessmentDetailAPI.as_view(), name="assessment-detail"),
     path("api/assessments/history/", AssessmentHistoryAPIView.as_view(), name="assessment-history-api"),
+    path("triage/", TriageQueueAPIView.as_view(), name="triage-queue-api"),
 ]
@@ -6,10 +6,13 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 
 from assessment.models import DigitalAddictionAssessment
+from assessment.api.admission import PredictGlobalThrottle, PredictUserThrottle, predict_load
 from assessment.api.serializers import DigitalAddictionAssessmentSerializer as AssessmentSerializer
+from assessment.scoring import score_assessment
 
-from ml.predictor import predict_risk_with_confidence
-from ml.preprocessing import preprocess_assessment
+from jobs.registry import PRIORITY_HIGH, enqueue
+from ml.shadow import submit_for_shadow_scoring
+from monitoring.metrics import observe_latency
 
 
 class PredictAssessmentView(APIView):
@@ -19,9 +22,15 @@ class PredictAssessmentView(APIView):
       - Save it as a DigitalAddictionAssessment instance
       - Run ML prediction
       - Return risk + confidence
+
+    Rate limited per user and site-wide, and shed with a 503 when this
+    worker is overloaded (see assessment/api/admission.py).
     """
     permission_classes = [IsAuthenticated]
+    throttle_classes = [PredictUserThrottle, PredictGlobalThrottle]
 
+    @observe_latency("predict_assessment")
+    @predict_load
     def post(self, request, format=None):
         print("Incoming data:", request.data)
 
@@ -33,16 +42,10 @@ class PredictAssessmentView(APIView):
         instance = serializer.save(student=request.user)
 
         try:
-            # Preprocess for ML
-            df, _ = preprocess_assessment(instance)
-
-            # Run prediction
-            risk_label, confidence = predict_risk_with_confidence(instance, df=df)
+            risk_label, confidence, df = score_assessment(instance)
 
-            # Save prediction to DB
-            instance.predicted_risk = risk_label
-            instance.risk_confidence = confidence or 0.0
-            instance.save(update_fields=["predicted_risk", "risk_confidence"])
+            # Candidate model (if any) scores the same row off the request path
+            submit_for_shadow_scoring(instance.id, df, risk_label, instance.risk_confidence)
 
             return Response({
                 "id": instance.id,
@@ -53,6 +56,8 @@ class PredictAssessmentView(APIView):
         except Exception as e:
             # Debug log
             print("Prediction error:", e)
+            # Left unscored: a worker retries it with backoff
+            enqueue("assessment.rescore", {"assessment_ids": [instance.id]}, priority=PRIORITY_HIGH)
             return Response({
                 "detail": "Prediction failed.",
                 "error": str(e)
@@ -71,12 +76,13 @@ class DigitalAddictionAssessmentDetailAPI(RetrieveAPIView):
     def get(self, request, *args, **kwargs):
         instance = self.get_object()
 
-        if instance.student != request.user and not request.user.is_staff:
+        if instance.student_id != request.user.id and not request.user.is_staff:
             return Response({"detail": "Not allowed."}, status=status.HTTP_403_FORBIDDEN)
 
         data = self.serializer_class(instance).data
         data["predicted_risk"] = instance.predicted_risk
         data["risk_confidence"] = instance.risk_confidence
+        data["risk_factors"] = instance.risk_factor_rows
 
         return Response(data, status=status.HTTP_200_OK)
     
@@ -92,3 +98,34 @@ class AssessmentHistoryAPIView(ListAPIView):
         return DigitalAddictionAssessment.objects.filter(
             student=request.user
         )
+
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.utils.urls import replace_query_param
+
+from assessment.api.serializers import TriageSerializer
+from assessment.triage import parse_filters, triage_queue
+
+
+class TriageQueueAPIView(APIView):
+    """
+    Staff triage queue: each student's latest assessment, highest DAS
+    score or confidence first, one keyset page at a time.
+
+    Query parameters: risk (repeatable, default Moderate and Severe),
+    institute, since, until, sort (das | confidence), limit, cursor.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        try:
+            filters = parse_filters(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        pointers, cursor = triage_queue(**filters)
+
+        return Response({
+            "results": TriageSerializer(pointers, many=True).data,
+            "next": replace_query_param(request.build_absolute_uri(), "cursor", cursor) if cursor else None,
+        }, status=status.HTTP_200_OK)
@@ -1,5 +1,6 @@
 from django import forms
 from .models import DigitalAddictionAssessment
+from .platforms import PLATFORM_NAMES
 
 
 class AssessmentForm(forms.ModelForm):
@@ -10,15 +11,6 @@ class AssessmentForm(forms.ModelForm):
 
         widgets = {
             "platforms": forms.CheckboxSelectMultiple(
-                choices=[
-                    ("YouTube", "YouTube"),
-                    ("TikTok", "TikTok"),
-                    ("Instagram", "Instagram"),
-                    ("Facebook", "Facebook"),
-                    ("WhatsApp", "WhatsApp"),
-                    ("X", "X"),
-                    ("Snapchat", "Snapchat"),
-                    ("Gaming", "Gaming"),
-                ]
+                choices=[(name, name) for name in PLATFORM_NAMES.values()]
             )
         }
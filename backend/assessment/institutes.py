@@ -0,0 +1,60 @@
+"""
+Matching the institute names students type to Institute rows.
+
+Names are compared by key: casefolded, punctuation dropped and whitespace
+collapsed, so "Test College", "test  college" and "Test College." are one
+institute. Every key seen is an InstituteAlias row; staff can point an
+alias at another institute in the admin (e.g. "tu" -> "Tribhuvan
+University") to merge spellings the key doesn't catch.
+
+Assessments store the resolved institute as a foreign key, so
+institute-level filters and GROUP BYs compare indexed integers rather
+than free text.
+"""
+import re
+
+from django.db import IntegrityError, transaction
+
+from assessment.models import Institute, InstituteAlias
+
+# Institute for blank answers
+UNSPECIFIED = "Unspecified"
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def institute_key(name):
+    key = " ".join(_PUNCTUATION.sub(" ", (name or "").casefold()).split())
+    return key or UNSPECIFIED.casefold()
+
+
+def find_institute(name):
+    """
+    Id of the institute a name resolves to, or None if it is unknown.
+    """
+    return InstituteAlias.objects.filter(key=institute_key(name)).values_list("institute_id", flat=True).first()
+
+
+def resolve_institute(name):
+    """
+    Id of the institute a name resolves to, creating the institute (named
+    as given, tidied up) on first sight.
+    """
+    institute_id = find_institute(name)
+    if institute_id is not None:
+        return institute_id
+
+    canonical = " ".join((name or "").split()) or UNSPECIFIED
+    try:
+        with transaction.atomic():
+            return Institute.objects.create(name=canonical).id
+    except IntegrityError:
+        # Created concurrently, or the name is taken by an institute this
+        # key isn't an alias of yet
+        pass
+
+    institute_id = find_institute(name)
+    if institute_id is None:
+        institute_id = Institute.objects.get(name=canonical).id
+        InstituteAlias.objects.get_or_create(key=institute_key(name), defaults={"institute_id": institute_id})
+    return institute_id
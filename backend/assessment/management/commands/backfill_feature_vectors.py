@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from assessment.models import DigitalAddictionAssessment
+from ml.features import FEATURE_SPEC
+
+
+class Command(BaseCommand):
+    help = (
+        "Store the encoded feature vector on assessments that have none, or "
+        "one written with an older feature spec."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per UPDATE batch.")
+
+    def handle(self, *args, **options):
+        stale = DigitalAddictionAssessment.objects.exclude(feature_spec=FEATURE_SPEC).order_by("id")
+
+        last_id = 0
+        updated = 0
+        while True:
+            batch = list(stale.filter(id__gt=last_id)[:options["batch_size"]])
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for assessment in batch:
+                assessment.encode_features()
+            # bulk_update skips save(), so updated_at keeps meaning "answers changed"
+            DigitalAddictionAssessment.objects.bulk_update(batch, ["feature_vector", "feature_spec"])
+            updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored feature vectors (spec {FEATURE_SPEC}) for {updated} assessments."
+        ))
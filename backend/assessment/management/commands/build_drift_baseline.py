@@ -0,0 +1,41 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.models import DigitalAddictionAssessment
+from ml.drift import MAX_BINS, build_baseline
+from ml.predictor import MODEL_VERSION
+from ml.training import encode_labelled
+
+
+class Command(BaseCommand):
+    help = (
+        "Bin the training assessments' model features and store the histograms "
+        "next to the model artifact as the feature-drift baseline. Rebuild it "
+        "whenever the served model is retrained."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--out", default=str(settings.DRIFT_BASELINE_PATH), help="Baseline file to write.")
+        parser.add_argument("--max-bins", type=int, default=MAX_BINS, help="Bins per numeric feature.")
+
+    def handle(self, *args, **options):
+        # The same rows train_model learns from
+        X, y = encode_labelled(DigitalAddictionAssessment.objects.all())
+        if not len(y):
+            raise CommandError("No labelled assessments to build a baseline from.")
+
+        baseline = build_baseline(X, source_version=MODEL_VERSION, max_bins=options["max_bins"])
+
+        out = options["out"]
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(f"{out}.tmp", "w") as fh:
+            json.dump(baseline, fh, indent=2)
+        os.replace(f"{out}.tmp", out)
+
+        bins = sum(len(f["counts"]) for f in baseline["features"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Drift baseline of {baseline['rows']} assessments ({bins} bins) written to {out}"
+        ))
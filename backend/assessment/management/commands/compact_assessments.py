@@ -0,0 +1,80 @@
+import gzip
+import json
+import os
+
+from django.conf import settings
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from assessment.models import DigitalAddictionAssessment
+from assessment.rollups import compactable, fold, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold assessments older than the retention window into per-institute, "
+        "per-month rollups, archiving the raw rows to gzipped JSON Lines first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, default=settings.ASSESSMENT_RETENTION_MONTHS,
+            help="Whole months of assessments to keep, not counting the current one.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows archived and deleted per transaction.")
+        parser.add_argument(
+            "--archive-dir", default=str(settings.ASSESSMENT_ARCHIVE_DIR),
+            help="Where to write the archive of the compacted rows.",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be compacted.")
+
+    def handle(self, *args, **options):
+        if options["months"] < 1:
+            raise CommandError("--months must be at least 1.")
+
+        cutoff = retention_cutoff(options["months"])
+        candidates = compactable(cutoff).order_by("id")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"{candidates.count()} assessments created before {cutoff:%Y-%m-%d} would be compacted."
+            )
+            return
+        if not candidates.exists():
+            self.stdout.write(f"Nothing created before {cutoff:%Y-%m-%d} to compact.")
+            return
+
+        os.makedirs(options["archive_dir"], exist_ok=True)
+        path = os.path.join(
+            options["archive_dir"],
+            f"assessments-before-{cutoff:%Y-%m}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz",
+        )
+
+        last_id = 0
+        compacted = 0
+        with open(path, "xb") as fh, gzip.GzipFile(fileobj=fh, mode="wb") as archive:
+            while True:
+                batch = list(candidates.filter(id__gt=last_id)[:options["batch_size"]])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                # Rows are on disk before they leave the table; a batch that
+                # fails afterwards is simply archived again by the next run
+                for row in serializers.serialize("python", batch):
+                    archive.write((json.dumps(row, cls=DjangoJSONEncoder) + "\n").encode())
+                archive.flush()
+                fh.flush()
+                os.fsync(fh.fileno())
+
+                with transaction.atomic():
+                    fold(batch)
+                    DigitalAddictionAssessment.objects.filter(id__in=[a.id for a in batch]).delete()
+                compacted += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compacted {compacted} assessments created before {cutoff:%Y-%m-%d}; archived to {path}"
+        ))
@@ -0,0 +1,66 @@
+import joblib
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.artifact import export_linear_model, load_artifact
+from ml.features import COLUMN_INDEX, answer_scale_stats
+from ml.predictor import MODEL_PATH, model_version
+
+
+class Command(BaseCommand):
+    help = "Export the pickled risk model as memory-mappable arrays plus a JSON manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=MODEL_PATH, help="joblib-pickled model to export.")
+        parser.add_argument("--out", default=str(settings.ML_ARTIFACT_DIR), help="Artifact directory to write.")
+
+    def handle(self, *args, **options):
+        model = joblib.load(options["model"])
+        stats = self._training_stats(model)
+
+        try:
+            manifest = export_linear_model(
+                model, options["out"], source_version=model_version(options["model"]),
+                stats=stats, stats_source="answer_scales",
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        # The exported arrays must reproduce the pickled model exactly
+        artifact = load_artifact(options["out"])
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 10, size=(256, len(manifest["feature_names"])))
+        expected = model.predict_proba(X if not hasattr(model, "feature_names_in_") else _frame(X, model))
+        # (equal_nan: one-vs-rest models yield 0/0 where every sigmoid underflows,
+        # for these far-out-of-range inputs, in sklearn and the artifact alike)
+        if not np.allclose(artifact.predict_proba(X), expected, atol=1e-9, equal_nan=True):
+            raise CommandError("Exported artifact does not reproduce the model's probabilities.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {manifest['estimator']} ({manifest['source_version']}) to {options['out']}"
+        ))
+
+    def _training_stats(self, model):
+        """
+        None for a model trained by `manage.py train_model`, which keeps
+        its own training stats (exported as they are). A model trained
+        elsewhere gets the answer-scale stats instead.
+        """
+        if hasattr(model, "feature_mean_"):
+            return None
+        self.stderr.write(self.style.WARNING(
+            "The model has no training stats (feature_mean_); explaining it "
+            "with answer-scale stats. Retrain with train_model to use the training data's."
+        ))
+        mean, std = answer_scale_stats()
+        if hasattr(model, "feature_names_in_"):
+            columns = [COLUMN_INDEX[name] for name in model.feature_names_in_]
+            mean, std = mean[columns], std[columns]
+        return mean, std
+
+
+def _frame(X, model):
+    import pandas as pd
+
+    return pd.DataFrame(X, columns=model.feature_names_in_)
@@ -0,0 +1,63 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ml.incremental import read_state
+from ml.predictor import ACTIVE_MODEL_FILE, BATCH_MODEL_PATH, MODEL_PATH, model_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Choose the model served by ml/predictor.py: a joblib-pickled model, "
+        "the latest incremental checkpoint, or back to the batch model. "
+        "Workers pick it up when they restart."
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument("path", nargs="?", help="joblib-pickled model to serve.")
+        target.add_argument("--incremental", action="store_true", help="Serve the latest incremental checkpoint.")
+        target.add_argument("--batch", action="store_true", help="Serve the batch model again.")
+        parser.add_argument(
+            "--skip-artifact", action="store_true",
+            help="Don't export the memory-mappable artifact for the promoted model.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch"]:
+            path = BATCH_MODEL_PATH
+        elif options["incremental"]:
+            state = read_state(settings.ML_INCREMENTAL_DIR)
+            if not state["checkpoints"]:
+                raise CommandError("No incremental checkpoint yet; run update_incremental_model first.")
+            path = os.path.join(settings.ML_INCREMENTAL_DIR, state["checkpoints"][-1])
+        else:
+            path = os.path.abspath(options["path"])
+
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+
+        if not options["skip_artifact"]:
+            call_command("export_model_artifact", model=path, stdout=self.stdout)
+
+        if os.path.abspath(path) == os.path.abspath(BATCH_MODEL_PATH):
+            if os.path.exists(ACTIVE_MODEL_FILE):
+                os.remove(ACTIVE_MODEL_FILE)
+        else:
+            relative = os.path.relpath(path, settings.BASE_DIR)
+            tmp = f"{ACTIVE_MODEL_FILE}.tmp"
+            with open(tmp, "w") as fh:
+                json.dump({
+                    "path": path if relative.startswith("..") else relative,
+                    "version": model_version(path),
+                    "promoted_at": timezone.now().isoformat(),
+                }, fh, indent=2)
+            os.replace(tmp, ACTIVE_MODEL_FILE)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Serving {path} ({model_version(path)}); was {MODEL_PATH}. Restart workers to apply."
+        ))
@@ -0,0 +1,70 @@
+import os
+
+import joblib
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.models import DigitalAddictionAssessment, ModelEvaluation
+from ml.predictor import BATCH_MODEL_PATH, MODEL_PATH, MODEL_VERSION, get_pipeline, model_version
+from ml.training import build_dataset, evaluate, split_dataset, train
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a candidate risk model on stored assessments, evaluate it on a "
+        "holdout split and record the scores for the metrics page."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--out",
+            default=os.path.join(settings.BASE_DIR, "ml", "logistic_regression_candidate.pkl"),
+            help="Where to write the trained model (the live model is never overwritten).",
+        )
+        parser.add_argument("--test-size", type=float, default=0.2, help="Holdout fraction.")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed for the split.")
+        parser.add_argument(
+            "--skip-live", action="store_true",
+            help="Don't also evaluate the live model on the same holdout.",
+        )
+
+    def handle(self, *args, **options):
+        if os.path.abspath(options["out"]) in {os.path.abspath(MODEL_PATH), os.path.abspath(BATCH_MODEL_PATH)}:
+            raise CommandError("Refusing to overwrite the live model; write a candidate and promote it.")
+
+        try:
+            X, y = build_dataset(DigitalAddictionAssessment.objects.all())
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        X_train, X_test, y_train, y_test = split_dataset(
+            X, y, test_size=options["test_size"], random_state=options["seed"],
+        )
+
+        model = train(X_train, y_train)
+        joblib.dump(model, options["out"])
+        version = model_version(options["out"])
+        self._record(version, os.path.basename(options["out"]), model, X_test, y_test, len(y_train))
+
+        if not options["skip_live"]:
+            live = get_pipeline()
+            X_live = X_test
+            if hasattr(live, "feature_names_in_"):
+                X_live = X_test.reindex(columns=live.feature_names_in_, fill_value=0)
+            self._record(MODEL_VERSION, os.path.basename(MODEL_PATH), live, X_live, y_test, None)
+
+    def _record(self, version, artifact, model, X_test, y_test, train_size):
+        scores = evaluate(model, X_test, y_test)
+
+        ModelEvaluation.objects.create(
+            model_version=version,
+            artifact=artifact,
+            train_size=train_size or 0,
+            test_size=len(y_test),
+            **scores,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{artifact} ({version}): accuracy {scores['accuracy']:.3f}, "
+            f"macro F1 {scores['f1_score']:.3f} on {len(y_test)} holdout rows"
+        ))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from assessment.models import DigitalAddictionAssessment
+from ml.incremental import update
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the incremental risk model with partial_fit on assessments "
+        "added since the last run and checkpoint it. Meant to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=str(settings.ML_INCREMENTAL_DIR), help="Checkpoint directory.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per partial_fit call.")
+        parser.add_argument("--keep", type=int, default=5, help="Checkpoints to keep.")
+
+    def handle(self, *args, **options):
+        checkpoint = update(
+            DigitalAddictionAssessment.objects.all(),
+            options["dir"],
+            batch_size=options["batch_size"],
+            keep=options["keep"],
+        )
+
+        if checkpoint is None:
+            self.stdout.write("No new labelled assessments.")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Learned from {checkpoint['rows']} new assessments ({checkpoint['rows_seen']} total); "
+            f"checkpoint {checkpoint['path']} ({checkpoint['version']})"
+        ))
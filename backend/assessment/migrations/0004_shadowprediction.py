@@ -0,0 +1,69 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0003_digitaladdictionassessment_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da1',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da2',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da3',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da4',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da5',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da6',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da7',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='da8',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ShadowPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shadow_version', models.CharField(db_index=True, max_length=32)),
+                ('live_risk', models.CharField(max_length=20)),
+                ('shadow_risk', models.CharField(max_length=20)),
+                ('live_confidence', models.FloatField(blank=True, null=True)),
+                ('shadow_confidence', models.FloatField(blank=True, null=True)),
+                ('confidence_delta', models.FloatField(blank=True, null=True)),
+                ('agrees', models.BooleanField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shadow_predictions', to='assessment.digitaladdictionassessment')),
+            ],
+        ),
+    ]
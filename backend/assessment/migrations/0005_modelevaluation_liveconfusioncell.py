@@ -0,0 +1,46 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0004_shadowprediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(db_index=True, max_length=32)),
+                ('artifact', models.CharField(blank=True, max_length=255)),
+                ('accuracy', models.FloatField()),
+                ('precision', models.FloatField()),
+                ('recall', models.FloatField()),
+                ('f1_score', models.FloatField()),
+                ('per_class', models.JSONField(default=dict)),
+                ('confusion', models.JSONField(default=dict)),
+                ('train_size', models.PositiveIntegerField()),
+                ('test_size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='LiveConfusionCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=32)),
+                ('predicted_risk', models.CharField(max_length=20)),
+                ('actual_risk', models.CharField(max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('model_version', 'predicted_risk', 'actual_risk'), name='unique_live_confusion_cell')],
+            },
+        ),
+    ]
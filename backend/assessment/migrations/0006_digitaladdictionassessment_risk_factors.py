@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0005_modelevaluation_liveconfusioncell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digitaladdictionassessment',
+            name='risk_factors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
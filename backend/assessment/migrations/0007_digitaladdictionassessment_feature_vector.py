@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0006_digitaladdictionassessment_risk_factors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digitaladdictionassessment',
+            name='feature_spec',
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='digitaladdictionassessment',
+            name='feature_vector',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
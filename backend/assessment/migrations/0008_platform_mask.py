@@ -0,0 +1,59 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of assessment/platforms.py as of this migration
+PLATFORM_BITS = {
+    "youtube": 1, "tiktok": 2, "instagram": 4, "facebook": 8,
+    "whatsapp": 16, "x": 32, "snapchat": 64, "gaming": 128,
+    "x/twitter": 32, "twitter": 32,
+}
+PLATFORM_NAMES = ["YouTube", "TikTok", "Instagram", "Facebook", "WhatsApp", "X", "Snapchat", "Gaming"]
+
+
+def backfill_platform_mask(apps, schema_editor):
+    """
+    Canonicalize `platforms` (e.g. "X/Twitter" -> "X") and fill platform_mask.
+    """
+    Assessment = apps.get_model('assessment', 'DigitalAddictionAssessment')
+
+    last_id = 0
+    while True:
+        batch = list(
+            Assessment.objects.filter(id__gt=last_id).order_by('id').only('id', 'platforms')[:1000]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        for assessment in batch:
+            mask = 0
+            for name in assessment.platforms or []:
+                if isinstance(name, str):
+                    mask |= PLATFORM_BITS.get(name.strip().lower(), 0)
+            assessment.platform_mask = mask
+            assessment.platforms = [name for i, name in enumerate(PLATFORM_NAMES) if mask & (1 << i)]
+        Assessment.objects.bulk_update(batch, ['platforms', 'platform_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0007_digitaladdictionassessment_feature_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='digitaladdictionassessment',
+            name='platform_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='digitaladdictionassessment',
+            index=models.Index(fields=['platform_mask', 'gender'], name='assessment_platform_gender_idx'),
+        ),
+        migrations.RunPython(backfill_platform_mask, migrations.RunPython.noop),
+    ]
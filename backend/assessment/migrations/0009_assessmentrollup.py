@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0008_platform_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('institute', models.CharField(max_length=255)),
+                ('month', models.DateField()),
+                ('gender', models.CharField(max_length=10)),
+                ('age', models.PositiveIntegerField()),
+                ('night_phone_use', models.CharField(max_length=10)),
+                ('platform_mask', models.PositiveSmallIntegerField()),
+                ('self_rated_da', models.CharField(max_length=20)),
+                ('predicted_risk', models.CharField(blank=True, max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('das_total', models.FloatField(default=0)),
+                ('screen_weekdays_total', models.FloatField(default=0)),
+                ('screen_weekends_total', models.FloatField(default=0)),
+                ('social_media_total', models.FloatField(default=0)),
+                ('gaming_total', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('institute', 'month', 'gender', 'age', 'night_phone_use', 'platform_mask', 'self_rated_da', 'predicted_risk'), name='unique_assessment_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_risk_pointers(apps, schema_editor):
+    """
+    Point every student at their latest assessment.
+    """
+    Assessment = apps.get_model('assessment', 'DigitalAddictionAssessment')
+    StudentRiskPointer = apps.get_model('assessment', 'StudentRiskPointer')
+
+    latest = Assessment.objects.values('student_id').annotate(latest_id=models.Max('id')).order_by('student_id')
+    last_student = 0
+    while True:
+        rows = list(latest.filter(student_id__gt=last_student)[:1000])
+        if not rows:
+            break
+        last_student = rows[-1]['student_id']
+
+        pointers = []
+        for assessment in Assessment.objects.filter(id__in=[row['latest_id'] for row in rows]):
+            answers = [getattr(assessment, f'da{i}') or 0 for i in range(1, 9)]
+            pointers.append(StudentRiskPointer(
+                student_id=assessment.student_id,
+                assessment_id=assessment.id,
+                institute=assessment.institute,
+                predicted_risk=assessment.predicted_risk or '',
+                risk_confidence=assessment.risk_confidence or 0,
+                das_score=sum(answers) / 8,   # DAS_weighted
+                assessed_at=assessment.created_at,
+            ))
+        StudentRiskPointer.objects.bulk_create(pointers, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_user_role'),
+        ('assessment', '0009_assessmentrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentRiskPointer',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='risk_pointer', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('institute', models.CharField(max_length=255)),
+                ('predicted_risk', models.CharField(blank=True, max_length=20)),
+                ('risk_confidence', models.FloatField(default=0)),
+                ('das_score', models.FloatField()),
+                ('assessed_at', models.DateTimeField()),
+                ('assessment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='assessment.digitaladdictionassessment')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('predicted_risk__in', ['Moderate', 'Severe'])), fields=['-das_score', '-student'], name='triage_high_risk_das_idx'), models.Index(condition=models.Q(('predicted_risk__in', ['Moderate', 'Severe'])), fields=['-risk_confidence', '-student'], name='triage_high_risk_conf_idx')],
+            },
+        ),        migrations.RunPython(backfill_risk_pointers, migrations.RunPython.noop),
+    ]
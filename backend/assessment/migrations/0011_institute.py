@@ -0,0 +1,70 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0010_studentriskpointer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Institute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InstituteAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('institute', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='assessment.institute')),
+            ],
+            options={
+                'verbose_name_plural': 'institute aliases',
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='assessmentrollup',
+            name='unique_assessment_rollup',
+        ),
+        migrations.RenameField(
+            model_name='digitaladdictionassessment',
+            old_name='institute',
+            new_name='institute_name',
+        ),
+        migrations.RenameField(
+            model_name='assessmentrollup',
+            old_name='institute',
+            new_name='institute_name',
+        ),
+        migrations.RenameField(
+            model_name='studentriskpointer',
+            old_name='institute',
+            new_name='institute_name',
+        ),
+        migrations.AddField(
+            model_name='digitaladdictionassessment',
+            name='institute',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='assessments', to='assessment.institute'),
+        ),
+        migrations.AddField(
+            model_name='assessmentrollup',
+            name='institute',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='rollups', to='assessment.institute'),
+        ),
+        migrations.AddField(
+            model_name='studentriskpointer',
+            name='institute',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='assessment.institute'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:05
+
+import re
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+# Frozen copy of assessment/institutes.py as of this migration
+UNSPECIFIED = 'Unspecified'
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+ROLLUP_DIMENSIONS = [
+    'institute_id', 'month', 'gender', 'age', 'night_phone_use',
+    'platform_mask', 'self_rated_da', 'predicted_risk',
+]
+ROLLUP_TOTALS = [
+    'count', 'das_total', 'screen_weekdays_total', 'screen_weekends_total',
+    'social_media_total', 'gaming_total',
+]
+
+
+def institute_key(name):
+    key = ' '.join(PUNCTUATION.sub(' ', (name or '').casefold()).split())
+    return key or UNSPECIFIED.casefold()
+
+
+def link_institutes(apps, schema_editor):
+    """
+    One Institute per distinct institute key, named after its most common
+    spelling, and every assessment, rollup and triage pointer linked to it.
+    """
+    Assessment = apps.get_model('assessment', 'DigitalAddictionAssessment')
+    AssessmentRollup = apps.get_model('assessment', 'AssessmentRollup')
+    StudentRiskPointer = apps.get_model('assessment', 'StudentRiskPointer')
+    Institute = apps.get_model('assessment', 'Institute')
+    InstituteAlias = apps.get_model('assessment', 'InstituteAlias')
+
+    # key -> {spelling (whitespace collapsed): assessments using it}
+    spellings = defaultdict(Counter)
+    counts = [
+        Assessment.objects.values_list('institute_name').annotate(n=Count('id')),
+        AssessmentRollup.objects.values_list('institute_name').annotate(n=Sum('count')),
+        StudentRiskPointer.objects.values_list('institute_name').annotate(n=Count('student')),
+    ]
+    for rows in counts:
+        for name, n in rows.order_by():
+            spellings[institute_key(name)][' '.join((name or '').split()) or UNSPECIFIED] += n
+
+    ids = {}
+    for key, counter in spellings.items():
+        canonical = sorted(counter.items(), key=lambda item: (-item[1], item[0]))[0][0]
+        institute, _ = Institute.objects.get_or_create(name=canonical)
+        InstituteAlias.objects.get_or_create(key=key, defaults={'institute': institute})
+        ids[key] = institute.id
+
+    # One UPDATE per distinct spelling
+    for model in (Assessment, AssessmentRollup, StudentRiskPointer):
+        for name in model.objects.values_list('institute_name', flat=True).distinct():
+            model.objects.filter(institute_name=name).update(institute_id=ids[institute_key(name)])
+
+    # Rollups of spellings that are now one institute become one row
+    merged = {}
+    for rollup in AssessmentRollup.objects.order_by('id'):
+        key = tuple(getattr(rollup, field) for field in ROLLUP_DIMENSIONS)
+        if key not in merged:
+            merged[key] = rollup
+            continue
+        keep = merged[key]
+        for field in ROLLUP_TOTALS:
+            setattr(keep, field, getattr(keep, field) + getattr(rollup, field))
+        keep.save(update_fields=ROLLUP_TOTALS)
+        rollup.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0011_institute'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_institutes, migrations.RunPython.noop),
+    ]
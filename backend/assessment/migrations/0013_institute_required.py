@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0012_link_institutes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='digitaladdictionassessment',
+            name='institute',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='assessments', to='assessment.institute'),
+        ),
+        migrations.RemoveField(
+            model_name='assessmentrollup',
+            name='institute_name',
+        ),
+        migrations.AlterField(
+            model_name='assessmentrollup',
+            name='institute',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='rollups', to='assessment.institute'),
+        ),
+        migrations.RemoveField(
+            model_name='studentriskpointer',
+            name='institute_name',
+        ),
+        migrations.AlterField(
+            model_name='studentriskpointer',
+            name='institute',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='assessment.institute'),
+        ),
+        migrations.AddConstraint(
+            model_name='assessmentrollup',
+            constraint=models.UniqueConstraint(fields=('institute', 'month', 'gender', 'age', 'night_phone_use', 'platform_mask', 'self_rated_da', 'predicted_risk'), name='unique_assessment_rollup'),
+        ),
+    ]
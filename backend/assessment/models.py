@@ -1,14 +1,58 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django.contrib.auth.models import User
 
+from assessment.platforms import canonical_platforms, platform_mask
+
+
+class Institute(models.Model):
+    """
+    A school, college or university, under its canonical name. The names
+    students type are matched to it through InstituteAlias (see
+    assessment/institutes.py).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def save(self, *args, **kwargs):
+        from assessment.institutes import institute_key
+
+        super().save(*args, **kwargs)
+        # The canonical name always resolves to its own institute, unless
+        # it is already an alias of another one
+        InstituteAlias.objects.get_or_create(key=institute_key(self.name), defaults={"institute": self})
+
+    def __str__(self):
+        return self.name
+
+
+class InstituteAlias(models.Model):
+    """
+    A normalized spelling (assessment.institutes.institute_key) that
+    resolves to an institute.
+    """
+    institute = models.ForeignKey(Institute, on_delete=models.CASCADE, related_name="aliases")
+    key = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        verbose_name_plural = "institute aliases"
+
+    def __str__(self):
+        return f"{self.key} -> {self.institute}"
+
+
 class DigitalAddictionAssessment(models.Model):
     # User
     student = models.ForeignKey(settings.AUTH_USER_MODEL,on_delete=models.CASCADE,related_name="assessments")
 
     
     # Demographics
-    institute = models.CharField(max_length=255)
+    institute_name = models.CharField(max_length=255)   # as the student typed it
+    # Resolved from institute_name on save; aggregate and filter on this
+    institute = models.ForeignKey(Institute, on_delete=models.PROTECT, related_name="assessments", editable=False)
     age = models.PositiveIntegerField()
     
     GENDER_CHOICES = [
@@ -96,6 +140,8 @@ class DigitalAddictionAssessment(models.Model):
 
     # Platforms used regularly (multi-select)
     platforms = models.JSONField(default=list, blank=True)  # stores a list of selected platforms
+    # One bit per assessment.platforms.Platform, kept in sync with `platforms` on save
+    platform_mask = models.PositiveSmallIntegerField(default=0, editable=False)
 
     # Self Rated Digital Addiction
     SELF_RATED_CHOICES = [
@@ -109,11 +155,293 @@ class DigitalAddictionAssessment(models.Model):
     # Predicted Risk
     predicted_risk = models.CharField(max_length=20, choices=SELF_RATED_CHOICES, null=True, blank=True)
     risk_confidence = models.FloatField(null=True, blank=True)
+    # Top features behind the prediction: [{"feature", "value", "contribution"}]
+    risk_factors = models.JSONField(default=list, blank=True)
+
+    # Encoded model features (ml/features.py TRAINING_COLUMNS as float32),
+    # written on save so analytics and training never re-derive them
+    feature_vector = models.BinaryField(null=True, blank=True, editable=False)
+    feature_spec = models.CharField(max_length=16, blank=True, editable=False)
 
     # Timestamp
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Covers platform counts and platform x gender aggregates
+            models.Index(fields=["platform_mask", "gender"], name="assessment_platform_gender_idx"),
+        ]
+
     def __str__(self):
         return f"{self.student.username} - {self.created_at.date()}"
 
+    def encode_features(self):
+        from ml.features import FEATURE_SPEC, get_feature_maps, pack_features
+
+        self.feature_vector = pack_features(get_feature_maps().encode(self))
+        self.feature_spec = FEATURE_SPEC
+
+    def save(self, *args, **kwargs):
+        # Partial saves (update_fields) don't touch the answers
+        if kwargs.get("update_fields") is None:
+            self.sync_platforms()
+            self.sync_institute()
+            self.encode_features()
+        super().save(*args, **kwargs)
+        StudentRiskPointer.track(self)
+
+    def sync_platforms(self):
+        self.platforms = canonical_platforms(self.platforms)
+        self.platform_mask = platform_mask(self.platforms)
+
+    def sync_institute(self):
+        from assessment.institutes import resolve_institute
+
+        self.institute_id = resolve_institute(self.institute_name)
+
+    @property
+    def features(self):
+        """
+        The model's feature vector, as stored or freshly encoded if stale.
+        """
+        from ml.features import feature_matrix
+
+        return feature_matrix([self])[0]
+
+    @property
+    def das_percent(self):
+        """
+        Mean DA1–DA8 answer as a percentage of the scale's top (5).
+        """
+        da = [getattr(self, f"da{i}") for i in range(1, 9)]
+        return round(sum(da) / len(da) / 5 * 100, 2)
+
+    @property
+    def risk_factor_rows(self):
+        """
+        risk_factors with readable names and bar widths relative to the
+        strongest factor, for templates.
+        """
+        from ml.features import FEATURE_LABELS
+
+        strongest = max((abs(f["contribution"]) for f in self.risk_factors), default=0) or 1
+        return [
+            {
+                **factor,
+                "label": FEATURE_LABELS.get(factor["feature"], factor["feature"]),
+                "raises": factor["contribution"] > 0,
+                "width": round(abs(factor["contribution"]) / strongest * 100),
+            }
+            for factor in self.risk_factors
+        ]
+
+
+
+class ShadowPrediction(models.Model):
+    """
+    A candidate model's prediction for an assessment, recorded next to
+    the live prediction so the two can be compared before promotion.
+    """
+    assessment = models.ForeignKey(DigitalAddictionAssessment, on_delete=models.CASCADE, related_name="shadow_predictions")
+    shadow_version = models.CharField(max_length=32, db_index=True)
+
+    live_risk = models.CharField(max_length=20)
+    shadow_risk = models.CharField(max_length=20)
+    live_confidence = models.FloatField(null=True, blank=True)
+    shadow_confidence = models.FloatField(null=True, blank=True)
+    confidence_delta = models.FloatField(null=True, blank=True)  # shadow - live
+    agrees = models.BooleanField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.shadow_version} - assessment {self.assessment_id}"
+
+
+class ModelEvaluation(models.Model):
+    """
+    Holdout evaluation of one model version, written by `manage.py train_model`.
+    """
+    model_version = models.CharField(max_length=32, db_index=True)
+    artifact = models.CharField(max_length=255, blank=True)
+
+    accuracy = models.FloatField()
+    precision = models.FloatField()   # macro average
+    recall = models.FloatField()      # macro average
+    f1_score = models.FloatField()    # macro average
+
+    # {risk label: {"precision", "recall", "f1_score", "support"}}
+    per_class = models.JSONField(default=dict)
+    # {"labels": [...], "matrix": [[...], ...]}, rows = actual, columns = predicted
+    confusion = models.JSONField(default=dict)
+
+    train_size = models.PositiveIntegerField()
+    test_size = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.model_version} - {self.accuracy:.3f}"
+
+
+class LiveConfusionCell(models.Model):
+    """
+    One cell of the running confusion matrix of predicted_risk vs
+    self_rated_da, per model version. Incremented as assessments are
+    scored, so the metrics page reads at most a few dozen rows.
+    """
+    model_version = models.CharField(max_length=32)
+    predicted_risk = models.CharField(max_length=20)
+    actual_risk = models.CharField(max_length=20)   # self_rated_da as a risk label
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model_version", "predicted_risk", "actual_risk"],
+                name="unique_live_confusion_cell",
+            ),
+        ]
+
+    @classmethod
+    def record(cls, model_version, predicted_risk, actual_risk):
+        key = dict(model_version=model_version, predicted_risk=predicted_risk, actual_risk=actual_risk)
+
+        if cls.objects.filter(**key).update(count=models.F("count") + 1):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(count=1, **key)
+        except IntegrityError:
+            # Another worker created the cell first
+            cls.objects.filter(**key).update(count=models.F("count") + 1)
+
+    def __str__(self):
+        return f"{self.model_version}: {self.actual_risk} -> {self.predicted_risk} ({self.count})"
+
+
+class AssessmentRollup(models.Model):
+    """
+    Compacted assessments: how many rows of one institute and month had
+    the same answer to every dimension the dashboards break down by, and
+    the sums behind the dashboard averages. Written by
+    `manage.py compact_assessments` (see assessment/rollups.py).
+    """
+    institute = models.ForeignKey(Institute, on_delete=models.PROTECT, related_name="rollups")
+    month = models.DateField()      # first day of the month the assessments were taken
+
+    gender = models.CharField(max_length=10)
+    age = models.PositiveIntegerField()
+    night_phone_use = models.CharField(max_length=10)
+    platform_mask = models.PositiveSmallIntegerField()
+    self_rated_da = models.CharField(max_length=20)
+    predicted_risk = models.CharField(max_length=20, blank=True)   # "" when never scored
+
+    count = models.PositiveIntegerField(default=0)
+    # Feature-vector sums (ml/features.py), divided by count for averages
+    das_total = models.FloatField(default=0)
+    screen_weekdays_total = models.FloatField(default=0)
+    screen_weekends_total = models.FloatField(default=0)
+    social_media_total = models.FloatField(default=0)
+    gaming_total = models.FloatField(default=0)
+
+    TOTAL_FIELDS = (
+        "count", "das_total", "screen_weekdays_total", "screen_weekends_total",
+        "social_media_total", "gaming_total",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "institute", "month", "gender", "age", "night_phone_use",
+                    "platform_mask", "self_rated_da", "predicted_risk",
+                ],
+                name="unique_assessment_rollup",
+            ),
+        ]
+
+    @classmethod
+    def add(cls, key, totals):
+        """
+        Add `totals` ({field in TOTAL_FIELDS: amount}) to the row for `key`.
+        """
+        increments = {field: models.F(field) + amount for field, amount in totals.items()}
+
+        if cls.objects.filter(**key).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(**key, **totals)
+        except IntegrityError:
+            # Another run created the row first
+            cls.objects.filter(**key).update(**increments)
+
+    def __str__(self):
+        return f"{self.institute} {self.month:%Y-%m} ({self.count})"
+
+
+# Predicted risks listed in the triage queue by default
+TRIAGE_RISKS = ["Moderate", "Severe"]
+
+
+class StudentRiskPointer(models.Model):
+    """
+    Each student's latest assessment, with the columns the staff triage
+    queue filters and sorts by copied onto it (see assessment/triage.py).
+    Kept current by DigitalAddictionAssessment.save().
+    """
+    student = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="risk_pointer")
+    assessment = models.OneToOneField(DigitalAddictionAssessment, on_delete=models.CASCADE, related_name="+")
+
+    institute = models.ForeignKey(Institute, on_delete=models.PROTECT, related_name="+")
+    predicted_risk = models.CharField(max_length=20, blank=True)   # "" until scored
+    risk_confidence = models.FloatField(default=0)
+    das_score = models.FloatField()     # DAS_weighted, the mean DA1-DA8 answer (1-5)
+    assessed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # The default queue only lists Moderate/Severe students, a small
+            # slice of the table: partial indexes in each sort order
+            models.Index(
+                fields=["-das_score", "-student"], name="triage_high_risk_das_idx",
+                condition=models.Q(predicted_risk__in=TRIAGE_RISKS),
+            ),
+            models.Index(
+                fields=["-risk_confidence", "-student"], name="triage_high_risk_conf_idx",
+                condition=models.Q(predicted_risk__in=TRIAGE_RISKS),
+            ),
+        ]
+
+    @classmethod
+    def track(cls, assessment):
+        """
+        Point the student at `assessment` unless they have a newer one.
+        """
+        from ml.features import COLUMN_INDEX
+
+        fields = dict(
+            assessment=assessment,
+            institute_id=assessment.institute_id,
+            predicted_risk=assessment.predicted_risk or "",
+            risk_confidence=assessment.risk_confidence or 0,
+            das_score=float(assessment.features[COLUMN_INDEX["DAS_weighted"]]),
+            assessed_at=assessment.created_at,
+        )
+
+        if cls.objects.filter(student_id=assessment.student_id, assessment_id__lte=assessment.id).update(**fields):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(student_id=assessment.student_id, **fields)
+        except IntegrityError:
+            # The student already points at a newer assessment
+            pass
+
+    def __str__(self):
+        return f"{self.student_id} -> assessment {self.assessment_id}"
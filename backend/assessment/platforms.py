@@ -0,0 +1,121 @@
+"""
+Canonical social/media platforms an assessment can list, and the bitmask
+form stored next to the `platforms` JSON list.
+
+DigitalAddictionAssessment.platform_mask holds one bit per Platform and is
+kept in sync on save. Analytics group by the small integer column instead
+of loading and walking every JSON list: there are at most 256 distinct
+masks, so a GROUP BY over the indexed column returns a handful of rows
+whose bits are then added up here.
+"""
+import enum
+
+from django.db.models import Count, Sum
+
+
+class Platform(enum.IntFlag):
+    YOUTUBE = 1
+    TIKTOK = 2
+    INSTAGRAM = 4
+    FACEBOOK = 8
+    WHATSAPP = 16
+    X = 32
+    SNAPCHAT = 64
+    GAMING = 128
+
+
+# Canonical names, as stored in `platforms` and shown in charts, in display order
+PLATFORM_NAMES = {
+    Platform.YOUTUBE: "YouTube",
+    Platform.TIKTOK: "TikTok",
+    Platform.INSTAGRAM: "Instagram",
+    Platform.FACEBOOK: "Facebook",
+    Platform.WHATSAPP: "WhatsApp",
+    Platform.X: "X",
+    Platform.SNAPCHAT: "Snapchat",
+    Platform.GAMING: "Gaming",
+}
+
+# Other spellings accepted on input (compared case-insensitively)
+PLATFORM_ALIASES = {
+    "x/twitter": Platform.X,
+    "twitter": Platform.X,
+}
+
+_BY_NAME = {name.lower(): platform for platform, name in PLATFORM_NAMES.items()}
+_BY_NAME.update(PLATFORM_ALIASES)
+
+
+def parse_platform(name):
+    """
+    The Platform for a name or alias, or None if it isn't one.
+    """
+    if not isinstance(name, str):
+        return None
+    return _BY_NAME.get(name.strip().lower())
+
+
+def canonical_platforms(names):
+    """
+    Canonical names for a list of platform names, deduplicated, in display
+    order. Unknown names are dropped.
+    """
+    mask = platform_mask(names)
+    return [name for platform, name in PLATFORM_NAMES.items() if mask & platform]
+
+
+def platform_mask(names):
+    mask = 0
+    for name in names or []:
+        platform = parse_platform(name)
+        if platform is not None:
+            mask |= platform
+    return int(mask)
+
+
+def masks_with(platform):
+    """
+    Every mask value that includes `platform`, for index-friendly
+    `platform_mask__in=` filters (a bitwise AND can't use the index).
+    """
+    return [mask for mask in range(1 << len(Platform)) if mask & platform]
+
+
+def with_platform(queryset, platform):
+    """
+    Assessments whose student uses `platform`.
+    """
+    return queryset.filter(platform_mask__in=masks_with(platform))
+
+
+def _tally(weight):
+    # Rows count once each, unless they carry a count (e.g. AssessmentRollup)
+    return Sum(weight) if weight else Count("id")
+
+
+def platform_counts(queryset, weight=None):
+    """
+    {canonical name: number of assessments listing it}, in display order.
+    """
+    counts = dict.fromkeys(PLATFORM_NAMES.values(), 0)
+    rows = queryset.order_by().values_list("platform_mask").annotate(n=_tally(weight))
+    for mask, n in rows:
+        for platform, name in PLATFORM_NAMES.items():
+            if mask & platform:
+                counts[name] += n
+    return counts
+
+
+def platform_counts_by(queryset, field, weight=None):
+    """
+    {value of `field`: platform_counts()} in one grouped query,
+    e.g. platform usage per gender.
+    """
+    result = {}
+    rows = queryset.order_by().values_list(field, "platform_mask").annotate(n=_tally(weight))
+    for value, mask, n in rows:
+        counts = result.setdefault(value, dict.fromkeys(PLATFORM_NAMES.values(), 0))
+        for platform, name in PLATFORM_NAMES.items():
+            if mask & platform:
+                counts[name] += n
+    return result
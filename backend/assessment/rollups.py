@@ -0,0 +1,136 @@
+"""
+Retention compaction: old assessments folded into AssessmentRollup rows.
+
+`manage.py compact_assessments` takes the assessments taken before the
+retention window (ASSESSMENT_RETENTION_MONTHS whole months), writes them
+to a gzipped JSON Lines archive in ASSESSMENT_ARCHIVE_DIR, adds them to
+the rollups of their institute and month and deletes them, one batch per
+transaction.
+
+A rollup row keeps every dimension the admin insights break down by
+(gender, age, night-time phone use, platforms, self-rated and predicted
+risk) plus the sums behind their averages. The insights add the rollups
+to the live rows, so their totals are the same either side of a
+compaction.
+
+A student's newest assessment is never compacted, since it is what their
+dashboard shows. Shadow predictions of compacted assessments are deleted
+with them, and training commands only see the live rows.
+"""
+import datetime
+
+from django.db.models import Exists, OuterRef, Sum
+from django.utils import timezone
+
+from assessment.models import AssessmentRollup, DigitalAddictionAssessment
+
+# Rollup field -> ml.features column summed into it
+SUMMED_COLUMNS = {
+    "das_total": "DAS_weighted",
+    "screen_weekdays_total": "screen_time_weekdays",
+    "screen_weekends_total": "screen_time_weekends",
+    "social_media_total": "social_media_time",
+    "gaming_total": "gaming_time",
+}
+
+
+def month_start(value):
+    """
+    First day of the (local) month of a date or datetime.
+    """
+    if isinstance(value, datetime.datetime):
+        value = timezone.localtime(value).date()
+    return value.replace(day=1)
+
+
+def retention_cutoff(months, today=None):
+    """
+    Start of the oldest month still kept in full: assessments created
+    before it are compacted. Whole months only, so a month is never split
+    between live rows and rollups.
+    """
+    first = month_start(today or timezone.localdate())
+    index = first.year * 12 + first.month - 1 - months
+    cutoff = datetime.date(index // 12, index % 12 + 1, 1)
+    return timezone.make_aware(datetime.datetime.combine(cutoff, datetime.time.min))
+
+
+def compactable(cutoff):
+    """
+    Assessments created before `cutoff`, except each student's newest.
+    """
+    newer = DigitalAddictionAssessment.objects.filter(student=OuterRef("student"), id__gt=OuterRef("id"))
+    return DigitalAddictionAssessment.objects.filter(Exists(newer), created_at__lt=cutoff)
+
+
+def rollup_key(assessment):
+    return {
+        "institute_id": assessment.institute_id,
+        "month": month_start(assessment.created_at),
+        "gender": assessment.gender,
+        "age": assessment.age,
+        "night_phone_use": assessment.night_phone_use,
+        "platform_mask": assessment.platform_mask,
+        "self_rated_da": assessment.self_rated_da,
+        "predicted_risk": assessment.predicted_risk or "",
+    }
+
+
+def fold(assessments):
+    """
+    Add a batch of assessments to their rollups.
+
+    Returns the number of rollup rows touched.
+    """
+    from ml.features import COLUMN_INDEX, feature_matrix
+
+    assessments = list(assessments)
+    columns = [COLUMN_INDEX[column] for column in SUMMED_COLUMNS.values()]
+    sums = feature_matrix(assessments)[:, columns]
+
+    groups = {}
+    for assessment, row in zip(assessments, sums.tolist()):
+        key = tuple(rollup_key(assessment).items())
+        totals = groups.setdefault(key, dict.fromkeys(AssessmentRollup.TOTAL_FIELDS, 0))
+        totals["count"] += 1
+        for field, value in zip(SUMMED_COLUMNS, row):
+            totals[field] += value
+
+    for key, totals in groups.items():
+        AssessmentRollup.add(dict(key), totals)
+    return len(groups)
+
+
+# ================================
+# DASHBOARD AGGREGATES
+# ================================
+
+def rollup_counts(rollups, *fields):
+    """
+    Number of compacted assessments per value of `fields` (per tuple of
+    values when there are several).
+    """
+    rows = rollups.order_by().values_list(*fields).annotate(n=Sum("count"))
+    if len(fields) == 1:
+        return {value: n for value, n in rows}
+    return {tuple(row[:-1]): row[-1] for row in rows}
+
+
+def rollup_totals(rollups):
+    """
+    Sums of every AssessmentRollup.TOTAL_FIELDS over `rollups`.
+    """
+    totals = rollups.aggregate(**{f"sum_{name}": Sum(name) for name in AssessmentRollup.TOTAL_FIELDS})
+    return {name: totals[f"sum_{name}"] or 0 for name in AssessmentRollup.TOTAL_FIELDS}
+
+
+def rollup_totals_by(rollups, field):
+    """
+    {value of `field`: rollup_totals()} in one grouped query.
+    """
+    sums = {f"sum_{name}": Sum(name) for name in AssessmentRollup.TOTAL_FIELDS}
+    rows = rollups.order_by().values(field).annotate(**sums)
+    return {
+        row[field]: {name: row[f"sum_{name}"] or 0 for name in AssessmentRollup.TOTAL_FIELDS}
+        for row in rows
+    }
@@ -0,0 +1,42 @@
+"""
+Scoring an assessment with the live model and recording the prediction
+everywhere that tracks it: the assessment itself, the prediction metrics,
+the running confusion matrix and the drift histograms.
+
+Used by the predict API and by the assessment.rescore background task.
+"""
+from assessment.models import LiveConfusionCell
+from ml.drift import record_features
+from ml.features import feature_frame
+from ml.predictor import MODEL_VERSION, SELF_RATED_RISK, predict_risk_with_explanation
+from monitoring.metrics import record_prediction
+
+
+def score_assessment(instance):
+    """
+    Predict and save instance's risk. Returns (risk label, confidence,
+    model input frame).
+    """
+    # Model input from the feature vector encoded on save
+    df = feature_frame([instance])
+
+    # Run prediction (label, confidence and the features behind it in one pass)
+    risk_label, confidence, risk_factors = predict_risk_with_explanation(instance, df=df)
+
+    # Save prediction to DB
+    instance.predicted_risk = risk_label
+    instance.risk_confidence = confidence or 0.0
+    instance.risk_factors = risk_factors
+    # updated_at too: it keys the cached history row and detail page
+    instance.save(update_fields=["predicted_risk", "risk_confidence", "risk_factors", "updated_at"])
+    record_prediction(risk_label, confidence)
+
+    # Running confusion matrix against the student's own rating
+    LiveConfusionCell.record(
+        MODEL_VERSION, risk_label, SELF_RATED_RISK.get(instance.self_rated_da, "Unknown"),
+    )
+
+    # Live feature histograms for the drift monitor
+    record_features(instance)
+
+    return risk_label, confidence, df
@@ -0,0 +1,83 @@
+"""
+Background tasks for assessments and the risk model (see jobs/registry.py).
+"""
+import io
+
+from django.conf import settings
+from django.core.management import call_command
+
+from jobs.registry import task
+
+RESCORE_BATCH = 500
+
+
+@task("assessment.rescore", label="Score unscored assessments")
+def rescore(assessment_ids=None):
+    """
+    Score assessments that have no prediction yet (all of them, or those
+    among assessment_ids), e.g. after the model failed during a request.
+
+    An assessment that fails doesn't stop the others. The job fails at
+    the end, naming the failed ids, if any did; its retries then only
+    find those still unscored.
+    """
+    from assessment.models import DigitalAddictionAssessment
+    from assessment.scoring import score_assessment
+
+    unscored = DigitalAddictionAssessment.objects.filter(predicted_risk__isnull=True).order_by("id")
+    if assessment_ids is not None:
+        unscored = unscored.filter(id__in=assessment_ids)
+
+    scored = 0
+    failed = []
+    last_id = 0
+    while True:
+        batch = list(unscored.filter(id__gt=last_id)[:RESCORE_BATCH])
+        if not batch:
+            break
+        last_id = batch[-1].id
+        for assessment in batch:
+            try:
+                score_assessment(assessment)
+            except Exception as e:
+                print(f"Could not score assessment {assessment.id}:", e)
+                failed.append(assessment.id)
+                continue
+            scored += 1
+
+    if failed:
+        raise RuntimeError(f"Scored {scored}; could not score assessments {failed}.")
+    return {"scored": scored}
+
+
+@task("assessment.update_incremental_model", max_attempts=3, label="Update the incremental model")
+def update_incremental_model():
+    from assessment.models import DigitalAddictionAssessment
+    from ml.incremental import update
+
+    checkpoint = update(DigitalAddictionAssessment.objects.all(), settings.ML_INCREMENTAL_DIR)
+    if checkpoint is None:
+        return {"rows": 0}
+    return {"rows": checkpoint["rows"], "version": checkpoint["version"], "path": str(checkpoint["path"])}
+
+
+@task("assessment.compact_assessments", max_attempts=3, label="Compact old assessments into rollups")
+def compact_assessments(months=None):
+    out = io.StringIO()
+    call_command("compact_assessments", months=months or settings.ASSESSMENT_RETENTION_MONTHS, stdout=out)
+    return {"output": out.getvalue().strip()}
+
+
+@task("assessment.train_model", max_attempts=1, label="Train a candidate model")
+def train_model():
+    # Not retried: too little data or an unusable holdout fails the same way again
+    out = io.StringIO()
+    call_command("train_model", stdout=out)
+    return {"output": out.getvalue().strip()}
+
+
+@task("assessment.export_model_artifact", max_attempts=3, label="Export the model artifact")
+def export_model_artifact():
+    out = io.StringIO()
+    call_command("export_model_artifact", stdout=out, stderr=out)
+    return {"output": out.getvalue().strip()}
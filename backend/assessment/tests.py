@@ -1,3 +1,25 @@
+import datetime
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from assessment.api.admission import LoadShedder, TokenBucketThrottle, predict_load
+from assessment.models import DigitalAddictionAssessment
+
 # from django.test import TestCase
 # from django.contrib.auth import get_user_model
 # from .models import DigitalAddictionAssessment
@@ -36,3 +58,590 @@
 #         )
 
 #         self.assertEqual(assessment.student.username, "student1")
+
+
+PAYLOAD = dict(
+    institute="Test College", age=20, gender="Male",
+    da1=3, da2=4, da3=2, da4=5, da5=1, da6=3, da7=2, da8=4,
+    primary_device="Smartphone", own_smartphone="Yes", mobile_data="Always",
+    screen_weekdays="4–6h", screen_weekends=">6h", night_phone_use="1–2h",
+    notif_per_hour="11–20 times", social_time="2–3h", gaming_time="<30m",
+    platforms=["YouTube", "TikTok"], self_rated_da="moderate",
+)
+
+
+def create_assessment(student, institute="Test College", **answers):
+    """
+    Save an assessment directly, without scoring it through the API.
+    """
+    fields = dict(PAYLOAD, **answers)
+    del fields["institute"]
+    return DigitalAddictionAssessment.objects.create(student=student, institute_name=institute, **fields)
+
+
+class RiskFactorTest(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(self.user)
+
+    def test_predict_stores_strongest_factors_first(self):
+        from ml.artifact import load_artifact
+
+        response = self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        factors = DigitalAddictionAssessment.objects.get(id=response.json()["id"]).risk_factors
+
+        self.assertEqual(len(factors), settings.RISK_FACTOR_COUNT)
+        strengths = [abs(factor["contribution"]) for factor in factors]
+        self.assertEqual(strengths, sorted(strengths, reverse=True))
+
+        # coefficient x (x - mean) / std for the predicted class, strongest first
+        artifact = load_artifact(settings.ML_ARTIFACT_DIR)
+        x = DigitalAddictionAssessment.objects.get(id=response.json()["id"]).features
+        predicted = artifact.predict_proba(x.reshape(1, -1)).argmax()
+        contributions = artifact.coef_[predicted] * (x - artifact.feature_mean) / artifact.feature_std
+        expected = [str(artifact.feature_names_in_[i]) for i in np.argsort(-abs(contributions))[:len(factors)]]
+        self.assertEqual([factor["feature"] for factor in factors], expected)
+
+
+def run_concurrently(func, threads):
+    """
+    func() on `threads` threads started together; their results.
+    """
+    barrier = threading.Barrier(threads)
+    results = []
+
+    def target():
+        barrier.wait()
+        try:
+            results.append(func())
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=target) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+class AdmissionTest(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(self.user)
+
+    def predict(self):
+        return self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json")
+
+    def test_user_bucket_refuses_with_retry_after(self):
+        for _ in range(6):      # predict_user: 6/min
+            self.assertEqual(self.predict().status_code, 200)
+
+        response = self.predict()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+    @override_settings(PREDICT_SHED_MAX_IN_FLIGHT=1)
+    def test_busy_worker_sheds_with_retry_after(self):
+        self.assertIsNone(predict_load.admit(RequestFactory().post("/")))
+        try:
+            response = self.predict()
+        finally:
+            with predict_load._lock:
+                predict_load.in_flight -= 1
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], str(settings.PREDICT_SHED_RETRY_AFTER))
+        self.assertEqual(self.predict().status_code, 200)
+
+
+class ConcurrentAdmissionTest(TransactionTestCase):
+
+    # The test database's in-memory SQLite fails concurrent reads of the
+    # cache table outright, so the buckets live in this process's memory
+    @override_settings(THROTTLE_CACHE="default")
+    def test_bucket_admits_exactly_its_tokens(self):
+        key = f"throttle_test_{uuid.uuid4().hex}"
+
+        class Throttle(TokenBucketThrottle):
+            scope = "test"
+            rate = "10/hour"
+
+            def get_cache_key(self, request, view):
+                return key
+
+        def requests():
+            return sum(Throttle().allow_request(None, None) for _ in range(4))
+
+        self.assertEqual(sum(run_concurrently(requests, threads=6)), 10)
+
+    @override_settings(PREDICT_SHED_MAX_IN_FLIGHT=3)
+    def test_in_flight_limit_holds_under_concurrency(self):
+        shedder = LoadShedder()
+        request = RequestFactory().post("/")
+
+        reasons = run_concurrently(lambda: shedder.admit(request), threads=12)
+        self.assertEqual(reasons.count(None), 3)
+        self.assertEqual(shedder.in_flight, 3)
+
+
+class RescoreTest(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json")
+        DigitalAddictionAssessment.objects.update(predicted_risk=None)
+
+    def test_failed_assessment_does_not_stop_the_others(self):
+        from unittest import mock
+
+        from assessment import scoring
+        from assessment.tasks import rescore
+
+        broken = DigitalAddictionAssessment.objects.order_by("id").first()
+        score = scoring.score_assessment
+
+        def flaky(assessment):
+            if assessment.id == broken.id:
+                raise ValueError("unscorable")
+            return score(assessment)
+
+        with mock.patch.object(scoring, "score_assessment", flaky):
+            with self.assertRaisesMessage(RuntimeError, f"could not score assessments [{broken.id}]"):
+                rescore()
+
+        unscored = DigitalAddictionAssessment.objects.filter(predicted_risk__isnull=True)
+        self.assertEqual(list(unscored.values_list("id", flat=True)), [broken.id])
+
+        # The retry only has the failed one left
+        self.assertEqual(rescore(), {"scored": 1})
+        self.assertFalse(unscored.exists())
+
+    def test_training_without_enough_data_fails_at_once(self):
+        from jobs.models import Job
+        from jobs.registry import enqueue
+        from jobs.worker import claim, run
+
+        enqueue("assessment.train_model")
+        self.assertEqual(run(claim("worker")), "failed")
+        job = Job.objects.get()
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("CommandError", job.last_error)
+
+
+class ShadowScoringTest(TestCase):
+
+    def loaded(self, scorer):
+        for _ in range(500):
+            if scorer.model is not None or scorer.failed:
+                break
+            time.sleep(0.01)
+        return scorer
+
+    def test_records_the_candidate_next_to_the_live_prediction(self):
+        from ml.features import feature_frame
+        from assessment.models import ShadowPrediction
+        from ml.predictor import MODEL_PATH
+        from ml.shadow import ShadowScorer
+
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+        ids = [
+            self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json").json()["id"]
+            for _ in range(2)
+        ]
+        assessments = DigitalAddictionAssessment.objects.filter(id__in=ids).order_by("id")
+
+        # The live model as its own candidate must agree with itself
+        scorer = self.loaded(ShadowScorer(MODEL_PATH))
+        self.assertFalse(scorer.failed)
+        scorer.record([
+            (a.id, feature_frame([a]), a.predicted_risk, a.risk_confidence) for a in assessments
+        ])
+
+        shadow = ShadowPrediction.objects.order_by("assessment_id")
+        self.assertEqual([s.assessment_id for s in shadow], ids)
+        for prediction, assessment in zip(shadow, assessments):
+            self.assertTrue(prediction.agrees)
+            self.assertEqual(prediction.shadow_risk, assessment.predicted_risk)
+            self.assertAlmostEqual(prediction.confidence_delta, 0, places=3)
+
+    def test_unloadable_candidate_turns_shadow_scoring_off(self):
+        from ml.shadow import ShadowScorer
+
+        scorer = self.loaded(ShadowScorer("/nonexistent/candidate.pkl"))
+        self.assertTrue(scorer.failed)
+        self.assertFalse(scorer.submit(1, None, "Mild", 0.5))
+        self.assertTrue(scorer.queue.empty())
+
+
+class ModelArtifactTest(TestCase):
+
+    def frame(self):
+        from ml.features import feature_frame
+
+        rows = []
+        for level in range(1, 6):
+            answers = dict(PAYLOAD, **{f"da{i}": level for i in range(1, 9)})
+            del answers["institute"]
+            answers["platforms"] = PAYLOAD["platforms"][: level % 3]
+            rows.append(DigitalAddictionAssessment(**answers))
+        return feature_frame(rows)
+
+    def test_shipped_artifact_matches_the_model(self):
+        import joblib
+
+        from ml.artifact import load_artifact, read_manifest
+        from ml.predictor import MODEL_PATH, MODEL_VERSION
+
+        self.assertEqual(read_manifest(settings.ML_ARTIFACT_DIR)["source_version"], MODEL_VERSION)
+
+        X = self.frame()
+        model = joblib.load(MODEL_PATH)
+        artifact = load_artifact(settings.ML_ARTIFACT_DIR)
+        np.testing.assert_allclose(artifact.predict_proba(X.to_numpy(dtype=float)), model.predict_proba(X), atol=1e-9)
+        np.testing.assert_array_equal(artifact.predict(X.to_numpy(dtype=float)), model.predict(X))
+
+    def test_export_round_trip_is_memory_mapped(self):
+        import joblib
+
+        from ml.artifact import export_linear_model, load_artifact
+        from ml.predictor import MODEL_PATH
+
+        model = joblib.load(MODEL_PATH)
+        X = self.frame()
+        with tempfile.TemporaryDirectory() as out_dir:
+            export_linear_model(model, out_dir, source_version="test")
+            artifact = load_artifact(out_dir)
+            self.assertIsInstance(artifact.coef_, np.memmap)
+            np.testing.assert_allclose(artifact.predict_proba(X.to_numpy(dtype=float)), model.predict_proba(X), atol=1e-9)
+
+
+class PreloadTest(SimpleTestCase):
+
+    def test_forked_worker_inherits_a_read_only_model(self):
+        # In a fresh interpreter, as gunicorn's master would
+        probe = (
+            "import os, django; django.setup()\n"
+            "from ml import predictor\n"
+            "predictor.preload()\n"
+            "assert not predictor.get_pipeline().coef_.flags.writeable\n"
+            "pid = os.fork()\n"
+            "if pid == 0:\n"
+            "    loaded = predictor._pipeline is not None and predictor._linear_model is not None\n"
+            "    os._exit(0 if loaded else 1)\n"
+            "print(os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]))\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", probe], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONWARNINGS="ignore"),
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        self.assertEqual(proc.stdout.strip().splitlines()[-1], "0")
+
+
+class IncrementalModelTest(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+        self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json")
+        self.template = DigitalAddictionAssessment.objects.get()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def add(self, *labels):
+        for label in labels:
+            self.template.pk = None
+            self.template.self_rated_da = label
+            self.template.save()
+
+    def test_updates_consume_only_new_rows(self):
+        import joblib
+
+        from ml.features import feature_frame
+        from ml.incremental import read_state, update
+
+        assessments = DigitalAddictionAssessment.objects.all()
+        self.add("mild", "severe", "not_at_risk", "unknown")
+
+        first = update(assessments, self.directory, batch_size=2, keep=1)
+        self.assertEqual((first["rows"], first["rows_seen"]), (4, 4))
+        self.assertIsNone(update(assessments, self.directory))
+
+        self.add("severe", "mild")
+        second = update(assessments, self.directory, keep=1)
+        self.assertEqual((second["rows"], second["rows_seen"]), (2, 6))
+
+        state = read_state(self.directory)
+        self.assertEqual(state["last_seen_id"], assessments.order_by("id").last().id)
+        # Only the newest checkpoint is kept
+        self.assertEqual(state["checkpoints"], ["sgd-0002.pkl"])
+        self.assertNotIn("sgd-0001.pkl", os.listdir(self.directory))
+
+        model = joblib.load(second["path"])
+        proba = model.predict_proba(feature_frame([self.template]))
+        self.assertAlmostEqual(proba.sum(), 1.0)
+
+
+class FeatureVectorTest(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+        variations = [
+            {},
+            dict(gender="Female", primary_device="Laptop", own_smartphone="No", mobile_data="Rarely",
+                 platforms=["youtube", "Instagram", "Twitter", "Gaming"], da1=1, da8=5),
+            dict(age=31, screen_weekdays="<2h", social_time="<1h", gaming_time=">2h", platforms=[]),
+        ]
+        for answers in variations:
+            response = self.client.post(
+                "/api/assessment/predict/", dict(PAYLOAD, **answers), content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+
+    def test_stored_vector_matches_the_reference_encoding(self):
+        from ml.features import FEATURE_SPEC, unpack_features
+        from ml.preprocessing import preprocess_assessment
+
+        for assessment in DigitalAddictionAssessment.objects.all():
+            self.assertEqual(assessment.feature_spec, FEATURE_SPEC)
+            expected, _ = preprocess_assessment(assessment)
+            np.testing.assert_allclose(
+                unpack_features(assessment.feature_vector), expected.iloc[0].to_numpy(dtype=float), rtol=1e-6,
+            )
+
+    def test_backfill_rewrites_stale_vectors_only(self):
+        from django.core.management import call_command
+
+        from ml.features import FEATURE_SPEC
+
+        stored = {a.id: (bytes(a.feature_vector), a.updated_at) for a in DigitalAddictionAssessment.objects.all()}
+        DigitalAddictionAssessment.objects.update(feature_vector=None, feature_spec="stale")
+
+        call_command("backfill_feature_vectors", batch_size=2, stdout=io.StringIO())
+
+        for assessment in DigitalAddictionAssessment.objects.all():
+            self.assertEqual(assessment.feature_spec, FEATURE_SPEC)
+            self.assertEqual((bytes(assessment.feature_vector), assessment.updated_at), stored[assessment.id])
+
+
+class PlatformMaskTest(TestCase):
+
+    def test_names_are_canonical_and_masked(self):
+        from assessment.platforms import Platform, canonical_platforms, platform_mask
+
+        names = ["tiktok", " YouTube ", "Twitter", "X/Twitter", "Myspace", None]
+        self.assertEqual(canonical_platforms(names), ["YouTube", "TikTok", "X"])
+        self.assertEqual(platform_mask(names), Platform.YOUTUBE | Platform.TIKTOK | Platform.X)
+        self.assertEqual(platform_mask([]), 0)
+
+    def test_counts_match_the_stored_lists(self):
+        from assessment.platforms import Platform, platform_counts, platform_counts_by, with_platform
+
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+        for gender, platforms in [
+            ("Male", ["YouTube", "TikTok"]), ("Female", ["youtube"]), ("Female", ["Snapchat", "Gaming"]), ("Male", []),
+        ]:
+            self.client.post(
+                "/api/assessment/predict/", dict(PAYLOAD, gender=gender, platforms=platforms),
+                content_type="application/json",
+            )
+
+        assessments = DigitalAddictionAssessment.objects.all()
+        self.assertEqual(assessments.count(), 4)
+        expected = {}
+        for assessment in assessments:
+            for name in assessment.platforms:
+                expected[name] = expected.get(name, 0) + 1
+
+        counts = platform_counts(assessments)
+        self.assertEqual({name: n for name, n in counts.items() if n}, expected)
+        self.assertEqual(counts["YouTube"], 2)
+
+        by_gender = platform_counts_by(assessments, "gender")
+        self.assertEqual(by_gender["Female"]["YouTube"], 1)
+        self.assertEqual(by_gender["Male"]["TikTok"], 1)
+        self.assertEqual(with_platform(assessments, Platform.YOUTUBE).count(), 2)
+
+
+class CompactionTest(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+        for answers in [
+            {}, dict(gender="Female", night_phone_use="Never", platforms=["Snapchat"]), dict(age=19, da1=1), {},
+            dict(age=30, self_rated_da="severe"),
+        ]:
+            self.client.post(
+                "/api/assessment/predict/", dict(PAYLOAD, **answers), content_type="application/json",
+            )
+        # All but the newest are from two years ago
+        newest = DigitalAddictionAssessment.objects.latest("id")
+        DigitalAddictionAssessment.objects.exclude(id=newest.id).update(
+            created_at=timezone.now() - datetime.timedelta(days=730),
+        )
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+
+    def insights(self):
+        from dashboards.views import insights_context
+
+        context = insights_context()
+        numbers = {key: value for key, value in context.items() if key == "total_assessments" or key.startswith("avg_")}
+        totals = context["live_totals"]
+        return numbers, {key: value for key, value in totals.items() if key != "last_id"}
+
+    def test_insights_are_unchanged_by_compaction(self):
+        import gzip
+
+        from django.core.management import call_command
+
+        from assessment.models import AssessmentRollup
+
+        before = self.insights()
+        call_command("compact_assessments", months=1, batch_size=3, archive_dir=self.archive_dir, stdout=io.StringIO())
+
+        self.assertEqual(DigitalAddictionAssessment.objects.count(), 1)
+        self.assertEqual(sum(AssessmentRollup.objects.values_list("count", flat=True)), 4)
+        # The two identical answers share a rollup row
+        self.assertEqual(AssessmentRollup.objects.count(), 3)
+
+        numbers, totals = self.insights()
+        self.assertEqual(numbers, before[0])
+        self.assertEqual(json.dumps(totals, sort_keys=True), json.dumps(before[1], sort_keys=True))
+
+        (archive,) = os.listdir(self.archive_dir)
+        with gzip.open(os.path.join(self.archive_dir, archive)) as fh:
+            self.assertEqual(len(fh.readlines()), 4)
+
+    def test_each_students_newest_assessment_is_kept(self):
+        from django.core.management import call_command
+
+        DigitalAddictionAssessment.objects.update(created_at=timezone.now() - datetime.timedelta(days=730))
+        call_command("compact_assessments", months=1, archive_dir=self.archive_dir, stdout=io.StringIO())
+        self.assertEqual(DigitalAddictionAssessment.objects.count(), 1)
+
+
+class TriageQueueTest(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.students = [
+            User.objects.create_user(f"student{i}", password="test-password-123", role="student") for i in range(8)
+        ]
+        levels = [5, 4, 4, 4, 3, 2, 5, 5]
+        risks = ["Severe", "Moderate", "Severe", "Moderate", "Moderate", "Severe", "Mild", "Severe"]
+        for student, level, risk in zip(self.students, levels, risks):
+            create_assessment(
+                student, institute="Other College" if level == 3 else "Test College",
+                predicted_risk=risk, risk_confidence=level / 10, **{f"da{i}": level for i in range(1, 9)},
+            )
+        # The last student's newest assessment is no longer high risk
+        create_assessment(self.students[7], predicted_risk="Mild", **{f"da{i}": 1 for i in range(1, 9)})
+
+    def pages(self, **filters):
+        from assessment.triage import parse_cursor, triage_queue
+
+        pointers, after = [], None
+        while True:
+            page, cursor = triage_queue(after=after, limit=2, **filters)
+            self.assertLessEqual(len(page), 2)
+            pointers += page
+            if cursor is None:
+                return pointers
+            after = parse_cursor(cursor)
+
+    def test_pages_cover_the_queue_once_in_order(self):
+        from assessment.models import StudentRiskPointer
+
+        pointers = self.pages()
+        expected = sorted(
+            StudentRiskPointer.objects.filter(predicted_risk__in=["Moderate", "Severe"]),
+            key=lambda p: (-p.das_score, -p.student_id),
+        )
+        self.assertEqual([p.student_id for p in pointers], [p.student_id for p in expected])
+        self.assertEqual(len(pointers), 6)
+        # Ties on the DAS score are broken by student, across page boundaries
+        self.assertEqual([p.das_score for p in pointers], [5, 4, 4, 4, 3, 2])
+        self.assertNotIn(self.students[6].id, [p.student_id for p in pointers])
+        self.assertNotIn(self.students[7].id, [p.student_id for p in pointers])
+
+    def test_filters(self):
+        self.assertEqual(
+            [p.student_id for p in self.pages(institute="Other College")], [self.students[4].id],
+        )
+        self.assertEqual(len(self.pages(risks=["Severe"])), 3)
+        by_confidence = [p.risk_confidence for p in self.pages(sort="confidence")]
+        self.assertEqual(by_confidence, sorted(by_confidence, reverse=True))
+
+    def test_parse_filters_rejects_bad_input(self):
+        from django.http import QueryDict
+
+        from assessment.triage import parse_filters
+
+        for query in ("risk=Extreme", "sort=name", "since=yesterday", "cursor=abc", "limit=many"):
+            with self.assertRaises(ValueError):
+                parse_filters(QueryDict(query))
+        filters = parse_filters(QueryDict("risk=Severe&limit=1000&cursor=4.0:12"))
+        self.assertEqual((filters["risks"], filters["limit"], filters["after"]), (["Severe"], 200, (4.0, 12)))
+
+
+class InstituteTest(TestCase):
+
+    def test_spellings_resolve_to_one_institute(self):
+        from assessment.institutes import UNSPECIFIED, institute_key, resolve_institute
+        from assessment.models import Institute
+
+        self.assertEqual(institute_key("  Test   College. "), "test college")
+        first = resolve_institute("Test College")
+        for spelling in ("test  college", "TEST COLLEGE.", " Test-College "):
+            self.assertEqual(resolve_institute(spelling), first)
+        self.assertEqual(Institute.objects.get(id=first).name, "Test College")
+
+        self.assertEqual(Institute.objects.get(id=resolve_institute("  ")).name, UNSPECIFIED)
+        self.assertEqual(resolve_institute(None), resolve_institute(""))
+        self.assertEqual(Institute.objects.count(), 2)
+
+    def test_staff_alias_merges_a_spelling(self):
+        from assessment.institutes import find_institute, resolve_institute
+        from assessment.models import Institute, InstituteAlias
+
+        university = Institute.objects.create(name="Tribhuvan University")
+        self.assertIsNone(find_institute("T.U."))
+        InstituteAlias.objects.create(key="t u", institute=university)
+
+        student = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        assessment = create_assessment(student, institute="T.U.")
+        self.assertEqual(assessment.institute_id, university.id)
+        self.assertEqual(assessment.institute_name, "T.U.")
+        self.assertEqual(resolve_institute("tribhuvan university"), university.id)
+
+    def test_lost_alias_is_recreated_for_the_existing_institute(self):
+        from assessment.institutes import resolve_institute
+        from assessment.models import Institute, InstituteAlias
+
+        college = Institute.objects.create(name="Test College")
+        InstituteAlias.objects.filter(institute=college).delete()
+
+        self.assertEqual(resolve_institute("Test College"), college.id)
+        self.assertEqual(list(college.aliases.values_list("key", flat=True)), ["test college"])
+        self.assertEqual(Institute.objects.count(), 1)
+
+    def test_queue_filters_by_any_spelling(self):
+        from assessment.triage import triage_queue
+
+        student = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        create_assessment(student, institute="Test College", predicted_risk="Severe")
+
+        pointers, _ = triage_queue(institute="test college.")
+        self.assertEqual([p.student_id for p in pointers], [student.id])
+        self.assertEqual(triage_queue(institute="Unknown School")[0], [])
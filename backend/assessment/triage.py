@@ -0,0 +1,101 @@
+"""
+Staff triage queue: each student's latest assessment, highest risk first.
+
+The queue reads StudentRiskPointer, one row per student, so it never has
+to work out which assessment is each student's latest. The default queue
+(Moderate and Severe students) is served by a partial index in each sort
+order, and pages are fetched by keyset on (sort value, student id): a
+deep page costs the same as the first, whatever the table size.
+"""
+import datetime
+
+from django.db.models import Q
+
+from assessment.institutes import find_institute
+from assessment.models import TRIAGE_RISKS, StudentRiskPointer
+from ml.predictor import RISK_LABELS
+
+# ?sort= value -> StudentRiskPointer field, always descending
+SORT_FIELDS = {
+    "das": "das_score",
+    "confidence": "risk_confidence",
+}
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def parse_filters(params):
+    """
+    triage_queue() keyword arguments from query parameters:
+    risk (repeatable), institute, since and until (YYYY-MM-DD), sort,
+    cursor and limit. Raises ValueError on invalid values.
+    """
+    risks = [risk for risk in params.getlist("risk") if risk]
+    unknown = set(risks) - set(RISK_LABELS.values())
+    if unknown:
+        raise ValueError(f"Unknown risk level: {', '.join(sorted(unknown))}.")
+
+    sort = params.get("sort") or "das"
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_FIELDS)}.")
+
+    dates = {}
+    for name in ("since", "until"):
+        if params.get(name):
+            try:
+                dates[name] = datetime.date.fromisoformat(params[name])
+            except ValueError:
+                raise ValueError(f"{name} must be a date (YYYY-MM-DD).")
+
+    try:
+        limit = min(max(int(params.get("limit") or PAGE_SIZE), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("limit must be a number.")
+
+    return dict(
+        risks=risks or TRIAGE_RISKS,
+        institute=(params.get("institute") or "").strip() or None,
+        sort=sort,
+        after=parse_cursor(params["cursor"]) if params.get("cursor") else None,
+        limit=limit,
+        **dates,
+    )
+
+
+def parse_cursor(cursor):
+    """
+    (sort value, student id) from a cursor returned by triage_queue().
+    """
+    try:
+        value, student_id = cursor.rsplit(":", 1)
+        return float(value), int(student_id)
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+
+
+def triage_queue(risks=TRIAGE_RISKS, institute=None, since=None, until=None, sort="das", after=None, limit=PAGE_SIZE):
+    """
+    One page of the queue: (pointers, next cursor or None on the last page).
+    """
+    field = SORT_FIELDS[sort]
+
+    queue = StudentRiskPointer.objects.filter(predicted_risk__in=risks)
+    if institute:
+        queue = queue.filter(institute_id=find_institute(institute))
+    if since:
+        queue = queue.filter(assessed_at__date__gte=since)
+    if until:
+        queue = queue.filter(assessed_at__date__lte=until)
+    if after:
+        value, student_id = after
+        queue = queue.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "student_id__lt": student_id}))
+
+    pointers = list(
+        queue.select_related("student", "institute").order_by(f"-{field}", "-student_id")[:limit + 1]
+    )
+    if len(pointers) <= limit:
+        return pointers, None
+
+    pointers = pointers[:limit]
+    last = pointers[-1]
+    return pointers, f"{getattr(last, field)!r}:{last.student_id}"
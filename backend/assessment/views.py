@@ -1,20 +1,20 @@
-import numpy as np
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
-
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 
 from assessment.models import DigitalAddictionAssessment
-from ml.preprocessing import preprocess_assessment
-
-import plotly.graph_objects as go
-from plotly.offline import plot
+from assessment.platforms import PLATFORM_NAMES, platform_counts, platform_counts_by
+from assessment.rollups import rollup_counts, rollup_totals_by
+from ml.features import COLUMN_INDEX, feature_matrix
 
 from collections import Counter
 
+# NumPy, pandas and Plotly are imported inside the chart builders: this
+# module is imported by urls.py, and the login page shouldn't pay for them.
+#
+# The admin-wide charts also take `rollups`, an AssessmentRollup queryset of
+# compacted assessments (assessment/rollups.py) counted in with the live rows.
+
 @login_required
 def assessment_result_page(request, pk):
     # Only allow the logged-in user to access their assessment
@@ -29,72 +29,60 @@ def assessment_result_page(request, pk):
         {"assessment": assessment}
     )
 
-def generate_das_by_age_chart_interactive(assessments):
+def generate_das_by_age_chart_interactive(assessments, rollups=None):
     """
     Generates an interactive Plotly bar chart of average DAS (0-100%)
     across age groups, showing the number of assessments per group.
     
     Returns HTML div string to embed in the template.
     """
+    import numpy as np
+    import plotly.graph_objects as go
+    from plotly.offline import plot
 
-    # Custom age groups
+
+    # Custom age groups: [sum of normalized DAS, number of assessments]
     age_groups = {
-        "15-20": [],
-        "21-25": [],
-        "26-30": [],
-        "31-35": [],
-        "36-40": [],
-        "41-45": [],
-        "46+": [],
+        "15-20": [0.0, 0],
+        "21-25": [0.0, 0],
+        "26-30": [0.0, 0],
+        "31-35": [0.0, 0],
+        "36-40": [0.0, 0],
+        "41-45": [0.0, 0],
+        "46+": [0.0, 0],
     }
 
     # Normalization parameters for DAS
     min_score, max_score = 1, 5  # 1–5 scale
 
-    for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
-        age = numeric_features.get("age")
-        das = numeric_features.get("DAS_weighted", 0)
+    # Age and DAS from the stored feature vectors
+    rows = [(age, das, 1) for age, das in feature_matrix(assessments)[:, [COLUMN_INDEX["age"], COLUMN_INDEX["DAS_weighted"]]]]
 
-        # Convert Series / NumPy types to scalar
-        if hasattr(age, "item"):
-            age = age.item()
-        if hasattr(das, "item"):
-            das = das.item()
+    # Compacted assessments: (age, mean DAS, how many)
+    if rollups is not None:
+        rows += [
+            (age, totals["das_total"] / totals["count"], totals["count"])
+            for age, totals in rollup_totals_by(rollups, "age").items()
+            if totals["count"]
+        ]
 
-        if age is None:
-            continue
-
-        try:
-            age = int(age)
-            das = float(das)
-        except (ValueError, TypeError):
-            continue
+    for age, das, count in rows:
+        age = int(age)
+        das = float(das)
 
         # Normalize DAS to 0-100%
         das_normalized = ((das - min_score) / (max_score - min_score)) * 100
         das_normalized = min(max(das_normalized, 0), 100)
 
         # Assign to age group
-        if 15 <= age <= 20:
-            age_groups["15-20"].append(das_normalized)
-        elif 21 <= age <= 25:
-            age_groups["21-25"].append(das_normalized)
-        elif 26 <= age <= 30:
-            age_groups["26-30"].append(das_normalized)
-        elif 31 <= age <= 35:
-            age_groups["31-35"].append(das_normalized)
-        elif 36 <= age <= 40:
-            age_groups["36-40"].append(das_normalized)
-        elif 41 <= age <= 45:
-            age_groups["41-45"].append(das_normalized)
-        else:
-            age_groups["46+"].append(das_normalized)
+        group = age_groups[das_age_group(age)]
+        group[0] += das_normalized * count
+        group[1] += count
 
     # Compute averages and counts
     labels = list(age_groups.keys())
-    avg_scores = [round(np.mean(values), 1) if values else 0 for values in age_groups.values()]
-    counts = [len(values) for values in age_groups.values()]
+    avg_scores = [round(total / count, 1) if count else 0 for total, count in age_groups.values()]
+    counts = [count for _, count in age_groups.values()]
 
     # Create interactive bar chart
     fig = go.Figure(
@@ -136,30 +124,29 @@ night_map = {
 # Reverse mapping for dynamic chart
 reverse_night_map = {v: k for k, v in night_map.items()}
 
-def create_late_night_pie_chart(assessments):
+def create_late_night_pie_chart(assessments, rollups=None):
     """
     Create a dynamic pie chart for Night-time Phone Usage.
     Maps numeric preprocessed values back to original labels.
     """
+    import plotly.graph_objects as go
+    from plotly.offline import plot
+
     # Fixed label order and colors
     labels = ["Never", "<30m", "30–60m", "1–2h", ">2h"]
     colors = ["#1f77b4", "#d62728", "#ff7f0e", "#2ca02c", "#9467bd"]
 
     # Collect raw numeric values from assessments
-    raw_values = []
-    for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
-        night_use_value = numeric_features.get("night_phone_use", 0)
-        if hasattr(night_use_value, 'iloc'):
-            night_use_value = night_use_value.iloc[0]
-
-        raw_values.append(night_use_value)
+    raw_values = feature_matrix(assessments)[:, COLUMN_INDEX["night_phone_use"]].tolist()
 
     # Map numeric values back to labels
     mapped_labels = [reverse_night_map.get(val, "Never") for val in raw_values]
 
     # Count occurrences for each label
     count_data = Counter(mapped_labels)
+    if rollups is not None:
+        for answer, count in rollup_counts(rollups, "night_phone_use").items():
+            count_data[answer if answer in night_map else "Never"] += count
     values = [count_data.get(label, 0) for label in labels]
 
     # Handle empty dataset
@@ -184,7 +171,7 @@ def create_late_night_pie_chart(assessments):
     )
 
     # Convert to HTML div
-    pie_div = plot(pie_fig, output_type='div', include_plotlyjs=True)
+    pie_div = plot(pie_fig, output_type='div', include_plotlyjs=False)
     return pie_div
 
 
@@ -219,31 +206,45 @@ def get_age_group(age):
             return group
     return "Unknown"
 
-def create_night_phone_by_age_percentage_bar_chart(assessments):
+def das_age_group(age):
+    """
+    Age group in the DAS chart, where ages outside every group count as 46+.
+    """
+    group = get_age_group(age)
+    return "46+" if group == "Unknown" else group
+
+def create_night_phone_by_age_percentage_bar_chart(assessments, rollups=None):
     """
     Creates a stacked bar chart showing percentage distribution of night-time phone use
     across custom age groups (15-20, 21-25, …, 46+).
     """
+    import pandas as pd
+    import plotly.graph_objects as go
+    from plotly.offline import plot
+
     # Collect data
     data = []
-    for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
-        night_use_value = numeric_features.get("night_phone_use", 0)
+    assessments = list(assessments)
+    night_use_values = feature_matrix(assessments)[:, COLUMN_INDEX["night_phone_use"]].tolist()
+    for assessment, night_use_value in zip(assessments, night_use_values):
         age = getattr(assessment, "age", None)
-        
-        if hasattr(night_use_value, 'iloc'):
-            night_use_value = night_use_value.iloc[0]
-        if hasattr(age, 'iloc'):
-            age = age.iloc[0]
-        
+
         night_label = reverse_night_map.get(night_use_value, "Never")
         age_group = get_age_group(age) if age is not None else "Unknown"
-        data.append({"age_group": age_group, "night_use": night_label})
-    
-    df = pd.DataFrame(data)
+        data.append({"age_group": age_group, "night_use": night_label, "count": 1})
+
+    if rollups is not None:
+        for (age, answer), count in rollup_counts(rollups, "age", "night_phone_use").items():
+            data.append({
+                "age_group": get_age_group(age),
+                "night_use": answer if answer in night_map else "Never",
+                "count": count,
+            })
+
+    df = pd.DataFrame(data, columns=["age_group", "night_use", "count"])
 
     # Aggregate counts
-    grouped_counts = df.groupby(["age_group", "night_use"]).size().unstack(fill_value=0)
+    grouped_counts = df.groupby(["age_group", "night_use"])["count"].sum().unstack(fill_value=0)
     grouped_counts = grouped_counts.reindex(columns=list(night_map.keys()), fill_value=0)
     grouped_counts = grouped_counts.reindex(index=age_group_order, fill_value=0)
 
@@ -273,37 +274,27 @@ def create_night_phone_by_age_percentage_bar_chart(assessments):
     )
 
     # Convert to HTML div for Django
-    bar_div = plot(fig, output_type='div', include_plotlyjs=True)
+    bar_div = plot(fig, output_type='div', include_plotlyjs=False)
     return bar_div
 
 
 
 
-def create_platform_bar_chart(assessments):
+def create_platform_bar_chart(assessments, rollups=None):
     """
     Creates a bar chart showing the count of users per platform.
     Platforms considered: YouTube, TikTok, Instagram, Facebook, WhatsApp, X, Snapchat, Gaming
     """
-    # Full platform list in desired order
-    platform_order = ["YouTube", "TikTok", "Instagram", "Facebook",
-                      "WhatsApp", "X", "Snapchat", "Gaming"]
+    import plotly.graph_objects as go
+    from plotly.offline import plot
 
-    # Collect all platforms used
-    all_platforms = []
-    for assessment in assessments:
-        # Each assessment should have a 'platforms' attribute (list of platform names)
-        platforms = getattr(assessment, "platforms", [])
-        if platforms is None:
-            platforms = []
-        # If platforms is a Pandas series, get the first value
-        if hasattr(platforms, 'iloc'):
-            platforms = platforms.iloc[0]
-        # Extend list
-        all_platforms.extend(platforms)
-
-    # Count occurrences of each platform
-    platform_counts = Counter(all_platforms)
-    counts_ordered = [platform_counts.get(p, 0) for p in platform_order]
+    # One grouped query over the platform bitmask
+    counts = platform_counts(assessments)
+    if rollups is not None:
+        for name, count in platform_counts(rollups, weight="count").items():
+            counts[name] += count
+    platform_order = list(counts)
+    counts_ordered = list(counts.values())
 
     # Create bar chart
     fig = go.Figure(go.Bar(
@@ -322,12 +313,12 @@ def create_platform_bar_chart(assessments):
     )
 
     # Convert to HTML div for Django template
-    platform_bar_div = plot(fig, output_type='div', include_plotlyjs=True)
+    platform_bar_div = plot(fig, output_type='div', include_plotlyjs=False)
     return platform_bar_div
 
 
 
-def create_platform_bar_chart_by_gender(assessments):
+def create_platform_bar_chart_by_gender(assessments, rollups=None):
     """
     Creates an interactive grouped bar chart showing
     platform usage count segmented by gender.
@@ -335,39 +326,27 @@ def create_platform_bar_chart_by_gender(assessments):
     Platforms considered:
     YouTube, TikTok, Instagram, Facebook, WhatsApp, X, Snapchat, Gaming
     """
+    import plotly.graph_objects as go
+    from plotly.offline import plot
+
 
     # Platform order (fixed)
-    platform_order = [
-        "YouTube", "TikTok", "Instagram", "Facebook",
-        "WhatsApp", "X", "Snapchat", "Gaming"
-    ]
+    platform_order = list(PLATFORM_NAMES.values())
 
     # Supported genders (normalize if needed)
     gender_order = ["Male", "Female"]
 
-    # Initialize counter: gender -> platform -> count
+    # gender -> platform -> count, from one grouped query over the bitmask
+    by_gender = platform_counts_by(assessments, "gender")
+    if rollups is not None:
+        for gender, counts in platform_counts_by(rollups, "gender", weight="count").items():
+            totals = by_gender.setdefault(gender, dict.fromkeys(counts, 0))
+            for name, count in counts.items():
+                totals[name] += count
     gender_platform_counts = {
-        gender: Counter() for gender in gender_order
+        gender: by_gender.get(gender, {}) for gender in gender_order
     }
 
-    # Collect data
-    for assessment in assessments:
-        gender = getattr(assessment, "gender", None)
-        if gender not in gender_order:
-            continue
-
-        platforms = getattr(assessment, "platforms", [])
-        if platforms is None:
-            platforms = []
-
-        # Handle pandas Series case
-        if hasattr(platforms, "iloc"):
-            platforms = platforms.iloc[0]
-
-        for platform in platforms:
-            if platform in platform_order:
-                gender_platform_counts[gender][platform] += 1
-
     # Build Plotly traces
     traces = []
     for gender in gender_order:
@@ -399,7 +378,7 @@ def create_platform_bar_chart_by_gender(assessments):
     platform_gender_bar_div = plot(
         fig,
         output_type="div",
-        include_plotlyjs=True
+        include_plotlyjs=False
     )
 
     return platform_gender_bar_div
@@ -407,19 +386,25 @@ def create_platform_bar_chart_by_gender(assessments):
 
 
 
-def create_self_rated_digital_addiction_pie_chart(assessments):
+# 🔹 Mapping: DB value -> Display label
+SELF_RATED_LABELS = {
+    "not_at_risk": "Not at risk",
+    "mild": "Mild",
+    "moderate": "Moderate",
+    "severe": "Severe",
+}
+
+
+def create_self_rated_digital_addiction_pie_chart(assessments, rollups=None):
     """
     Google-Forms–style pie chart for self-rated digital addiction risk.
     Handles snake_case DB values correctly.
     """
+    import plotly.graph_objects as go
+    from plotly.offline import plot
 
-    # 🔹 Mapping: DB value -> Display label
-    risk_label_map = {
-        "not_at_risk": "Not at risk",
-        "mild": "Mild",
-        "moderate": "Moderate",
-        "severe": "Severe",
-    }
+
+    risk_label_map = SELF_RATED_LABELS
 
     # Fixed display order
     risk_order = ["Not at risk", "Mild", "Moderate", "Severe"]
@@ -443,6 +428,11 @@ def create_self_rated_digital_addiction_pie_chart(assessments):
                 normalized_risks.append(risk_label_map[raw_risk])
 
     risk_counts = Counter(normalized_risks)
+    if rollups is not None:
+        for raw_risk, count in rollup_counts(rollups, "self_rated_da").items():
+            raw_risk = str(raw_risk).strip().lower()
+            if raw_risk in risk_label_map:
+                risk_counts[risk_label_map[raw_risk]] += count
     counts_ordered = [risk_counts.get(risk, 0) for risk in risk_order]
     total_responses = sum(counts_ordered)
 
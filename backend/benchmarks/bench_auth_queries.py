@@ -0,0 +1,115 @@
+"""
+Database queries per authenticated request, with database sessions and
+the stock ModelBackend versus the project's accounts.sessions engine and
+CachedModelBackend.
+
+    python benchmarks/bench_auth_queries.py [--settings daras.settings] [--requests 20]
+
+Runs against a throwaway test database (created and destroyed here) with
+one student and one assessment. For each configuration the student logs
+in, every URL is requested once to warm the caches, then --requests more
+times while the queries are counted. Session and user queries are the
+ones touching django_session, the user table or the 'shared' cache's
+table, which holds the auth epoch that keeps each process's copies of
+the session and the user coherent.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CONFIGS = {
+    "db sessions + ModelBackend": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "AUTHENTICATION_BACKENDS": ["django.contrib.auth.backends.ModelBackend"],
+    },
+    # The project settings
+    "accounts.sessions + CachedModelBackend": {},
+}
+
+ANSWERS = {
+    "institute_name": "Benchmark College", "age": 20, "gender": "Female",
+    **{f"da{i}": 3 for i in range(1, 9)},
+    "primary_device": "Smartphone", "own_smartphone": "Yes", "mobile_data": "Always",
+    "screen_weekdays": "4–6h", "screen_weekends": ">6h", "night_phone_use": "1–2h",
+    "notif_per_hour": "11–20 times", "social_time": "2–3h", "gaming_time": "<30m",
+    "platforms": ["YouTube", "TikTok"], "self_rated_da": "moderate",
+}
+
+
+def measure(urls, overrides, requests):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    user_table = get_user_model()._meta.db_table
+    tables = ["django_session", f'"{user_table}"', settings.CACHES["shared"]["LOCATION"]]
+    results = {}
+    with override_settings(**overrides):
+        for cache in caches.all():
+            cache.clear()
+        client = Client()
+        assert client.login(username="bench_student", password="bench-password")
+
+        for url in urls:
+            client.get(url)     # warm up
+
+            totals, auth, times = [], [], []
+            for _ in range(requests):
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.get(url)
+                times.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, (url, response.status_code)
+                totals.append(len(ctx.captured_queries))
+                auth.append(sum(
+                    1 for q in ctx.captured_queries
+                    if any(table in q["sql"] for table in tables)
+                ))
+            results[url] = (statistics.mean(totals), statistics.mean(auth), statistics.median(times))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE", "daras.settings"))
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    import django
+
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from assessment.models import DigitalAddictionAssessment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        student = get_user_model().objects.create_user("bench_student", password="bench-password", role="student")
+        assessment = DigitalAddictionAssessment.objects.create(student=student, **ANSWERS)
+
+        urls = ["/dashboards/student/", f"/api/assessment/{assessment.id}/", "/assessments/history/"]
+        rows = {name: measure(urls, overrides, args.requests) for name, overrides in CONFIGS.items()}
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"{'configuration':40} {'url':28} {'queries':>8} {'session+user':>13} {'median ms':>10}")
+    for name, results in rows.items():
+        for url, (total, auth, ms) in results.items():
+            print(f"{name:40} {url:28} {total:8.1f} {auth:13.1f} {ms:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
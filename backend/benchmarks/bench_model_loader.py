@@ -0,0 +1,73 @@
+"""
+Compare worker-side model loading: joblib pickle vs memory-mapped arrays.
+
+Each loader runs in a fresh interpreter (as a new gunicorn worker would),
+loads the model, scores one row and reports wall time and memory:
+
+    python benchmarks/bench_model_loader.py [--runs 7]
+
+RssAnon is memory private to the process; RssFile is file-backed and
+shared through the page cache (where the mmap'd arrays live).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADERS = {
+    "joblib": """
+import joblib
+model = joblib.load(os.path.join(BACKEND_DIR, "ml", "logistic_regression.pkl"))
+import pandas as pd
+X = pd.DataFrame([[0.0] * len(model.feature_names_in_)], columns=model.feature_names_in_)
+""",
+    "mmap": """
+from ml.artifact import load_artifact
+model = load_artifact(os.path.join(BACKEND_DIR, "ml", "artifacts", "logistic_regression"))
+import numpy as np
+X = np.zeros((1, len(model.feature_names_in_)))
+""",
+}
+
+TEMPLATE = """
+import json, os, sys, time, warnings
+warnings.filterwarnings("ignore")
+BACKEND_DIR = {backend!r}
+sys.path.insert(0, BACKEND_DIR)
+started = time.perf_counter()
+{loader}
+model.predict_proba(X)
+elapsed = time.perf_counter() - started
+status = dict(line.split(":", 1) for line in open("/proc/self/status") if ":" in line)
+kb = lambda key: int(status.get(key, "0 kB").split()[0])
+print(json.dumps({{"seconds": elapsed, "rss_kb": kb("VmRSS"), "anon_kb": kb("RssAnon"), "file_kb": kb("RssFile")}}))
+"""
+
+
+def run_loader(name):
+    code = TEMPLATE.format(backend=BACKEND_DIR, loader=LOADERS[name])
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'loader':<8}{'load+score ms':>15}{'RSS MiB':>10}{'anon MiB':>10}{'file MiB':>10}")
+    for name in LOADERS:
+        runs = [run_loader(name) for _ in range(args.runs)]
+        median = lambda key: statistics.median(run[key] for run in runs)
+        print(
+            f"{name:<8}{median('seconds') * 1000:>15.1f}{median('rss_kb') / 1024:>10.1f}"
+            f"{median('anon_kb') / 1024:>10.1f}{median('file_kb') / 1024:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
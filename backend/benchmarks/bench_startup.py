@@ -0,0 +1,92 @@
+"""
+Django boot time and time-to-first-request, with a regression guard.
+
+    python benchmarks/bench_startup.py [--settings daras.settings] [--runs 5]
+
+For each run a fresh interpreter is started with ``-X importtime``; it sets
+up Django, imports the URLconf (which imports every view) and serves the
+login page through the test client. The script reports the median
+wall times, RSS and the slowest top-level imports, and exits with status 1 if
+any of the heavy plotting/ML libraries got imported along the way.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only ever be imported on first use, never at boot
+HEAVY_MODULES = ["sklearn", "scipy", "pandas", "plotly", "matplotlib", "joblib", "numpy"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+import daras.urls
+booted = time.perf_counter()
+
+from django.test import Client
+response = Client().get("/auth/login/")
+served = time.perf_counter()
+status = dict(line.split(":", 1) for line in open("/proc/self/status") if ":" in line)
+
+print(json.dumps({
+    "rss_mb": int(status["VmRSS"].split()[0]) / 1024,
+    "boot_ms": (booted - started) * 1000,
+    "first_request_ms": (served - started) * 1000,
+    "status": response.status_code,
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def run_probe(settings_module):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, PYTHONWARNINGS="ignore")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    # Top-level imports only (two spaces of indentation in -X importtime)
+    result["imports"] = [
+        (match.group(4), int(match.group(2)) / 1000)
+        for match in map(IMPORTTIME_LINE.match, proc.stderr.splitlines())
+        if match and len(match.group(3)) == 1
+    ]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--settings", default=os.environ.get("DJANGO_SETTINGS_MODULE", "daras.settings"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list.")
+    args = parser.parse_args()
+
+    runs = [run_probe(args.settings) for _ in range(args.runs)]
+
+    print(f"boot (setup + URLconf): {statistics.median(r['boot_ms'] for r in runs):8.1f} ms")
+    print(f"first request (login):  {statistics.median(r['first_request_ms'] for r in runs):8.1f} ms")
+    print(f"RSS after request:      {statistics.median(r['rss_mb'] for r in runs):8.1f} MiB")
+    print()
+    print("slowest top-level imports (last run):")
+    for name, ms in sorted(runs[-1]["imports"], key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    if heavy:
+        print()
+        print(f"FAIL: heavy modules imported at boot: {', '.join(heavy)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Per-worker unique set size (USS) under gunicorn, with and without preload.
+
+    python benchmarks/bench_worker_uss.py --username student --password ... \
+        [--workers 4] [--requests 64]
+
+For each mode a gunicorn server is started from gunicorn.conf.py, logged
+into with the given student account and sent predict requests so every
+worker has scored at least once (i.e. touched the model, the feature maps
+and pandas/sklearn). Then /proc/<pid>/smaps_rollup is read for each worker:
+
+    USS = Private_Clean + Private_Dirty   memory only this worker holds
+    PSS                                   shared pages split between sharers
+
+Linux only. Needs a database the server can reach for login and predict.
+Predict is rate limited per user (predict_user in DEFAULT_THROTTLE_RATES);
+throttled requests are retried after their Retry-After, so raise the rate
+for the run to keep the warm-up short.
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAYLOAD = {
+    "institute": "Benchmark College", "age": 20, "gender": "Female",
+    "da1": 3, "da2": 4, "da3": 2, "da4": 5, "da5": 1, "da6": 3, "da7": 2, "da8": 4,
+    "primary_device": "Smartphone", "own_smartphone": "Yes", "mobile_data": "Always",
+    "screen_weekdays": "4–6h", "screen_weekends": ">6h", "night_phone_use": "1–2h",
+    "notif_per_hour": "11–20 times", "social_time": "2–3h", "gaming_time": "<30m",
+    "platforms": ["YouTube"], "self_rated_da": "moderate",
+}
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values
+
+
+def worker_pids(master_pid):
+    with open(f"/proc/{master_pid}/task/{master_pid}/children") as fh:
+        return [int(pid) for pid in fh.read().split()]
+
+
+def wait_until_up(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(base_url + "/auth/login/", timeout=2)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    raise RuntimeError("gunicorn did not come up")
+
+
+def warm_workers(base_url, username, password, requests):
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        client.get("/auth/login/")
+        client.post("/auth/login/", data={
+            "username": username, "password": password,
+            "csrfmiddlewaretoken": client.cookies.get("csrftoken", ""),
+        })
+        for _ in range(requests):
+            while True:
+                response = client.post(
+                    "/api/assessment/predict/", json=PAYLOAD,
+                    headers={"X-CSRFToken": client.cookies.get("csrftoken", ""), "Connection": "close"},
+                )
+                if response.status_code not in (429, 503):
+                    break
+                time.sleep(int(response.headers.get("Retry-After", "1")))
+            response.raise_for_status()
+
+
+def measure(preload, args):
+    env = dict(
+        os.environ,
+        GUNICORN_PRELOAD="1" if preload else "0",
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_BIND=args.bind,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "daras.wsgi"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://{args.bind}"
+    try:
+        wait_until_up(base_url)
+        warm_workers(base_url, args.username, args.password, args.requests)
+        time.sleep(1)
+        workers = [smaps_rollup(pid) for pid in worker_pids(server.pid)]
+        master = smaps_rollup(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    uss = [(w["Private_Clean"] + w["Private_Dirty"]) / 1024 for w in workers]
+    pss = [w["Pss"] / 1024 for w in workers]
+    return {
+        "uss": statistics.median(uss),
+        "pss": statistics.median(pss),
+        "rss": statistics.median(w["Rss"] / 1024 for w in workers),
+        "total": sum(uss) + (master["Private_Clean"] + master["Private_Dirty"]) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--bind", default="127.0.0.1:8199")
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'USS/worker':>12}{'PSS/worker':>12}{'RSS/worker':>12}{'total USS':>12}   (MiB)")
+    for preload in (False, True):
+        result = measure(preload, args)
+        print(
+            f"{'preload' if preload else 'no preload':<12}{result['uss']:>12.1f}{result['pss']:>12.1f}"
+            f"{result['rss']:>12.1f}{result['total']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
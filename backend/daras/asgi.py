@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'daras.settings')
 
 application = get_asgi_application()
+
+# Warm up before the server takes requests (WARMUP_ON_STARTUP)
+from monitoring.warmup import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
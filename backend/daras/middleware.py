@@ -0,0 +1,13 @@
+from django.middleware.gzip import GZipMiddleware as DjangoGZipMiddleware
+
+
+class GZipMiddleware(DjangoGZipMiddleware):
+    """
+    GZipMiddleware that leaves server-sent event streams alone: gzip would
+    hold each event back until enough output piled up to compress.
+    """
+
+    def process_response(self, request, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            return response
+        return super().process_response(request, response)
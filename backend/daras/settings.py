@@ -34,12 +34,16 @@ INSTALLED_APPS = [
     'accounts',
     'dashboards',
     'assessment',
+    'monitoring',
+    'jobs',
     'rest_framework',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # WhiteNoise serves static files under runserver too
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
 ]
 
@@ -52,14 +56,26 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
     ],
+    # Token buckets for the predict endpoint (assessment/api/admission.py):
+    # bursts of N, refilled at N per period
+    "DEFAULT_THROTTLE_RATES": {
+        "predict_user": "6/min",
+        "predict_global": "600/min",
+    },
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Static files, answered before the rest of the stack (see STORAGES)
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Compresses dynamic responses, then ETags them for 304s on repeat visits
+    'daras.middleware.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.AuthenticationMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -104,6 +120,86 @@ DATABASES = {
     }
 }
 
+# Cache
+# 'default' is a per-process memory cache; it also keeps each process's
+# copies of logged-in sessions and users.
+# 'shared' is visible to every worker process. It holds sessions, the
+# users' auth epochs that keep those copies coherent, rate-limit
+# counters, and expensive dashboard results and their recompute locks
+# (dashboards/singleflight.py). Anything another worker must see
+# invalidated (a logout, a deactivated user) goes here.
+# Create its table with `manage.py createcachetable`; in production, a
+# memcached or Redis backend makes its reads cheaper than the database
+# queries they replace.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'daras',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'daras_cache',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # {% cache %} fragments (ASSESSMENT_FRAGMENT_SECONDS), kept apart so
+    # they never push sessions and users out of 'default'
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'daras-fragments',
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Rate-limit buckets live where every worker sees them. They are updated
+# with atomic add()s, so the limits are exact while the cache keeps their
+# entries; a bucket culled past MAX_ENTRIES starts full again
+THROTTLE_CACHE = 'shared'
+
+# Dashboard results are served as-is for FRESH seconds, then served stale
+# for up to STALE more seconds while one worker recomputes them
+DASHBOARD_CACHE = 'shared'
+INSIGHTS_FRESH_SECONDS = 300
+INSIGHTS_STALE_SECONDS = 3600
+
+# Rendered history rows and detail pages of an assessment, cached per
+# process under its id and updated_at: any save makes a new key, and the
+# old fragments just expire
+ASSESSMENT_FRAGMENT_SECONDS = 24 * 60 * 60
+
+# Warm up the model, scoring path, database connection and templates while
+# daras/wsgi.py or daras/asgi.py loads, before any request (see
+# monitoring/warmup.py). gunicorn.conf.py warms each worker up by itself
+WARMUP_ON_STARTUP = False
+
+# Live updates on the insights page (dashboards/live.py). Turn
+# INSIGHTS_STREAM on only when the ASGI application (daras/asgi.py) serves
+# /dashboards/admin/insights/stream/: a WSGI worker can't send the events
+# as they come. Without it, pages poll for new assessments every
+# INSIGHTS_UPDATES_POLL_SECONDS.
+INSIGHTS_STREAM = False
+INSIGHTS_UPDATES_POLL_SECONDS = 15
+
+# How often each ASGI process looks for new assessments while streams are
+# open, and the idle keep-alive interval
+INSIGHTS_STREAM_POLL_SECONDS = 2.0
+INSIGHTS_STREAM_KEEPALIVE_SECONDS = 15
+
+# Logged-in sessions and request.user are served from each process's
+# AUTH_LOCAL_CACHE while the user's auth epoch in the shared USER_CACHE is
+# unchanged: one shared-cache read per request for both. Saving the user
+# or saving or ending any of their sessions replaces the epoch, so a
+# logout or deactivation on one worker takes effect on all of them (see
+# accounts/sessions.py and accounts/backends.py). Sessions are written to
+# the database and to SESSION_CACHE_ALIAS, as with cached_db.
+SESSION_ENGINE = 'accounts.sessions'
+SESSION_CACHE_ALIAS = 'shared'
+
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend']
+AUTH_LOCAL_CACHE = 'default'
+USER_CACHE = 'shared'
+USER_CACHE_TIMEOUT = 60     # seconds a process keeps a user it hasn't seen change
+
 
 
 
@@ -142,12 +238,103 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    # plotly/plotly.min.js, from the plotly package
+    'daras.staticfiles.PlotlyFinder',
+]
+
+# `manage.py collectstatic` writes every file under a content-hashed name
+# (site.3f2a9c1e.js) with gzip and brotli copies next to it. WhiteNoise
+# serves the hashed names with a far-future "immutable" Cache-Control and
+# picks the precompressed copy the browser accepts, so a repeat visit
+# fetches nothing until a file changes (and with it, its name).
+# With DEBUG on, templates link the plain names and nothing is collected.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Monitoring
+# /metrics is scraped by a local Prometheus; other addresses get a 403.
+# Under gunicorn, gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR so samples
+# are aggregated across worker processes.
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Request profiling
+# Staff can profile any request with ?profile=1 or an "X-Daras-Profile: 1"
+# header. PROFILING_SAMPLE_RATE = N also profiles 1 in N requests (0 = off).
+PROFILING_SAMPLE_RATE = 0
+PROFILING_INTERVAL = 0.005           # seconds between stack samples
+PROFILING_MAX_PROFILES = 200         # oldest profiles are deleted beyond this
+PROFILING_MAX_BYTES = 256 * 1024     # folded stacks per profile
+
+# Risk model
+# Array export of the served model (ml/predictor.py MODEL_PATH), written by
+# `manage.py export_model_artifact`. Workers memory-map it instead of
+# unpickling the sklearn model; set to None to always use the pickle.
+ML_ARTIFACT_DIR = BASE_DIR / 'ml' / 'artifacts' / 'logistic_regression'
+
+# Features listed as the drivers of each prediction
+RISK_FACTOR_COUNT = 5
+
+# Feature drift: training-data histograms written by
+# `manage.py build_drift_baseline`, and the live window compared with them
+DRIFT_BASELINE_PATH = ML_ARTIFACT_DIR / 'drift_baseline.json'
+DRIFT_WINDOW_DAYS = 7
+
+# Checkpoints of the partial_fit model kept by
+# `manage.py update_incremental_model` (see ml/incremental.py)
+ML_INCREMENTAL_DIR = BASE_DIR / 'ml' / 'incremental'
+
+# Retention: `manage.py compact_assessments` folds assessments older than
+# this many whole months into per-institute monthly rollups and archives
+# the raw rows here as gzipped JSON Lines (see assessment/rollups.py)
+ASSESSMENT_RETENTION_MONTHS = 24
+ASSESSMENT_ARCHIVE_DIR = BASE_DIR / 'archive' / 'assessments'
+
+# Shadow model
+# Path to a candidate model pickle scored next to the live model, off the
+# request path. None disables shadow scoring.
+SHADOW_MODEL_PATH = None
+SHADOW_QUEUE_SIZE = 1000        # rows waiting to be scored; extra rows are dropped
+SHADOW_BATCH_SIZE = 32
+SHADOW_FLUSH_INTERVAL = 1.0     # seconds to wait for a batch to fill
+
+# Predict load shedding (assessment/api/admission.py): limits for each
+# worker process on its own (not site-wide) past which predict requests
+# get a 503 before any work is done
+PREDICT_SHED_QUEUE_SECONDS = 2.0      # waited behind the proxy (X-Request-Start)
+PREDICT_SHED_MAX_IN_FLIGHT = 4        # predictions running at once
+PREDICT_SHED_P99_SECONDS = 2.0        # p99 of recent predictions...
+PREDICT_SHED_WINDOW_SECONDS = 30      # ...finished in this window
+PREDICT_SHED_MIN_SAMPLES = 20
+PREDICT_SHED_RETRY_AFTER = 5          # seconds, sent as Retry-After
+
+# Background jobs
+# Work enqueued with jobs.registry.enqueue() runs in `manage.py run_worker`
+# processes (see jobs/worker.py). A failed job is retried after
+# JOB_BACKOFF_SECONDS, doubling per attempt up to JOB_MAX_BACKOFF_SECONDS; a
+# job still running after JOB_LEASE_SECONDS is taken to be abandoned by a
+# dead worker and queued again.
+JOB_MAX_ATTEMPTS = 5
+JOB_BACKOFF_SECONDS = 10
+JOB_MAX_BACKOFF_SECONDS = 3600
+JOB_LEASE_SECONDS = 3600
+JOB_POLL_SECONDS = 1.0          # idle workers check for due jobs this often
+
 LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = '/dashboards/student/'
 LOGOUT_REDIRECT_URL = '/auth/login/'
@@ -0,0 +1,59 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.templatetags.static import static
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from daras.middleware import GZipMiddleware
+from daras.staticfiles import PlotlyFinder
+
+
+class StaticFilesTest(TestCase):
+
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+
+    def test_collected_files_are_hashed_precompressed_and_immutable(self):
+        # This repo's files only: admin's and plotly's take long to compress
+        with override_settings(
+            STATIC_ROOT=self.static_root,
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+
+            hashed = static("js/site.js")
+            self.assertRegex(hashed, r"^/static/js/site\.[0-9a-f]{12}\.js$")
+            path = os.path.join(self.static_root, hashed.removeprefix("/static/"))
+            for suffix in ("", ".gz", ".br"):
+                self.assertTrue(os.path.exists(path + suffix), path + suffix)
+
+            # A fresh client loads WhiteNoise with the collected files
+            response = Client().get(hashed, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertIn("immutable", response["Cache-Control"])
+            with open(os.path.join(settings.BASE_DIR, "static", "js", "site.js"), "rb") as fh:
+                self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), fh.read())
+
+    def test_plotly_bundle_is_found_in_the_package(self):
+        path = PlotlyFinder().find("plotly/plotly.min.js")
+        self.assertTrue(path and os.path.exists(path))
+
+
+class GZipTest(TestCase):
+
+    def test_pages_are_compressed_but_event_streams_are_not(self):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+        middleware = GZipMiddleware(lambda request: None)
+
+        page = middleware.process_response(request, HttpResponse("x" * 1000, content_type="text/html"))
+        self.assertEqual(page["Content-Encoding"], "gzip")
+
+        stream = StreamingHttpResponse(iter([b"data: 1\n\n"]), content_type="text/event-stream")
+        self.assertFalse(middleware.process_response(request, stream).has_header("Content-Encoding"))
@@ -15,6 +15,8 @@ def root_redirect(request):
 urlpatterns = [
     path('', root_redirect, name='root'),
     path('admin/', admin.site.urls),
+    path('', include('monitoring.urls')),
+    path('', include('jobs.urls')),
     path('auth/', include('accounts.urls')),
     path('dashboards/', include('dashboards.urls')),
     
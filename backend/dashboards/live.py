@@ -0,0 +1,273 @@
+"""
+Live updates for the admin insights page, over server-sent events.
+
+The page embeds insights_totals() for the data it was rendered from: the
+counts and sums behind every chart and summary card, and the id of the
+newest assessment included. It then opens the stream, and for each new
+batch of assessments receives the same totals computed over just those
+rows, which it adds to its own and redraws the charts in place.
+
+Each server process has one InsightsHub per event loop. While anyone is
+subscribed it polls for assessments newer than the last it has seen,
+once every INSIGHTS_STREAM_POLL_SECONDS, computes their totals once and
+puts the same serialized event on every subscriber's queue, so the
+database work per new batch doesn't grow with the number of open pages.
+A subscriber that is behind the hub (a cached page, a reconnect, a full
+queue) is caught up with one query for the rows it is missing.
+
+The stream can only be served by the ASGI application (daras/asgi.py
+under an ASGI server such as uvicorn), where every subscriber is a
+coroutine on one event loop. A WSGI server collects a streaming response
+in full before sending it, so an endless stream would never send an
+event and would hold its worker until it timed out: the view refuses
+WSGI requests, and pages only open the stream with INSIGHTS_STREAM on.
+Otherwise they poll the insights_updates view, which answers each poll
+with the next batch from new_assessments().
+"""
+import asyncio
+import json
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+
+from assessment.models import DigitalAddictionAssessment
+from assessment.platforms import PLATFORM_NAMES, platform_counts, platform_counts_by
+from assessment.rollups import SUMMED_COLUMNS, rollup_counts, rollup_totals, rollup_totals_by
+from assessment.views import (
+    SELF_RATED_LABELS,
+    age_group_order,
+    das_age_group,
+    get_age_group,
+    night_map,
+    reverse_night_map,
+)
+
+# As in the platform-by-gender chart
+GENDERS = ["Male", "Female"]
+
+# New assessments read per poll; a bigger backlog is sent over several events
+POLL_BATCH = 1000
+
+# Events waiting for a slow subscriber; past this, it is caught up instead
+QUEUE_SIZE = 100
+
+
+def _das_percent(das):
+    # 1-5 DAS as 0-100%, as in the DAS by age chart
+    return min(max((das - 1) / 4 * 100, 0), 100)
+
+
+def insights_totals(assessments, rollups=None):
+    """
+    Counts and sums behind the insights charts and cards for a list of
+    assessments, plus an AssessmentRollup queryset. JSON-ready; totals of
+    disjoint sets of assessments add up key by key.
+    """
+    from ml.features import COLUMN_INDEX, feature_matrix
+
+    assessments = list(assessments)
+    X = feature_matrix(assessments)
+    platform_names = list(PLATFORM_NAMES.values())
+
+    totals = {
+        "last_id": max((assessment.id for assessment in assessments), default=0),
+        "count": len(assessments),
+        "sums": {field: float(X[:, COLUMN_INDEX[column]].sum()) for field, column in SUMMED_COLUMNS.items()},
+        "das_by_age": {group: [0.0, 0] for group in age_group_order},
+        "night_use": dict.fromkeys(night_map, 0),
+        "night_by_age": {group: dict.fromkeys(night_map, 0) for group in age_group_order},
+        "platforms": dict.fromkeys(platform_names, 0),
+        "platforms_by_gender": {gender: dict.fromkeys(platform_names, 0) for gender in GENDERS},
+        "self_rated": dict.fromkeys(SELF_RATED_LABELS.values(), 0),
+    }
+
+    def add(age, das, das_age, night, gender, mask, self_rated, count=1):
+        if das is not None:
+            group = totals["das_by_age"][das_age_group(das_age)]
+            group[0] += _das_percent(das) * count
+            group[1] += count
+        if night is not None:
+            night = night if night in night_map else "Never"
+            totals["night_use"][night] += count
+            if age is not None and get_age_group(age) in totals["night_by_age"]:
+                totals["night_by_age"][get_age_group(age)][night] += count
+        if mask is not None:
+            for platform, name in PLATFORM_NAMES.items():
+                if mask & platform:
+                    totals["platforms"][name] += count
+                    if gender in totals["platforms_by_gender"]:
+                        totals["platforms_by_gender"][gender][name] += count
+        label = SELF_RATED_LABELS.get(str(self_rated or "").strip().lower())
+        if label:
+            totals["self_rated"][label] += count
+
+    columns = [COLUMN_INDEX["age"], COLUMN_INDEX["DAS_weighted"], COLUMN_INDEX["night_phone_use"]]
+    for assessment, (feature_age, das, night) in zip(assessments, X[:, columns].tolist()):
+        add(
+            assessment.age, das, int(feature_age), reverse_night_map.get(night, "Never"),
+            assessment.gender, assessment.platform_mask, assessment.self_rated_da,
+        )
+
+    if rollups is not None:
+        compacted = rollup_totals(rollups)
+        totals["count"] += compacted["count"]
+        for field in SUMMED_COLUMNS:
+            totals["sums"][field] += float(compacted[field])
+
+        for age, sums in rollup_totals_by(rollups, "age").items():
+            if sums["count"]:
+                add(None, sums["das_total"] / sums["count"], age, None, None, None, None, sums["count"])
+        for (age, night), count in rollup_counts(rollups, "age", "night_phone_use").items():
+            add(age, None, None, night, None, None, None, count)
+        for name, count in platform_counts(rollups, weight="count").items():
+            totals["platforms"][name] += count
+        for gender, counts in platform_counts_by(rollups, "gender", weight="count").items():
+            if gender in totals["platforms_by_gender"]:
+                for name, count in counts.items():
+                    totals["platforms_by_gender"][gender][name] += count
+        for self_rated, count in rollup_counts(rollups, "self_rated_da").items():
+            add(None, None, None, None, None, None, self_rated, count)
+
+    return totals
+
+
+def new_assessments(after, upto=None):
+    """
+    Serialized insights_totals() of up to POLL_BATCH assessments with an
+    id above `after` (and at most `upto`), or None if there are none.
+    """
+    rows = DigitalAddictionAssessment.objects.filter(id__gt=after).order_by("id")
+    if upto is not None:
+        rows = rows.filter(id__lte=upto)
+    rows = list(rows[:POLL_BATCH])
+    if not rows:
+        return None
+    return rows[-1].id, json.dumps({"after": after, **insights_totals(rows)})
+
+
+def newest_id():
+    return DigitalAddictionAssessment.objects.aggregate(newest=Max("id"))["newest"] or 0
+
+
+class InsightsHub:
+    """
+    Fans insights deltas out to the streams of one event loop.
+    """
+
+    def __init__(self):
+        self.subscribers = set()
+        self.last_id = None
+        self._task = None
+        self._started = None
+
+    async def subscribe(self):
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self._task is None:
+            self._started = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._poll())
+        try:
+            # Until the poller knows where the table ends
+            await asyncio.shield(self._started)
+        except BaseException:
+            self.subscribers.discard(queue)
+            raise
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _poll(self):
+        try:
+            try:
+                self.last_id = await sync_to_async(newest_id)()
+            except Exception as e:
+                self._started.set_exception(e)
+                return
+            self._started.set_result(None)
+
+            while self.subscribers:
+                await asyncio.sleep(settings.INSIGHTS_STREAM_POLL_SECONDS)
+                try:
+                    delta = await sync_to_async(new_assessments)(self.last_id)
+                except Exception as e:
+                    print("Insights stream poll failed:", e)
+                    continue
+                if delta is None:
+                    continue
+
+                event = (self.last_id, *delta)
+                self.last_id = delta[0]
+                for queue in list(self.subscribers):
+                    try:
+                        queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        pass    # it notices the gap and catches up
+        finally:
+            self._task = None
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """
+    The InsightsHub of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = InsightsHub()
+    return _hubs[loop]
+
+
+def _event(last_id, data):
+    return f"id: {last_id}\nevent: delta\ndata: {data}\n\n"
+
+
+async def insights_events(since):
+    """
+    Server-sent events for a page showing the assessments up to id
+    `since`: a "delta" event per batch of newer assessments, and a
+    comment every INSIGHTS_STREAM_KEEPALIVE_SECONDS so proxies keep the
+    connection open.
+    """
+    hub = get_hub()
+    queue = await hub.subscribe()
+    cursor = since
+
+    async def catch_up(upto):
+        # The rows a subscriber is missing, read for it alone
+        nonlocal cursor
+        while cursor < upto:
+            delta = await sync_to_async(new_assessments)(cursor, upto)
+            if delta is None:
+                cursor = upto
+                break
+            cursor, data = delta
+            yield _event(cursor, data)
+
+    try:
+        async for message in catch_up(hub.last_id):
+            yield message
+
+        while True:
+            try:
+                after, last_id, data = await asyncio.wait_for(
+                    queue.get(), settings.INSIGHTS_STREAM_KEEPALIVE_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if last_id <= cursor:
+                continue
+            if after == cursor:
+                cursor = last_id
+                yield _event(cursor, data)
+            else:
+                async for message in catch_up(last_id):
+                    yield message
+    finally:
+        hub.unsubscribe(queue)
@@ -0,0 +1,73 @@
+"""
+Single-flight, stale-while-revalidate caching for expensive dashboard
+computations.
+
+    value = cached_computation("insights", build, fresh=300, stale=3600)
+
+Values live in the DASHBOARD_CACHE cache, shared by every worker process,
+as (value, fresh_until). A fresh value is returned as is. Once it goes
+stale, the first caller to take the recompute lock (an atomic cache.add)
+recomputes and stores it; everyone else meanwhile gets the stale value,
+or, when there is none yet, polls for up to `wait` seconds for the
+recomputed one before giving up and computing it themselves. So a cold
+cache or an expiry costs one recomputation, not one per visitor.
+
+Outcomes are counted in monitoring.metrics.CACHED_COMPUTATIONS; "stale"
+and "waited" are requests coalesced into another caller's recomputation.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from monitoring.metrics import CACHED_COMPUTATIONS
+
+POLL_INTERVAL = 0.1
+
+
+def _cache():
+    return caches[settings.DASHBOARD_CACHE]
+
+
+def cached_computation(name, compute, fresh, stale, wait=5.0, lock_timeout=120):
+    """
+    compute()'s result, cached under `name` (see the module docstring).
+    """
+    cache = _cache()
+    key = f"singleflight:{name}"
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None and entry[1] > time.time():
+        CACHED_COMPUTATIONS.labels(name=name, outcome="fresh").inc()
+        return entry[0]
+
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, (value, time.time() + fresh), fresh + stale)
+        finally:
+            # Leave the lock alone if it expired and someone else took it
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        CACHED_COMPUTATIONS.labels(name=name, outcome="recomputed").inc()
+        return value
+
+    # Another caller is recomputing
+    if entry is not None:
+        CACHED_COMPUTATIONS.labels(name=name, outcome="stale").inc()
+        return entry[0]
+
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            CACHED_COMPUTATIONS.labels(name=name, outcome="waited").inc()
+            return entry[0]
+
+    CACHED_COMPUTATIONS.labels(name=name, outcome="timed_out").inc()
+    return compute()
+
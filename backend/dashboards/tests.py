@@ -1,3 +1,269 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from assessment.models import DigitalAddictionAssessment, LiveConfusionCell, ModelEvaluation
+from assessment.tests import PAYLOAD, create_assessment, run_concurrently
+from dashboards.singleflight import cached_computation
+from ml.predictor import MODEL_VERSION, SELF_RATED_RISK
+from ml.training import confusion_scores
+
+# Pages render without a collectstatic manifest (the test runner turns DEBUG off)
+TEMPLATE_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Plotting and ML libraries, only imported on first use
+HEAVY_MODULES = ["sklearn", "scipy", "pandas", "plotly", "matplotlib", "joblib", "numpy"]
+
+
+class LazyImportTest(SimpleTestCase):
+
+    def test_boot_imports_no_heavy_library(self):
+        probe = (
+            "import sys, django; django.setup(); import daras.urls; "
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", probe], cwd=settings.BASE_DIR, check=True, capture_output=True, text=True,
+            env=dict(os.environ, PYTHONWARNINGS="ignore"),
+        )
+        self.assertEqual(proc.stdout.strip(), "")
+
+
+class StaffTestCase(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user("admin1", password="test-password-123", role="admin", is_staff=True)
+        self.student = User.objects.create_user("student1", password="test-password-123", role="student")
+
+    def predict(self, **answers):
+        self.client.force_login(self.student)
+        response = self.client.post(
+            "/api/assessment/predict/", dict(PAYLOAD, **answers), content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+
+@override_settings(STORAGES=TEMPLATE_STORAGES)
+class MetricsTest(StaffTestCase):
+
+    def test_confusion_scores(self):
+        scores = confusion_scores(
+            [("Mild", "Mild", 3), ("Mild", "Severe", 1), ("Severe", "Severe", 2), ("Unknown", "Mild", 4)],
+            labels=["Mild", "Severe"],
+        )
+        self.assertEqual(scores["matrix"], [[3, 1], [0, 2]])
+        self.assertEqual(scores["total"], 10)
+        self.assertEqual(scores["accuracy"], 0.5)
+        self.assertEqual(scores["per_class"]["Mild"], {"precision": 1.0, "recall": 0.75, "support": 4})
+        self.assertAlmostEqual(scores["per_class"]["Severe"]["precision"], 2 / 3)
+
+    def test_scored_assessments_fill_the_live_confusion_matrix(self):
+        risks = [self.predict()["risk"] for _ in range(2)]
+
+        cells = LiveConfusionCell.objects.filter(model_version=MODEL_VERSION)
+        self.assertEqual(
+            sorted(cells.values_list("actual_risk", "predicted_risk", "count")),
+            [(SELF_RATED_RISK[PAYLOAD["self_rated_da"]], risks[0], 2)],
+        )
+
+        ModelEvaluation.objects.create(
+            model_version=MODEL_VERSION, accuracy=0.8, precision=0.7, recall=0.6, f1_score=0.65,
+            per_class={"Mild": {"precision": 0.7, "recall": 0.6, "f1_score": 0.65, "support": 10}},
+            confusion={"labels": ["Mild"], "matrix": [[10]]}, train_size=40, test_size=10,
+        )
+        self.client.force_login(self.staff)
+        response = self.client.get("/dashboards/admin/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["accuracy"], 80.0)
+        self.assertEqual(response.context["live_total"], 2)
+
+
+@override_settings(STORAGES=TEMPLATE_STORAGES)
+class TriagePageTest(StaffTestCase):
+
+    def test_next_page_link_and_errors(self):
+        from assessment.tests import create_assessment
+
+        for level in (5, 4):
+            student = get_user_model().objects.create_user(f"high{level}", password="test-password-123", role="student")
+            create_assessment(student, predicted_risk="Severe", **{f"da{i}": level for i in range(1, 9)})
+
+        self.client.force_login(self.staff)
+        first = self.client.get("/dashboards/admin/triage/", {"limit": 1})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([p.student.username for p in first.context["pointers"]], ["high5"])
+
+        second = self.client.get(f"/dashboards/admin/triage/?{first.context['next_query']}")
+        self.assertEqual([p.student.username for p in second.context["pointers"]], ["high4"])
+        self.assertIsNone(second.context["next_query"])
+
+        bad = self.client.get("/dashboards/admin/triage/", {"cursor": "nonsense"})
+        self.assertEqual(bad.status_code, 200)
+        self.assertEqual(bad.context["error"], "Invalid cursor.")
+
+        self.client.force_login(self.student)
+        self.assertEqual(self.client.get("/dashboards/admin/triage/").status_code, 302)
+
+
+# The test database's in-memory SQLite fails concurrent reads of the cache
+# table outright, so values live in this process's memory
+@override_settings(DASHBOARD_CACHE="default")
+class SingleFlightTest(TransactionTestCase):
+
+    def setUp(self):
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.addCleanup(caches["default"].delete_many, ["singleflight:test", "singleflight:test:lock"])
+
+    def compute(self):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(0.3)
+        return {"computed": calls}
+
+    def test_cold_cache_is_computed_once(self):
+        results = run_concurrently(
+            lambda: cached_computation("test", self.compute, fresh=60, stale=60, wait=5), threads=8,
+        )
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, [{"computed": 1}] * 8)
+
+        self.assertEqual(cached_computation("test", self.compute, fresh=60, stale=60), {"computed": 1})
+        self.assertEqual(self.calls, 1)
+
+    def test_stale_value_is_served_while_one_caller_recomputes(self):
+        cache = caches[settings.DASHBOARD_CACHE]
+        cache.set("singleflight:test", ({"computed": 0}, time.time() - 1), 60)
+
+        results = run_concurrently(
+            lambda: cached_computation("test", self.compute, fresh=60, stale=60), threads=6,
+        )
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(sorted(r["computed"] for r in results), [0, 0, 0, 0, 0, 1])
+        self.assertEqual(cache.get("singleflight:test")[0], {"computed": 1})
+        self.assertIsNone(cache.get("singleflight:test:lock"))
+
+
+class InsightsUpdatesTest(StaffTestCase):
+
+    def test_polling_returns_new_assessments(self):
+        from dashboards.live import insights_totals
+
+        first = self.predict()["id"]
+        second = self.predict(gender="Female", platforms=["Snapchat"])["id"]
+
+        response = self.client.get("/dashboards/admin/insights/updates/", {"since": first})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_login(self.staff)
+        response = self.client.get("/dashboards/admin/insights/updates/", {"since": first})
+        self.assertEqual(response.status_code, 200)
+        delta = response.json()
+        self.assertEqual((delta["after"], delta["last_id"], delta["count"]), (first, second, 1))
+        self.assertEqual(delta["platforms"]["Snapchat"], 1)
+
+        # A page's totals plus the delta are the totals of everything
+        page = insights_totals(DigitalAddictionAssessment.objects.filter(id__lte=first))
+        everything = insights_totals(DigitalAddictionAssessment.objects.all())
+        self.assertEqual(page["count"] + delta["count"], everything["count"])
+        self.assertEqual(page["platforms"]["YouTube"] + delta["platforms"]["YouTube"], everything["platforms"]["YouTube"])
+
+        self.assertEqual(self.client.get("/dashboards/admin/insights/updates/", {"since": second}).status_code, 204)
+        self.assertEqual(self.client.get("/dashboards/admin/insights/updates/", {"since": "x"}).status_code, 400)
+
+    def test_stream_is_not_served_under_wsgi(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get("/dashboards/admin/insights/stream/", {"since": 0}).status_code, 404)
+
+    @override_settings(STORAGES=TEMPLATE_STORAGES)
+    def test_page_carries_the_totals_it_was_drawn_from(self):
+        self.predict()
+        self.client.force_login(self.staff)
+        response = self.client.get("/dashboards/admin/insights/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_assessments"], 1)
+        self.assertEqual(response.context["live_totals"]["count"], 1)
+
+
+class InsightsStreamTest(TransactionTestCase):
+
+    def test_stream_sends_missed_assessments_as_a_delta(self):
+        User = get_user_model()
+        staff = User.objects.create_user("admin1", password="test-password-123", role="admin", is_staff=True)
+        student = User.objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(student)
+        created = self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json").json()["id"]
+
+        self.client.force_login(staff)
+        cookies = self.client.cookies
+
+        async def first_event():
+            client = AsyncClient()
+            client.cookies = cookies
+            response = await client.get("/dashboards/admin/insights/stream/", {"since": 0})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "text/event-stream")
+            events = aiter(response.streaming_content)
+            try:
+                return (await asyncio.wait_for(anext(events), 10)).decode()
+            finally:
+                await events.aclose()
+
+        event = asyncio.run(first_event())
+        lines = dict(line.split(": ", 1) for line in event.strip().splitlines())
+        self.assertEqual(lines["id"], str(created))
+        self.assertEqual(lines["event"], "delta")
+        self.assertEqual(json.loads(lines["data"])["count"], 1)
+
+
+@override_settings(STORAGES=TEMPLATE_STORAGES)
+class AssessmentFragmentTest(StaffTestCase):
+
+    def setUp(self):
+        super().setUp()
+        caches["template_fragments"].clear()
+        self.assessment = create_assessment(self.student, risk_confidence=41.5)
+        self.client.force_login(self.student)
+
+    def test_history_row_is_rendered_again_only_when_the_assessment_is_saved(self):
+        self.assertContains(self.client.get("/assessments/history/"), "41.5%")
+
+        # A write that leaves updated_at alone is served from the fragment
+        DigitalAddictionAssessment.objects.filter(pk=self.assessment.pk).update(risk_confidence=87.25)
+        self.assertContains(self.client.get("/assessments/history/"), "41.5%")
+
+        self.assessment.refresh_from_db()
+        self.assessment.save()
+        response = self.client.get("/assessments/history/")
+        self.assertContains(response, "87.25%")
+        self.assertNotContains(response, "41.5%")
+
+    def test_detail_page_follows_updated_at(self):
+        url = f"/students/assessments/{self.assessment.pk}/"
+        first = self.client.get(url).content
+
+        self.assessment.da1 = 5 if self.assessment.da1 != 5 else 1
+        DigitalAddictionAssessment.objects.filter(pk=self.assessment.pk).update(da1=self.assessment.da1)
+        self.assertEqual(self.client.get(url).content, first)
+
+        self.assessment.save()
+        self.assertNotEqual(self.client.get(url).content, first)
+
+    def test_other_students_assessments_are_not_served(self):
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(f"/students/assessments/{self.assessment.pk}/").status_code, 404)
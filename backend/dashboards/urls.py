@@ -13,7 +13,11 @@ urlpatterns = [
 
      # Admin pages
     path('admin/insights/', views.digital_behaviour_insights, name='insights'),
+    path('admin/insights/stream/', views.insights_stream, name='insights-stream'),
+    path('admin/insights/updates/', views.insights_updates, name='insights-updates'),
     path('admin/metrics/', views.metrics, name='metrics'),
+    path('admin/shadow/', views.shadow_report, name='shadow-report'),
+    path('admin/triage/', views.triage, name='triage'),
 ]
 
 
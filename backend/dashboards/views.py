@@ -1,20 +1,30 @@
 from urllib import request
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
-from matplotlib.pyplot import plot
-from assessment.models import DigitalAddictionAssessment
+from django.db.models import Avg, Count, Max, Q
+from django.db.models.functions import Abs
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseNotFound, QueryDict, StreamingHttpResponse
+from assessment.models import AssessmentRollup, DigitalAddictionAssessment, LiveConfusionCell, ModelEvaluation, ShadowPrediction
+from assessment.rollups import rollup_totals
+from assessment.triage import parse_filters, triage_queue
 from assessment.views import create_late_night_pie_chart, create_night_phone_by_age_percentage_bar_chart, create_platform_bar_chart, create_platform_bar_chart_by_gender, create_self_rated_digital_addiction_pie_chart, generate_das_by_age_chart_interactive
-from ml.preprocessing import preprocess_assessment 
-import numpy as np
+from ml.features import COLUMN_INDEX, feature_matrix
+from ml.predictor import MODEL_VERSION, RISK_LABELS
+from ml.training import confusion_scores
+from dashboards.live import insights_events, insights_totals, new_assessments
+from dashboards.singleflight import cached_computation
+from monitoring.metrics import observe_latency
 
 
 # ================================
 # STUDENT DASHBOARD
 # ================================
 
-from plotly.offline import plot
-import plotly.graph_objects as go
+# NumPy and Plotly are imported inside the functions that use them so that
+# importing this module (urls.py does) stays cheap.
 
 
 def calculate_student_usage_metrics(assessments):
@@ -23,18 +33,14 @@ def calculate_student_usage_metrics(assessments):
     based on the provided assessments queryset.
     Returns a dictionary ready for the dashboard summary card.
     """
-    # Initialize lists to collect data
-    screen_weekdays_list = []
-    screen_weekends_list = []
-    gaming_time_list = []
-    social_media_list = []
+    import numpy as np
 
-    for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
-        screen_weekdays_list.append(numeric_features.get("screen_time_weekdays", 0))
-        screen_weekends_list.append(numeric_features.get("screen_time_weekends", 0))
-        gaming_time_list.append(numeric_features.get("gaming_time", 0))           # in hours
-        social_media_list.append(numeric_features.get("social_media_time", 0))     # in hours
+    # Straight from the stored feature vectors
+    features = feature_matrix(assessments)
+    screen_weekdays_list = features[:, COLUMN_INDEX["screen_time_weekdays"]].tolist()
+    screen_weekends_list = features[:, COLUMN_INDEX["screen_time_weekends"]].tolist()
+    gaming_time_list = features[:, COLUMN_INDEX["gaming_time"]].tolist()            # in hours
+    social_media_list = features[:, COLUMN_INDEX["social_media_time"]].tolist()     # in hours
 
     # Compute averages safely
     avg_screen_weekdays = round(np.mean(screen_weekdays_list), 1) if screen_weekdays_list else 0
@@ -68,6 +74,9 @@ def create_student_digital_addiction_trend_line_chart(assessments, max_item_scor
     - assessments: list of assessment objects with da1-da8 and created_at
     - max_item_score: maximum value for a single DA item (default 5)
     """
+    import plotly.graph_objects as go
+    from plotly.offline import plot
+
 
     # Sort assessments chronologically
     assessments = sorted(assessments, key=lambda x: x.created_at)
@@ -126,6 +135,9 @@ def create_student_social_time_trend_line_chart(assessments):
     Trend line showing student's social media usage over time.
     Uses categorical social_time mapped to hours and converted to minutes.
     """
+    import plotly.graph_objects as go
+    from plotly.offline import plot
+
 
     social_map = {
         "<1h": 0.5,
@@ -141,7 +153,6 @@ def create_student_social_time_trend_line_chart(assessments):
     minutes_used = []
 
     for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
         date = getattr(assessment, "created_at", None)
         social_time_label = getattr(assessment, "social_time", None)
 
@@ -189,6 +200,7 @@ def create_student_social_time_trend_line_chart(assessments):
 
 
 @login_required
+@observe_latency("student_dashboard")
 def student_dashboard(request):
        # If admin accidentally lands here → redirect
     if request.user.is_staff or request.user.is_superuser:
@@ -250,37 +262,52 @@ def admin_dashboard(request):
 # ADMIN – DIGITAL BEHAVIOUR INSIGHTS
 # ================================
 @login_required
+@observe_latency("digital_behaviour_insights")
 def digital_behaviour_insights(request):
     if not (request.user.is_staff or request.user.is_superuser):
         return redirect('student_dashboard')
 
-    # Fetch all assessments
+    # Every chart reads the whole table: computed by one worker at a time
+    # and shared, served stale while it is being refreshed
+    context = cached_computation(
+        "insights", insights_context,
+        fresh=settings.INSIGHTS_FRESH_SECONDS, stale=settings.INSIGHTS_STALE_SECONDS,
+    )
+
+    return render(request, 'admin/insights.html', {
+        **context,
+        "insights_stream": settings.INSIGHTS_STREAM,
+        "insights_poll_seconds": settings.INSIGHTS_UPDATES_POLL_SECONDS,
+    })
+
+
+def insights_context():
+    # Fetch all assessments, plus the ones compacted into monthly rollups
     assessments = DigitalAddictionAssessment.objects.all()
-    total_assessments = assessments.count()
+    rollups = AssessmentRollup.objects.all()
+    compacted = rollup_totals(rollups)
+    total_assessments = assessments.count() + compacted["count"]
 
-    screen_weekdays_list = []
-    screen_weekends_list = []
-    gaming_time_list = []
-    social_media_list = []
+    # Straight from the stored feature vectors
+    features = feature_matrix(assessments)
 
-    for assessment in assessments:
-        numeric_features, _ = preprocess_assessment(assessment, fit=False)
-        screen_weekdays_list.append(numeric_features.get("screen_time_weekdays", 0))
-        screen_weekends_list.append(numeric_features.get("screen_time_weekends", 0))
-        gaming_time_list.append(numeric_features.get("gaming_time", 0))           # in hours
-        social_media_list.append(numeric_features.get("social_media_time", 0))     # in hours
+    def average(column, rollup_field, digits):
+        if not total_assessments:
+            return 0
+        total = features[:, COLUMN_INDEX[column]].sum() + compacted[rollup_field]
+        return round(float(total) / total_assessments, digits)
 
     # Compute averages safely
-    avg_screen_weekdays = round(np.mean(screen_weekdays_list), 1) if screen_weekdays_list else 0
-    avg_screen_weekends = round(np.mean(screen_weekends_list), 1) if screen_weekends_list else 0
-    avg_gaming_time_hours = round(np.mean(gaming_time_list), 2) if gaming_time_list else 0
-    avg_social_media_time_hours = round(np.mean(social_media_list), 2) if social_media_list else 0
+    avg_screen_weekdays = average("screen_time_weekdays", "screen_weekdays_total", 1)
+    avg_screen_weekends = average("screen_time_weekends", "screen_weekends_total", 1)
+    avg_gaming_time_hours = average("gaming_time", "gaming_total", 2)                   # in hours
+    avg_social_media_time_hours = average("social_media_time", "social_media_total", 2)  # in hours
 
     # Convert hours to minutes for metric cards
     avg_gaming_time_mins = round(avg_gaming_time_hours * 60, 1)
     avg_social_media_time_mins = round(avg_social_media_time_hours * 60, 1)
 
-    platform_gender_chart = create_platform_bar_chart_by_gender(assessments)
+    platform_gender_chart = create_platform_bar_chart_by_gender(assessments, rollups)
     #self_rated_pie_chart = create_self_rated_digital_addiction_pie_chart(assessments)
 
 
@@ -292,20 +319,108 @@ def digital_behaviour_insights(request):
         "avg_social_media_time": avg_social_media_time_mins,  # now in minutes
 
         # Interactive chart div for DAS by age
-        "das_chart_div": generate_das_by_age_chart_interactive(assessments),
+        "das_chart_div": generate_das_by_age_chart_interactive(assessments, rollups),
         # Interactive pie chart for late night phone usage
-        "pie_div": create_late_night_pie_chart(assessments),
+        "pie_div": create_late_night_pie_chart(assessments, rollups),
         # Interactive bar chart for late night phone usage
-        "bar_div": create_night_phone_by_age_percentage_bar_chart(assessments),
+        "bar_div": create_night_phone_by_age_percentage_bar_chart(assessments, rollups),
         # Interactive Bar chart for platform usage
-        "platform_bar_div": create_platform_bar_chart(assessments),
+        "platform_bar_div": create_platform_bar_chart(assessments, rollups),
         # Interactive Bar chart for platform usage by gender
         "platform_gender_chart": platform_gender_chart,
         # interactive pie chart for self-rated digital addiction levels
-        "self_rated_pie_chart_div": create_self_rated_digital_addiction_pie_chart(assessments)
+        "self_rated_pie_chart_div": create_self_rated_digital_addiction_pie_chart(assessments, rollups),
+
+        # What the charts are drawn from, for live updates (dashboards/live.py)
+        "live_totals": insights_totals(assessments, rollups),
     }
 
-    return render(request, 'admin/insights.html', context)
+    return context
+
+
+async def insights_stream(request):
+    """
+    Server-sent events with the totals of assessments created after the
+    ?since= id (or the Last-Event-ID of a reconnecting browser).
+    """
+    # Under WSGI the response would be collected in full before sending,
+    # so the events never arrive and the worker is held until it times out
+    if not isinstance(request, ASGIRequest):
+        return HttpResponseNotFound("The insights stream is only served by the ASGI application.")
+
+    user = await request.auser()
+    if not (user.is_staff or user.is_superuser):
+        return HttpResponseForbidden("Forbidden")
+
+    try:
+        since = int(request.headers.get("Last-Event-ID") or request.GET.get("since", ""))
+    except ValueError:
+        return HttpResponseBadRequest("since must be an assessment id.")
+
+    response = StreamingHttpResponse(insights_events(since), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"    # nginx: pass events through as they come
+    return response
+
+
+@login_required
+def insights_updates(request):
+    """
+    The next batch of assessments created after the ?since= id, as the
+    stream would send it, or 204 when there are none: for insights pages
+    polling without the stream.
+    """
+    if not (request.user.is_staff or request.user.is_superuser):
+        return HttpResponseForbidden("Forbidden")
+
+    try:
+        since = int(request.GET.get("since", ""))
+    except ValueError:
+        return HttpResponseBadRequest("since must be an assessment id.")
+
+    delta = new_assessments(since)
+    if delta is None:
+        return HttpResponse(status=204)
+    return HttpResponse(delta[1], content_type="application/json")
+
+
+# ================================
+# ADMIN – TRIAGE QUEUE
+# ================================
+@login_required
+def triage(request):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    try:
+        filters = parse_filters(request.GET)
+        error = None
+    except ValueError as e:
+        filters = parse_filters(QueryDict())
+        error = str(e)
+
+    pointers, cursor = triage_queue(**filters)
+
+    next_query = None
+    if cursor:
+        params = request.GET.copy()
+        params["cursor"] = cursor
+        next_query = params.urlencode()
+
+    context = {
+        "pointers": pointers,
+        "next_query": next_query,
+        "error": error,
+        "risk_levels": list(RISK_LABELS.values()),
+        "selected_risks": filters["risks"],
+        "institute": filters["institute"] or "",
+        "since": request.GET.get("since", ""),
+        "until": request.GET.get("until", ""),
+        "sort": filters["sort"],
+        "first_page": "cursor" not in request.GET,
+    }
+
+    return render(request, 'admin/triage.html', context)
 
 
 # ================================
@@ -316,31 +431,140 @@ def metrics(request):
     if not (request.user.is_staff or request.user.is_superuser):
         return redirect('student_dashboard')
 
-    # Placeholder for ML metrics (expand later)
+    # Holdout scores recorded by `manage.py train_model`, latest per version
+    evaluations = []
+    seen_versions = set()
+    for evaluation in ModelEvaluation.objects.all()[:50]:
+        if evaluation.model_version not in seen_versions:
+            seen_versions.add(evaluation.model_version)
+            evaluations.append(evaluation)
+
+    version = request.GET.get("version") or MODEL_VERSION
+    evaluation = next((e for e in evaluations if e.model_version == version), None)
+
+    class_rows = []
+    if evaluation:
+        for label, scores in evaluation.per_class.items():
+            class_rows.append({
+                "label": label,
+                "precision": _pct(scores["precision"]),
+                "recall": _pct(scores["recall"]),
+                "f1_score": _pct(scores["f1_score"]),
+                "support": scores["support"],
+            })
+
+    # Running confusion matrix over scored assessments (a handful of rows)
+    live = confusion_scores(
+        LiveConfusionCell.objects.filter(model_version=version)
+        .values_list("actual_risk", "predicted_risk", "count")
+    )
+    live_rows = [
+        {
+            "label": label,
+            "counts": live["matrix"][i],
+            "precision": _pct(live["per_class"][label]["precision"]),
+            "recall": _pct(live["per_class"][label]["recall"]),
+        }
+        for i, label in enumerate(live["labels"])
+    ]
+
     context = {
-        'accuracy': '92%',
-        'precision': '90%',
-        'recall': '89%',
-        'f1_score': '89.5%',
-        'model_version': 'v1.0'
+        'model_version': version,
+        'live_version': MODEL_VERSION,
+        'evaluation': evaluation,
+        'evaluations': evaluations,
+        'accuracy': _pct(evaluation.accuracy) if evaluation else None,
+        'precision': _pct(evaluation.precision) if evaluation else None,
+        'recall': _pct(evaluation.recall) if evaluation else None,
+        'f1_score': _pct(evaluation.f1_score) if evaluation else None,
+        'class_rows': class_rows,
+        'holdout_labels': evaluation.confusion.get("labels", []) if evaluation else [],
+        'holdout_matrix': zip(
+            evaluation.confusion.get("labels", []), evaluation.confusion.get("matrix", [])
+        ) if evaluation else [],
+        'live_labels': live["labels"],
+        'live_rows': live_rows,
+        'live_total': live["total"],
+        'live_accuracy': _pct(live["accuracy"]),
     }
 
     return render(request, 'admin/metrics.html', context)
 
 
+def _pct(value):
+    return None if value is None else round(value * 100, 1)
+
+
+# ================================
+# ADMIN – SHADOW MODEL COMPARISON
+# ================================
+@login_required
+def shadow_report(request):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    versions = list(
+        ShadowPrediction.objects.values("shadow_version")
+        .annotate(total=Count("id"), last_seen=Max("created_at"))
+        .order_by("-last_seen")
+    )
+    version = request.GET.get("version") or (versions[0]["shadow_version"] if versions else None)
+
+    predictions = ShadowPrediction.objects.filter(shadow_version=version)
+    summary = predictions.aggregate(
+        total=Count("id"),
+        agreed=Count("id", filter=Q(agrees=True)),
+        avg_delta=Avg("confidence_delta"),
+        avg_abs_delta=Avg(Abs("confidence_delta")),
+    )
+    agreement = round(summary["agreed"] / summary["total"] * 100, 1) if summary["total"] else None
+
+    # Confusion of live (rows) vs shadow (columns) predictions
+    cells = {
+        (cell["live_risk"], cell["shadow_risk"]): cell["n"]
+        for cell in predictions.values("live_risk", "shadow_risk").annotate(n=Count("id"))
+    }
+    labels = list(RISK_LABELS.values())
+    for live_risk, shadow_risk in cells:
+        for label in (live_risk, shadow_risk):
+            if label not in labels:
+                labels.append(label)
+
+    confusion = [
+        {"live_risk": live_risk, "counts": [cells.get((live_risk, shadow_risk), 0) for shadow_risk in labels]}
+        for live_risk in labels
+    ]
+
+    context = {
+        "versions": versions,
+        "version": version,
+        "summary": summary,
+        "agreement": agreement,
+        "labels": labels,
+        "confusion": confusion,
+        "disagreements": predictions.filter(agrees=False).order_by("-created_at")[:20],
+    }
+
+    return render(request, 'admin/shadow.html', context)
+
+
 # ================================
 # STUDENT HISTORY
 # ================================
 @login_required
 def assessment_history_view(request):
+    # Rows are cached fragments keyed by id and updated_at, so only the
+    # columns they show are read, and only rows new since are rendered
     assessments = DigitalAddictionAssessment.objects.filter(
         student=request.user
+    ).only(
+        "id", "updated_at", "created_at", "predicted_risk", "risk_confidence"
     ).order_by("-created_at")
 
     return render(
         request,
         "students/history.html",
-        {"assessments": assessments}
+        {"assessments": assessments, "fragment_seconds": settings.ASSESSMENT_FRAGMENT_SECONDS}
     )
 
 @login_required
@@ -351,15 +575,11 @@ def assessment_detail_view(request, id):
         student=request.user   # IMPORTANT: ownership check
     )
 
-    # Compute DAS weighted average
-    da_values = [assessment.da1, assessment.da2, assessment.da3, assessment.da4,
-                 assessment.da5, assessment.da6, assessment.da7, assessment.da8]
-    das_score = sum(da_values) / len(da_values)  # average
-    das_score_normalized = (das_score / 5) * 100  # assuming DA1–DA8 are 0–5 Likert scale
-
+    # The page body is a cached fragment keyed by id and updated_at; the
+    # DAS score (assessment.das_percent) is only computed when it renders
     return render(request, 'students/details.html', {
         'assessment': assessment,
-        'das_score': round(das_score_normalized, 2),
+        'fragment_seconds': settings.ASSESSMENT_FRAGMENT_SECONDS,
     })
 
 
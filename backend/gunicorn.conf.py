@@ -0,0 +1,83 @@
+"""
+Gunicorn settings for DARAS.
+
+    gunicorn -c gunicorn.conf.py daras.wsgi
+
+Every worker is a separate process, so Prometheus metrics are kept in
+PROMETHEUS_MULTIPROC_DIR and merged by the /metrics view.
+
+With GUNICORN_PRELOAD=1 (the default) the app, the risk model, the compiled
+feature maps and the plotting/ML libraries are loaded once in the master
+and inherited copy-on-write by every worker. Following the gc.freeze()
+recipe, the collector is disabled in the master while loading, everything
+is frozen into the permanent generation before the first fork, and the
+collector is re-enabled in each worker. See benchmarks/README.md for the
+per-worker USS measurement.
+
+Every worker then warms up (monitoring/warmup.py) before it accepts
+connections, so /ready is healthy from its first request and no visitor
+pays for a cold worker.
+"""
+import gc
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+if preload_app:
+    # Read before the app is imported: avoid leaving freed holes in pages
+    # the workers will share
+    gc.disable()
+
+# Must be set before prometheus_client is imported anywhere, so that workers
+# (which inherit the environment) use the file-backed value store.
+PROMETHEUS_DIR = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "daras-prometheus"),
+)
+
+
+def on_starting(server):
+    # Files left over from a previous run would be merged into the new totals
+    shutil.rmtree(PROMETHEUS_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker forks
+    if not preload_app:
+        return
+
+    from ml.predictor import preload
+
+    preload()
+    gc.freeze()
+    server.log.info("Preloaded model; %d objects frozen for copy-on-write sharing", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+
+
+def post_worker_init(worker):
+    # Runs in the worker after the app is loaded, before it accepts connections
+    from ml.shadow import get_shadow_scorer
+    from monitoring.warmup import warmup
+
+    # Loads the candidate model on its own thread, off the request path
+    get_shadow_scorer()
+
+    if warmup.run():
+        worker.log.info("Warmed up in %.2fs: %s", warmup.report["warmup_seconds"], warmup.report["steps"])
+    else:
+        worker.log.warning("Warm-up failed, /ready will answer 503: %s", warmup.error)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "task", "status", "priority", "attempts", "max_attempts", "run_at", "created_at", "finished_at")
+    list_filter = ("status", "task")
+    readonly_fields = ("locked_by", "locked_at", "result", "last_error", "created_by", "created_at", "finished_at")
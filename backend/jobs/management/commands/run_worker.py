@@ -0,0 +1,70 @@
+import signal
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from jobs.registry import TASKS
+from jobs.worker import requeue_expired, work, worker_name
+
+# How often abandoned jobs are looked for
+SWEEP_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs until stopped (Ctrl-C or SIGTERM lets running "
+        "jobs finish). Start several processes for CPU-bound tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=1, help="Jobs run at once, one thread each.")
+        parser.add_argument("--poll", type=float, default=None, help="Seconds between checks for due jobs when idle.")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+
+        stop = threading.Event()
+
+        def request_stop(signum, frame):
+            if not stop.is_set():
+                self.stdout.write("Stopping once the running jobs finish...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        self.stdout.write(
+            f"Worker {worker_name()} running {options['concurrency']} at a time; "
+            f"tasks: {', '.join(sorted(TASKS)) or 'none'}"
+        )
+
+        threads = [
+            threading.Thread(
+                target=work,
+                args=(worker_name(index), stop),
+                kwargs={"poll": options["poll"], "burst": options["burst"]},
+                name=f"daras-worker-{index}",
+            )
+            for index in range(options["concurrency"])
+        ]
+
+        next_sweep = 0
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                if not stop.is_set() and time.monotonic() >= next_sweep:
+                    requeued = requeue_expired()
+                    if requeued:
+                        self.stdout.write(self.style.WARNING(f"Requeued {requeued} abandoned jobs."))
+                    next_sweep = time.monotonic() + SWEEP_INTERVAL
+                time.sleep(0.5)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            connection.close()
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A call of a registered task (jobs.registry) waiting for, or run by, a
+    `manage.py run_worker` process.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)      # keyword arguments
+    priority = models.SmallIntegerField(default=0)            # higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)       # not before; pushed back on retry
+
+    locked_by = models.CharField(max_length=100, blank=True)  # worker running it
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            # Workers' claim query: due jobs, highest priority first
+            models.Index(
+                fields=["-priority", "run_at", "id"],
+                name="job_due_idx",
+                condition=models.Q(status="queued"),
+            ),
+            models.Index(fields=["status", "-id"], name="job_status_idx"),
+        ]
+
+    @property
+    def error_summary(self):
+        """
+        Last line of the traceback, e.g. "ValueError: ...".
+        """
+        lines = self.last_error.strip().splitlines()
+        return lines[-1] if lines else ""
+
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
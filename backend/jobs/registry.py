@@ -0,0 +1,77 @@
+"""
+Background tasks and enqueueing them.
+
+    # assessment/tasks.py
+    @task("assessment.rescore")
+    def rescore(assessment_ids=None):
+        ...
+
+    # in a view: returns at once, a worker does the work
+    enqueue("assessment.rescore", {"assessment_ids": [42]}, priority=PRIORITY_HIGH)
+
+A task is a plain function called with the job's payload as keyword
+arguments in a `manage.py run_worker` process, so payloads must be JSON.
+Tasks live in each app's tasks.py, imported when the jobs app is ready.
+A job can run more than once (retries, a worker dying mid-job), so tasks
+must be safe to repeat. What a task returns is kept on the job if it is
+JSON-serializable.
+
+Tasks registered with a label can also be started from the staff jobs
+page, without arguments.
+"""
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.models import Job
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+
+class Task:
+    def __init__(self, name, func, max_attempts=None, label=None):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.label = label
+
+
+# name -> Task
+TASKS = {}
+
+
+def task(name, max_attempts=None, label=None):
+    """
+    Decorator registering a function as the task `name`.
+    """
+    def decorator(func):
+        TASKS[name] = Task(name, func, max_attempts=max_attempts, label=label)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, priority=PRIORITY_NORMAL, delay=0, unique=False, user=None):
+    """
+    Queue a run of the task `name` and return its Job. With unique=True,
+    a job of the same task that is already queued or running is returned
+    instead of adding another (for "rebuild everything" style tasks).
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task: {name}")
+
+    if unique:
+        pending = Job.objects.filter(task=name, status__in=[Job.QUEUED, Job.RUNNING]).order_by("id").first()
+        if pending is not None:
+            return pending
+
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=TASKS[name].max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=timezone.now() + datetime.timedelta(seconds=delay),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
@@ -0,0 +1,119 @@
+import datetime
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import PRIORITY_HIGH, PRIORITY_LOW, enqueue, task
+from jobs.worker import backoff, claim, requeue_expired, run
+
+@task("jobs.tests.record")
+def record(value=None):
+    return {"value": value}
+
+
+@task("jobs.tests.broken", max_attempts=2)
+def broken():
+    raise RuntimeError("broken on purpose")
+
+
+class ClaimTest(TestCase):
+
+    def test_claims_highest_priority_then_oldest(self):
+        low = enqueue("jobs.tests.record", {"value": "low"}, priority=PRIORITY_LOW)
+        first = enqueue("jobs.tests.record", {"value": "first"})
+        second = enqueue("jobs.tests.record", {"value": "second"})
+        high = enqueue("jobs.tests.record", {"value": "high"}, priority=PRIORITY_HIGH)
+
+        claimed = [claim("worker") for _ in range(4)]
+        self.assertEqual([job.id for job in claimed], [high.id, first.id, second.id, low.id])
+        self.assertIsNone(claim("worker"))
+
+        job = claimed[0]
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.locked_by, "worker")
+
+    def test_skips_jobs_not_yet_due(self):
+        enqueue("jobs.tests.record", delay=60)
+        self.assertIsNone(claim("worker"))
+
+    def test_unique_returns_the_pending_job(self):
+        job = enqueue("jobs.tests.record", unique=True)
+        self.assertEqual(enqueue("jobs.tests.record", unique=True).id, job.id)
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class RunTest(TestCase):
+
+    def test_success_keeps_the_result(self):
+        enqueue("jobs.tests.record", {"value": 7})
+        self.assertEqual(run(claim("worker")), "succeeded")
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {"value": 7})
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_BACKOFF_SECONDS=100, JOB_MAX_BACKOFF_SECONDS=1000)
+    def test_failure_is_retried_later_then_fails(self):
+        enqueue("jobs.tests.broken")
+
+        before = timezone.now()
+        self.assertEqual(run(claim("worker")), "retried")
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.locked_by, "")
+        self.assertIn("broken on purpose", job.last_error)
+        # First retry waits between half and all of JOB_BACKOFF_SECONDS
+        self.assertGreaterEqual(job.run_at, before + datetime.timedelta(seconds=50))
+        self.assertLessEqual(job.run_at, timezone.now() + datetime.timedelta(seconds=100))
+        self.assertIsNone(claim("worker"))
+
+        Job.objects.update(run_at=timezone.now())
+        self.assertEqual(run(claim("worker")), "failed")
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_BACKOFF_SECONDS=10, JOB_MAX_BACKOFF_SECONDS=60)
+    def test_backoff_doubles_up_to_the_maximum(self):
+        with mock.patch("jobs.worker.random.uniform", return_value=1.0):
+            self.assertEqual([backoff(attempts) for attempts in range(1, 6)], [10, 20, 40, 60, 60])
+
+    def test_unregistered_task_fails_without_retry(self):
+        Job.objects.create(task="jobs.tests.missing", max_attempts=5, run_at=timezone.now())
+        self.assertEqual(run(claim("worker")), "failed")
+        self.assertIn("No task is registered", Job.objects.get().last_error)
+
+    def test_outcome_of_a_lost_claim_is_dropped(self):
+        enqueue("jobs.tests.record")
+        job = claim("worker")
+        # The lease ran out and another worker took the job over
+        Job.objects.update(locked_by="other")
+        run(job)
+        self.assertEqual(Job.objects.get().status, Job.RUNNING)
+
+
+class RequeueExpiredTest(TestCase):
+
+    def test_expired_leases_are_requeued_or_failed(self):
+        expired = timezone.now() - datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)
+        retry = Job.objects.create(task="jobs.tests.record", status=Job.RUNNING, attempts=1, max_attempts=3,
+                                   locked_by="gone", locked_at=expired, run_at=expired)
+        spent = Job.objects.create(task="jobs.tests.record", status=Job.RUNNING, attempts=3, max_attempts=3,
+                                   locked_by="gone", locked_at=expired, run_at=expired)
+        live = Job.objects.create(task="jobs.tests.record", status=Job.RUNNING, attempts=1, max_attempts=3,
+                                  locked_by="alive", locked_at=timezone.now(), run_at=expired)
+
+        self.assertEqual(requeue_expired(), 2)
+        retry.refresh_from_db()
+        spent.refresh_from_db()
+        live.refresh_from_db()
+        self.assertEqual((retry.status, retry.locked_by), (Job.QUEUED, ""))
+        self.assertEqual(spent.status, Job.FAILED)
+        self.assertEqual(live.status, Job.RUNNING)
@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Staff pages
+    path('jobs/', views.job_status, name='job-status'),
+]
@@ -0,0 +1,79 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Count
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import TASKS, enqueue
+
+PAGE_SIZE = 50
+
+
+# ================================
+# STAFF – BACKGROUND JOBS
+# ================================
+@login_required
+def job_status(request):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    if request.method == "POST":
+        _job_action(request)
+        return redirect('job-status')
+
+    statuses = dict(Job.STATUS_CHOICES)
+    status = request.GET.get("status", "")
+    if status not in statuses:
+        status = ""
+
+    jobs = Job.objects.order_by("-id")
+    if status:
+        jobs = jobs.filter(status=status)
+    try:
+        before = int(request.GET.get("before", ""))
+        jobs = jobs.filter(id__lt=before)
+    except ValueError:
+        before = None
+
+    # Keyset pagination on the id, newest first
+    page = list(jobs.select_related("created_by")[:PAGE_SIZE + 1])
+    next_before = page[PAGE_SIZE - 1].id if len(page) > PAGE_SIZE else None
+
+    counts = dict(Job.objects.values_list("status").annotate(n=Count("id")).order_by())
+    context = {
+        "jobs": page[:PAGE_SIZE],
+        "next_before": next_before,
+        "first_page": before is None,
+        "status": status,
+        "summary": [(value, label, counts.get(value, 0)) for value, label in Job.STATUS_CHOICES],
+        "due": Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now()).count(),
+        "startable": sorted((t.name, t.label) for t in TASKS.values() if t.label),
+    }
+
+    return render(request, 'admin/jobs.html', context)
+
+
+def _job_action(request):
+    action = request.POST.get("action")
+
+    if action == "start":
+        name = request.POST.get("task")
+        if name not in TASKS or not TASKS[name].label:
+            messages.error(request, "Unknown task.")
+            return
+        job = enqueue(name, unique=True, user=request.user)
+        messages.success(request, f"{TASKS[name].label}: job #{job.id} is {job.get_status_display().lower()}.")
+
+    elif action == "retry":
+        try:
+            job_id = int(request.POST.get("job", ""))
+        except ValueError:
+            job_id = None
+        retried = Job.objects.filter(id=job_id, status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), locked_by="", locked_at=None, finished_at=None,
+        )
+        if retried:
+            messages.success(request, f"Job #{job_id} queued again.")
+        else:
+            messages.error(request, "Only failed jobs can be retried.")
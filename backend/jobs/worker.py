@@ -0,0 +1,165 @@
+"""
+Claiming and running jobs, for `manage.py run_worker`.
+
+A worker takes the due job with the highest priority (oldest first within
+a priority). On PostgreSQL the claim is SELECT ... FOR UPDATE SKIP LOCKED,
+so concurrent workers each get a different row without waiting on one
+another. Databases without row locks (SQLite in development) claim by
+compare-and-set instead: an UPDATE of a candidate row that only succeeds
+while it is still queued, moving on to the next candidate when another
+worker got there first.
+
+A job that raises is queued again JOB_BACKOFF_SECONDS later, doubling per
+attempt up to JOB_MAX_BACKOFF_SECONDS and jittered so failures don't retry
+in lockstep, until it has been attempted max_attempts times. A job still
+marked running after JOB_LEASE_SECONDS lost its worker and is requeued by
+requeue_expired().
+"""
+import datetime
+import json
+import os
+import random
+import socket
+import time
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import TASKS
+from monitoring.metrics import JOB_DURATION, JOBS
+
+# Due jobs tried per claim where a candidate can be lost to another worker
+CLAIM_CANDIDATES = 10
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def due_jobs():
+    return Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now()).order_by("-priority", "run_at", "id")
+
+
+def claim(worker):
+    """
+    Mark the next due job as running by `worker` and return it, or None
+    when nothing is due.
+    """
+    now = timezone.now()
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = due_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_at = now
+            job.save(update_fields=["status", "attempts", "locked_by", "locked_at"])
+            return job
+
+    for job_id in due_jobs().values_list("id", flat=True)[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.filter(id=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, attempts=F("attempts") + 1, locked_by=worker, locked_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+def backoff(attempts):
+    """
+    Seconds to wait before retrying a job that has failed `attempts` times.
+    """
+    delay = min(settings.JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.JOB_MAX_BACKOFF_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _jsonable(value):
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def run(job):
+    """
+    Run a claimed job and record the outcome. Returns the outcome:
+    "succeeded", "retried" or "failed".
+    """
+    # Only this claim may finish the job: if the lease ran out and another
+    # worker took it over, its outcome wins
+    mine = Job.objects.filter(id=job.id, status=Job.RUNNING, locked_by=job.locked_by, attempts=job.attempts)
+    registered = TASKS.get(job.task)
+    started = time.perf_counter()
+
+    try:
+        if registered is None:
+            raise LookupError(f"No task is registered as {job.task!r}.")
+        result = registered.func(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        print(f"Job {job} failed (attempt {job.attempts} of {job.max_attempts}):\n{error}")
+        if registered is not None and job.attempts < job.max_attempts:
+            outcome = "retried"
+            mine.update(
+                status=Job.QUEUED,
+                run_at=timezone.now() + datetime.timedelta(seconds=backoff(job.attempts)),
+                locked_by="",
+                locked_at=None,
+                last_error=error,
+            )
+        else:
+            outcome = "failed"
+            mine.update(status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+    else:
+        outcome = "succeeded"
+        mine.update(status=Job.SUCCEEDED, finished_at=timezone.now(), result=_jsonable(result))
+
+    JOB_DURATION.labels(task=job.task).observe(time.perf_counter() - started)
+    JOBS.labels(task=job.task, outcome=outcome).inc()
+    return outcome
+
+
+def requeue_expired():
+    """
+    Queue again (or fail, when out of attempts) jobs whose worker stopped
+    without finishing them. Returns the number of jobs affected.
+    """
+    now = timezone.now()
+    expired = Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=now - datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS),
+    )
+    error = f"Lease expired: still running after {settings.JOB_LEASE_SECONDS}s, its worker is gone."
+
+    requeued = expired.filter(attempts__lt=F("max_attempts")).update(
+        status=Job.QUEUED, run_at=now, locked_by="", locked_at=None, last_error=error,
+    )
+    failed = expired.update(status=Job.FAILED, finished_at=now, last_error=error)
+    return requeued + failed
+
+
+def work(worker, stop, poll=None, burst=False):
+    """
+    Claim and run jobs until the `stop` event is set; with burst=True,
+    return as soon as nothing is due.
+    """
+    poll = settings.JOB_POLL_SECONDS if poll is None else poll
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim(worker)
+            if job is None:
+                if burst:
+                    return
+                stop.wait(poll)
+                continue
+            run(job)
+    finally:
+        connection.close()
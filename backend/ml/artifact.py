@@ -0,0 +1,292 @@
+"""
+Plain-array model artifacts for fast, shared worker startup.
+
+A fitted linear model (optionally behind a StandardScaler) is exported as
+a directory of .npy arrays plus a small manifest.json:
+
+    manifest.json       format, version, source model hash, feature order,
+                        classes, link function, array file names and the
+                        training mean and std of each feature
+    coef.npy            (n_classes, n_features) float64
+    intercept.npy       (n_classes,) float64
+    classes.npy         (n_classes,)
+    scaler_mean.npy     (n_features,) float64, only if the model had a scaler
+    scaler_scale.npy    (n_features,) float64, only if the model had a scaler
+
+Loading needs only NumPy: the arrays are opened with np.load(mmap_mode="r"),
+so every worker maps the same page-cache pages instead of unpickling its
+own copy of the sklearn object graph.
+
+This module must not import sklearn, pandas or Django.
+"""
+import json
+import os
+
+import numpy as np
+
+
+ARTIFACT_FORMAT = 1
+MANIFEST_NAME = "manifest.json"
+
+
+def _split_pipeline(model):
+    """
+    Returns (scaler, classifier) for a bare linear classifier or a
+    Pipeline whose only preprocessing step is a StandardScaler.
+    """
+    if not hasattr(model, "steps"):
+        return None, model
+
+    *head, (_, classifier) = model.steps
+    scalers = [step for _, step in head if step not in (None, "passthrough")]
+    if len(scalers) > 1 or (scalers and not hasattr(scalers[0], "scale_")):
+        raise ValueError("Only a StandardScaler may precede the classifier.")
+    return (scalers[0] if scalers else None), classifier
+
+
+def _link_function(classifier):
+    if classifier.coef_.shape[0] == 1:
+        return "logistic"
+    if getattr(classifier, "loss", None) is not None:
+        # SGDClassifier: multiclass is always one-vs-rest
+        return "ovr"
+    if getattr(classifier, "multi_class", "auto") == "ovr" or getattr(classifier, "solver", None) == "liblinear":
+        return "ovr"
+    return "softmax"
+
+
+def feature_stats(X):
+    """
+    Per-feature (mean, std) of the training matrix X, with a zero std
+    (a constant feature) replaced by 1 as StandardScaler does.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    return X.mean(axis=0), std
+
+
+def export_linear_model(model, out_dir, feature_names=None, source_version=None, stats=None, stats_source="training"):
+    """
+    Write `model` to out_dir in the plain-array format and return its manifest.
+
+    `stats` is the (mean, std) of each feature over the training data (see
+    feature_stats()), by default the feature_mean_ and feature_std_ that
+    ml.training.train() keeps on the model; the explanations need it for
+    a model without a scaler. `stats_source` says where other stats came
+    from.
+    """
+    scaler, classifier = _split_pipeline(model)
+    if not hasattr(classifier, "coef_"):
+        raise ValueError(f"{type(classifier).__name__} is not a fitted linear classifier.")
+
+    if feature_names is None:
+        feature_names = getattr(model, "feature_names_in_", None)
+    if feature_names is None:
+        raise ValueError("Model has no feature_names_in_; pass feature_names explicitly.")
+
+    if stats is None and hasattr(model, "feature_mean_"):
+        stats, stats_source = (model.feature_mean_, model.feature_std_), "training"
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    arrays = {
+        "coef": np.ascontiguousarray(classifier.coef_, dtype=np.float64),
+        "intercept": np.ascontiguousarray(classifier.intercept_, dtype=np.float64),
+        "classes": np.asarray(classifier.classes_),
+    }
+    if scaler is not None:
+        arrays["scaler_mean"] = np.ascontiguousarray(scaler.mean_, dtype=np.float64)
+        arrays["scaler_scale"] = np.ascontiguousarray(scaler.scale_, dtype=np.float64)
+
+    # Write to temporary names and rename into place: running workers keep
+    # their mappings of the old files instead of seeing them truncated.
+    files = {}
+    for name, array in arrays.items():
+        files[name] = f"{name}.npy"
+        path = os.path.join(out_dir, files[name])
+        with open(f"{path}.tmp", "wb") as fh:
+            np.save(fh, array, allow_pickle=False)
+        os.replace(f"{path}.tmp", path)
+
+    # Scaler arrays left over from a previous export of a scaled model
+    for name in ("scaler_mean", "scaler_scale"):
+        path = os.path.join(out_dir, f"{name}.npy")
+        if name not in files and os.path.exists(path):
+            os.remove(path)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "estimator": type(classifier).__name__,
+        "source_version": source_version,
+        "link": _link_function(classifier),
+        "feature_names": [str(name) for name in feature_names],
+        "classes": arrays["classes"].tolist(),
+        "files": files,
+    }
+    if stats is not None:
+        mean, std = (np.asarray(a, dtype=np.float64) for a in stats)
+        if mean.shape != (len(feature_names),) or std.shape != (len(feature_names),):
+            raise ValueError("Feature stats don't match the model's features.")
+        manifest["feature_stats"] = stats_source
+        manifest["feature_mean"] = mean.tolist()
+        manifest["feature_std"] = std.tolist()
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(f"{manifest_path}.tmp", "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    return manifest
+
+
+def read_manifest(artifact_dir):
+    with open(os.path.join(artifact_dir, MANIFEST_NAME)) as fh:
+        return json.load(fh)
+
+
+def probabilities(scores, link):
+    """
+    Class probabilities from decision scores, for the given link function.
+    """
+    if link == "logistic":
+        positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+        return np.column_stack([1.0 - positive, positive])
+
+    if link == "ovr":
+        proba = 1.0 / (1.0 + np.exp(-scores))
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    return scores / scores.sum(axis=1, keepdims=True)
+
+
+class LinearModelArtifact:
+    """
+    NumPy-only replacement for a fitted linear classifier. Exposes the
+    parts of the sklearn API the predictor uses (classes_,
+    feature_names_in_, coef_, intercept_, predict, predict_proba).
+    """
+
+    def __init__(self, manifest, coef, intercept, classes, scaler_mean=None, scaler_scale=None):
+        self.manifest = manifest
+        self.source_version = manifest.get("source_version")
+        self.link = manifest["link"]
+        self.feature_names_in_ = np.asarray(manifest["feature_names"], dtype=object)
+        self.coef_ = coef
+        self.intercept_ = intercept
+        self.classes_ = classes
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.feature_mean = self.feature_std = None
+        if "feature_mean" in manifest and "feature_std" in manifest:
+            self.feature_mean = np.asarray(manifest["feature_mean"], dtype=np.float64)
+            self.feature_std = np.asarray(manifest["feature_std"], dtype=np.float64)
+
+    def transform(self, X):
+        """
+        Feature matrix as the classifier sees it (scaled when the
+        source model had a scaler).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.scaler_mean is not None:
+            X = (X - self.scaler_mean) / self.scaler_scale
+        return X
+
+    def decision_function(self, X):
+        return self.transform(X) @ self.coef_.T + self.intercept_
+
+    def predict_proba(self, X):
+        return probabilities(self.decision_function(X), self.link)
+
+    def standardize(self, X):
+        """
+        X as (x - training mean) / training std, from the scaler or the
+        exported feature stats; None when the model has neither.
+        """
+        if self.scaler_mean is not None:
+            return self.transform(X)
+        if self.feature_mean is None:
+            return None
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return (X - self.feature_mean) / self.feature_std
+
+    def explain(self, X):
+        """
+        Probabilities, predicted class index and per-feature contributions
+        from a single pass over the rows X.
+
+        A feature's contribution is coefficient x standardized value
+        (see standardize()) for the predicted class, so features on large
+        scales don't dominate and the shares are relative to an average
+        student. Contributions are None when the training stats are
+        unknown.
+        """
+        Z = self.transform(X)
+        proba = probabilities(Z @ self.coef_.T + self.intercept_, self.link)
+        predicted = proba.argmax(axis=1)
+
+        standardized = self.standardize(X)
+        if standardized is None:
+            return proba, predicted, None
+
+        if self.link == "logistic":
+            # One coefficient row, for the positive class
+            weights = self.coef_[0] * np.where(predicted == 1, 1.0, -1.0)[:, None]
+        else:
+            weights = self.coef_[predicted]
+
+        return proba, predicted, weights * standardized
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def as_linear_model(model):
+    """
+    `model` as a LinearModelArtifact: unchanged if it already is one, else an
+    in-memory view of a fitted sklearn linear classifier (optionally behind
+    a StandardScaler). Raises ValueError for any other model.
+
+    Without a scaler the view has no training stats, so it can't explain.
+    """
+    if isinstance(model, LinearModelArtifact):
+        return model
+
+    scaler, classifier = _split_pipeline(model)
+    if not hasattr(classifier, "coef_"):
+        raise ValueError(f"{type(classifier).__name__} is not a fitted linear classifier.")
+
+    manifest = {
+        "link": _link_function(classifier),
+        "feature_names": [str(name) for name in getattr(model, "feature_names_in_", [])],
+    }
+    return LinearModelArtifact(
+        manifest,
+        np.asarray(classifier.coef_, dtype=np.float64),
+        np.asarray(classifier.intercept_, dtype=np.float64),
+        np.asarray(classifier.classes_),
+        scaler_mean=None if scaler is None else np.asarray(scaler.mean_, dtype=np.float64),
+        scaler_scale=None if scaler is None else np.asarray(scaler.scale_, dtype=np.float64),
+    )
+
+
+def load_artifact(artifact_dir, mmap=True):
+    """
+    Load an exported artifact. With mmap=True the arrays are read-only
+    views of the files, shared between every process that maps them.
+    """
+    manifest = read_manifest(artifact_dir)
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported artifact format {manifest.get('format')!r} in {artifact_dir}.")
+
+    mmap_mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(artifact_dir, filename), mmap_mode=mmap_mode, allow_pickle=False)
+        for name, filename in manifest["files"].items()
+    }
+    return LinearModelArtifact(manifest, **arrays)
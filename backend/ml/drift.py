@@ -0,0 +1,271 @@
+"""
+Streaming feature-drift monitoring against the training baseline.
+
+`manage.py build_drift_baseline` bins every TRAINING_COLUMNS feature of the
+training data into a few fixed bins and stores the edges and counts as
+drift_baseline.json next to the model artifact. Each scored assessment
+then adds one to the matching bin of every feature in a per-day counter
+table (monitoring.models.FeatureDriftCount), in one UPDATE touching one
+row per feature, so the cost of an update is O(features) and no full
+table scan is ever needed.
+
+The staff drift page and the /metrics gauges compare the live bin
+proportions over a recent window with the baseline:
+
+    PSI = sum((a - e) * ln(a / e))      population stability index
+    KL  = sum(a * ln(a / e))            KL(live || baseline)
+
+Rule of thumb for PSI: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25
+significant shift.
+
+The baseline is read once per process; workers pick up a rebuilt one when
+they restart. NumPy is only imported when a baseline is built or loaded.
+"""
+import json
+import threading
+import time
+
+from django.conf import settings
+
+from ml.features import TRAINING_COLUMNS
+from ml.predictor import model_version
+from monitoring.metrics import FEATURE_KL, FEATURE_PSI
+
+BASELINE_FORMAT = 1
+MAX_BINS = 10
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Pseudo-count added to every bin so empty bins don't give infinite scores
+SMOOTHING = 0.5
+
+
+def feature_edges(values, max_bins=MAX_BINS):
+    """
+    Bin edges for one feature: a split at 0.5 for 0/1 indicator columns,
+    midpoints between values for columns with few distinct values,
+    quantiles otherwise. A value v falls in bin (number of edges <= v).
+    """
+    import numpy as np
+
+    distinct = np.unique(values)
+    if set(distinct.tolist()) <= {0.0, 1.0}:
+        return [0.5]
+    if len(distinct) <= max_bins:
+        return ((distinct[1:] + distinct[:-1]) / 2).tolist()
+    quantiles = np.quantile(values, np.linspace(0, 1, max_bins + 1)[1:-1])
+    return np.unique(quantiles).tolist()
+
+
+def build_baseline(X, source_version=None, max_bins=MAX_BINS):
+    """
+    Baseline dict for a (rows, TRAINING_COLUMNS) training matrix.
+    """
+    import numpy as np
+
+    X = np.asarray(X, dtype=np.float64)
+    features = []
+    for i, name in enumerate(TRAINING_COLUMNS):
+        edges = feature_edges(X[:, i], max_bins)
+        bins = np.searchsorted(np.asarray(edges), X[:, i], side="right")
+        features.append({
+            "name": name,
+            "edges": edges,
+            "counts": np.bincount(bins, minlength=len(edges) + 1).tolist(),
+        })
+
+    return {
+        "format": BASELINE_FORMAT,
+        "source_version": source_version,
+        "rows": int(X.shape[0]),
+        "features": features,
+    }
+
+
+def divergence(expected_counts, actual_counts):
+    """
+    (psi, kl) between two histograms over the same bins.
+    """
+    import numpy as np
+
+    e = np.asarray(expected_counts, dtype=np.float64) + SMOOTHING
+    a = np.asarray(actual_counts, dtype=np.float64) + SMOOTHING
+    e /= e.sum()
+    a /= a.sum()
+    log_ratio = np.log(a / e)
+    return float(((a - e) * log_ratio).sum()), float((a * log_ratio).sum())
+
+
+class DriftBaseline:
+    """
+    A loaded drift_baseline.json. Every (feature, bin) pair has a global
+    slot number, the key of its live counter row.
+    """
+
+    def __init__(self, path):
+        import numpy as np
+
+        with open(path) as fh:
+            data = json.load(fh)
+        if data.get("format") != BASELINE_FORMAT:
+            raise ValueError(f"Unsupported drift baseline format {data.get('format')!r} in {path}.")
+        if [f["name"] for f in data["features"]] != list(TRAINING_COLUMNS):
+            raise ValueError(f"{path} was built for different features.")
+
+        self.version = model_version(path)
+        self.source_version = data.get("source_version")
+        self.rows = data["rows"]
+        self.features = data["features"]
+
+        # Edges padded with +inf into one matrix, so binning a feature
+        # vector is one comparison and a row sum
+        width = max(len(f["edges"]) for f in self.features) or 1
+        self.edges = np.full((len(self.features), width), np.inf)
+        for i, feature in enumerate(self.features):
+            self.edges[i, :len(feature["edges"])] = feature["edges"]
+
+        sizes = np.array([len(f["edges"]) + 1 for f in self.features])
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        self.slot_count = int(sizes.sum())
+
+    def slots_for(self, x):
+        import numpy as np
+
+        bins = (np.asarray(x, dtype=np.float64)[:, None] >= self.edges).sum(axis=1)
+        return (self.offsets + bins).tolist()
+
+    def compare(self, live_counts):
+        """
+        Per-feature scores of a live slot-count vector, worst first.
+        """
+        scores = []
+        for i, feature in enumerate(self.features):
+            start = self.offsets[i]
+            actual = live_counts[start:start + len(feature["counts"])]
+            psi, kl = divergence(feature["counts"], actual)
+            scores.append({
+                "name": feature["name"],
+                "psi": psi,
+                "kl": kl,
+                "expected": feature["counts"],
+                "actual": [int(c) for c in actual],
+            })
+        scores.sort(key=lambda s: s["psi"], reverse=True)
+        return scores
+
+
+_baseline = None
+_baseline_loaded = False
+_baseline_lock = threading.Lock()
+_ready_windows = set()
+
+
+def get_baseline():
+    """
+    The baseline at DRIFT_BASELINE_PATH, or None if it hasn't been built.
+    """
+    global _baseline, _baseline_loaded
+
+    if not _baseline_loaded:
+        with _baseline_lock:
+            if not _baseline_loaded:
+                path = settings.DRIFT_BASELINE_PATH
+                try:
+                    _baseline = DriftBaseline(path) if path else None
+                except FileNotFoundError:
+                    _baseline = None
+                _baseline_loaded = True
+    return _baseline
+
+
+def record_features(assessment):
+    """
+    Count a scored assessment's feature vector into today's histograms.
+    Never raises: drift monitoring must not fail a prediction.
+    """
+    from django.db.models import F
+    from django.utils import timezone
+    from monitoring.models import FeatureDriftCount
+
+    try:
+        baseline = get_baseline()
+        if baseline is None:
+            return
+
+        window = timezone.localdate()
+        if (baseline.version, window) not in _ready_windows:
+            FeatureDriftCount.objects.bulk_create(
+                [
+                    FeatureDriftCount(baseline=baseline.version, window=window, slot=slot)
+                    for slot in range(baseline.slot_count)
+                ],
+                ignore_conflicts=True,
+            )
+            _ready_windows.add((baseline.version, window))
+
+        FeatureDriftCount.objects.filter(
+            baseline=baseline.version, window=window,
+            slot__in=baseline.slots_for(assessment.features),
+        ).update(count=F("count") + 1)
+    except Exception as e:
+        print("Drift recording error:", e)
+
+
+def drift_report(days):
+    """
+    Baseline comparison of the last `days` days of live traffic.
+
+    Returns None without a baseline, else {"baseline", "rows", "features"}.
+    """
+    import datetime
+
+    import numpy as np
+    from django.db.models import Sum
+    from django.utils import timezone
+    from monitoring.models import FeatureDriftCount
+
+    baseline = get_baseline()
+    if baseline is None:
+        return None
+
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    live = np.zeros(baseline.slot_count)
+    counts = (
+        FeatureDriftCount.objects.filter(baseline=baseline.version, window__gte=since)
+        .values("slot")
+        .annotate(total=Sum("count"))
+    )
+    for row in counts:
+        if row["slot"] < baseline.slot_count:
+            live[row["slot"]] = row["total"]
+
+    # Every vector adds one count per feature, so any feature's total is the row count
+    rows = int(live[:len(baseline.features[0]["counts"])].sum())
+    return {"baseline": baseline, "rows": rows, "features": baseline.compare(live)}
+
+
+_gauges_updated = 0.0
+
+
+def refresh_drift_gauges(max_age=60):
+    """
+    Update the per-feature PSI/KL gauges from the default window, at most
+    once every max_age seconds per process. Called by the /metrics view.
+    """
+    global _gauges_updated
+
+    if time.monotonic() - _gauges_updated < max_age:
+        return
+    _gauges_updated = time.monotonic()
+
+    try:
+        report = drift_report(settings.DRIFT_WINDOW_DAYS)
+    except Exception as e:
+        print("Drift report error:", e)
+        return
+    if report is None or not report["rows"]:
+        return
+
+    for feature in report["features"]:
+        FEATURE_PSI.labels(feature=feature["name"]).set(feature["psi"])
+        FEATURE_KL.labels(feature=feature["name"]).set(feature["kl"])
@@ -0,0 +1,328 @@
+"""
+Feature definitions for the risk model, and a compiled form of them.
+
+The answer -> value tables below are the single source of truth for
+ml/preprocessing.py. FeatureMaps compiles them into one contiguous,
+read-only NumPy table with one row per possible answer, so encoding an
+assessment is a row gather plus a sum, and the table can be built once in
+a pre-forking master and shared copy-on-write by every worker.
+
+NumPy is only imported when the maps are compiled.
+"""
+import hashlib
+import json
+import threading
+
+
+# Final column order expected by the model
+TRAINING_COLUMNS = (
+    'gender_Female','gender_Male',
+    'primary_device_Desktop','primary_device_Laptop','primary_device_Shared devices',
+    'primary_device_Smartphone','primary_device_Tablet',
+    'own_smartphone_True',
+    'mobile_data_plan_Always','mobile_data_plan_No','mobile_data_plan_Rarely','mobile_data_plan_Sometimes',
+    'age','screen_time_weekdays','screen_time_weekends','night_phone_use','notif_per_hour',
+    'social_media_time','gaming_time','da1_time_loss','da2_restless','da3_failed_cut',
+    'da4_skip_tasks','da5_negative_emotions','da6_morning_check','da7_class_check','da8_family_comment',
+    'use_youtube','use_facebook','use_tiktok','use_instagram','use_linkedin','use_whatsapp',
+    'use_x','use_snapchat','use_live streaming','use_gaming','DAS_weighted'
+)
+COLUMN_INDEX = {name: i for i, name in enumerate(TRAINING_COLUMNS)}
+
+DA_COLUMNS = (
+    'da1_time_loss', 'da2_restless', 'da3_failed_cut', 'da4_skip_tasks',
+    'da5_negative_emotions', 'da6_morning_check', 'da7_class_check', 'da8_family_comment',
+)
+
+# Map Yes/No to boolean
+OWN_SMARTPHONE_MAP = {"Yes": True, "No": False}
+
+# Map ranges to numeric midpoints
+SCREEN_MAP = {"<2h": 2, "2–3h": 2.5, "3–4h": 3.5, "4–6h": 5, ">6h": 6}
+NIGHT_MAP = {"Never": 0, "<30m": 0.25, "30–60m": 0.75, "1–2h": 1.5, ">2h": 3}
+NOTIF_MAP = {"<5 times": 4, "5–10 times": 7, "11–20 times": 15, ">20 times": 21}
+# Keyed by normalize_time_string() output (plain hyphens)
+GAMING_MAP = {"None": 0, "<30m": 0.25, "30-60m": 0.75, "1-2h": 1.5, ">2h": 3}
+SOCIAL_MAP = {"<1h": 0.5, "1-2h": 1.5, "2-3h": 2.5, "3-4h": 3.5, ">4h": 5}
+
+ALL_PLATFORMS = [
+    'youtube','facebook','tiktok','instagram','linkedin',
+    'whatsapp','x','snapchat','live streaming','gaming'
+]
+
+
+# Readable names of TRAINING_COLUMNS, for explanations shown to counsellors
+FEATURE_LABELS = {
+    'own_smartphone_True': 'Owns a smartphone',
+    'age': 'Age',
+    'screen_time_weekdays': 'Screen time (weekdays)',
+    'screen_time_weekends': 'Screen time (weekends)',
+    'night_phone_use': 'Night-time phone use after lights-off',
+    'notif_per_hour': 'Notifications checked per hour',
+    'social_media_time': 'Time on social media per day',
+    'gaming_time': 'Daily gaming time',
+    'da1_time_loss': 'Loses track of time on the phone',
+    'da2_restless': 'Restless without the phone',
+    'da3_failed_cut': 'Failed to cut down screen time',
+    'da4_skip_tasks': 'Skips or delays tasks due to the phone',
+    'da5_negative_emotions': 'Uses the phone to cope with negative emotions',
+    'da6_morning_check': 'Checks the phone right after waking',
+    'da7_class_check': 'Checks notifications during classes',
+    'da8_family_comment': 'Friends or family comment on phone use',
+    'DAS_weighted': 'Overall self-report score',
+}
+for _prefix, _title in (
+    ('gender_', 'Gender'),
+    ('primary_device_', 'Primary device'),
+    ('mobile_data_plan_', 'Mobile data'),
+):
+    for _column in TRAINING_COLUMNS:
+        if _column.startswith(_prefix):
+            FEATURE_LABELS[_column] = f"{_title}: {_column[len(_prefix):]}"
+for _platform, _name in zip(ALL_PLATFORMS, (
+    'YouTube', 'Facebook', 'TikTok', 'Instagram', 'LinkedIn',
+    'WhatsApp', 'X', 'Snapchat', 'live streaming', 'gaming platforms',
+)):
+    FEATURE_LABELS[f"use_{_platform}"] = f"Uses {_name}"
+
+
+def normalize_time_string(s):
+    if not s or s != s:  # s != s catches NaN
+        return ""
+    # Replace en dash and em dash with normal dash
+    s = s.replace("–", "-").replace("—", "-").strip()
+    return s
+
+
+# Normalized spellings of the same platform (see assessment/platforms.py)
+PLATFORM_ALIASES = {"x/twitter": "x", "twitter": "x"}
+
+
+def normalize_platform(name):
+    name = name.lower().replace(" ", "")
+    return PLATFORM_ALIASES.get(name, name)
+
+
+def _one_hot(prefix):
+    return {
+        column[len(prefix) + 1:]: (column, 1)
+        for column in TRAINING_COLUMNS
+        if column.startswith(prefix + "_")
+    }
+
+
+def _valued(column, mapping):
+    return {label: (column, value) for label, value in mapping.items()}
+
+
+# Assessment field -> (normalizer, {answer: (column, value)})
+CATEGORICAL_FIELDS = {
+    "gender": (None, _one_hot("gender")),
+    "primary_device": (None, _one_hot("primary_device")),
+    "own_smartphone": (None, {label: ("own_smartphone_True", 1) for label, owns in OWN_SMARTPHONE_MAP.items() if owns}),
+    "mobile_data": (None, _one_hot("mobile_data_plan")),
+    "screen_weekdays": (None, _valued("screen_time_weekdays", SCREEN_MAP)),
+    "screen_weekends": (None, _valued("screen_time_weekends", SCREEN_MAP)),
+    "night_phone_use": (None, _valued("night_phone_use", NIGHT_MAP)),
+    "notif_per_hour": (None, _valued("notif_per_hour", NOTIF_MAP)),
+    "social_time": (normalize_time_string, _valued("social_media_time", SOCIAL_MAP)),
+    "gaming_time": (normalize_time_string, _valued("gaming_time", GAMING_MAP)),
+}
+
+
+# Range of the age answer (see assessment/api/serializers.py)
+AGE_RANGE = (15, 45)
+
+
+def answer_scale_stats():
+    """
+    Per-feature (mean, std) of TRAINING_COLUMNS with every possible answer
+    equally likely. Stands in for the training stats (ml.artifact
+    feature_stats) of a model whose training data isn't available.
+    """
+    import numpy as np
+
+    mean = np.zeros(len(TRAINING_COLUMNS))
+    std = np.ones(len(TRAINING_COLUMNS))
+
+    def set_stats(column, values):
+        values = np.asarray(values, dtype=np.float64)
+        mean[COLUMN_INDEX[column]] = values.mean()
+        std[COLUMN_INDEX[column]] = values.std() or 1.0
+
+    for field, (_, mapping) in CATEGORICAL_FIELDS.items():
+        answers = list(OWN_SMARTPHONE_MAP) if field == "own_smartphone" else list(mapping)
+        for column in {column for column, _ in mapping.values()}:
+            set_stats(column, [
+                mapping[answer][1] if answer in mapping and mapping[answer][0] == column else 0
+                for answer in answers
+            ])
+
+    for platform in ALL_PLATFORMS:
+        set_stats(f"use_{platform}", [0, 1])
+    set_stats("age", range(AGE_RANGE[0], AGE_RANGE[1] + 1))
+    for column in DA_COLUMNS:
+        set_stats(column, range(1, 6))
+    # Mean of the eight independent DA answers
+    mean[COLUMN_INDEX["DAS_weighted"]] = mean[COLUMN_INDEX[DA_COLUMNS[0]]]
+    std[COLUMN_INDEX["DAS_weighted"]] = std[COLUMN_INDEX[DA_COLUMNS[0]]] / np.sqrt(len(DA_COLUMNS))
+
+    return mean, std
+
+
+class FeatureMaps:
+    """
+    CATEGORICAL_FIELDS and ALL_PLATFORMS compiled into a single table.
+    Row 0 is all zeros and stands for any unknown answer.
+    """
+
+    def __init__(self):
+        import numpy as np
+
+        width = len(TRAINING_COLUMNS)
+        rows = [np.zeros(width)]
+
+        def add_row(column, value):
+            row = np.zeros(width)
+            row[COLUMN_INDEX[column]] = value
+            rows.append(row)
+            return len(rows) - 1
+
+        self.fields = []
+        for field, (normalize, mapping) in CATEGORICAL_FIELDS.items():
+            index = {label: add_row(column, value) for label, (column, value) in mapping.items()}
+            self.fields.append((field, normalize, index))
+
+        self.platform_rows = {
+            platform: add_row(f"use_{platform}", 1)
+            for platform in ALL_PLATFORMS
+            if f"use_{platform}" in COLUMN_INDEX
+        }
+
+        self.table = np.ascontiguousarray(np.vstack(rows))
+        self.table.flags.writeable = False
+
+        self.age_column = COLUMN_INDEX["age"]
+        self.das_column = COLUMN_INDEX["DAS_weighted"]
+        self.da_columns = np.array([COLUMN_INDEX[column] for column in DA_COLUMNS])
+        self.da_columns.flags.writeable = False
+
+    def rows_for(self, assessment):
+        rows = []
+        for field, normalize, index in self.fields:
+            value = getattr(assessment, field)
+            if normalize is not None:
+                value = normalize(value)
+            rows.append(index.get(value, 0))
+
+        used = {normalize_platform(p) for p in (assessment.platforms or [])}
+        rows.extend(row for platform, row in self.platform_rows.items() if platform in used)
+        return rows
+
+    def encode(self, assessment):
+        """
+        The model's feature vector for one assessment, identical to the
+        row preprocess_assessment() builds.
+        """
+        x = self.table[self.rows_for(assessment)].sum(axis=0)
+
+        da = [float(getattr(assessment, f"da{i}")) for i in range(1, 9)]
+        x[self.age_column] = int(assessment.age)
+        x[self.da_columns] = da
+        x[self.das_column] = sum(da) / 8
+        return x
+
+    def encode_many(self, assessments):
+        import numpy as np
+
+        assessments = list(assessments)
+        X = np.empty((len(assessments), len(TRAINING_COLUMNS)))
+        for i, assessment in enumerate(assessments):
+            X[i] = self.encode(assessment)
+        return X
+
+
+_maps = None
+_maps_lock = threading.Lock()
+
+
+def get_feature_maps():
+    global _maps
+
+    if _maps is None:
+        with _maps_lock:
+            if _maps is None:
+                _maps = FeatureMaps()
+    return _maps
+
+
+# ================================
+# STORED FEATURE VECTORS
+# ================================
+
+# Bump when encode() changes in a way the tables below don't capture
+FEATURE_ENCODING_REVISION = 2
+
+
+def _feature_spec():
+    spec = {
+        "revision": FEATURE_ENCODING_REVISION,
+        "columns": TRAINING_COLUMNS,
+        "da_columns": DA_COLUMNS,
+        "platforms": ALL_PLATFORMS,
+        "platform_aliases": PLATFORM_ALIASES,
+        "fields": {
+            field: [normalize.__name__ if normalize else None, sorted(mapping.items())]
+            for field, (normalize, mapping) in CATEGORICAL_FIELDS.items()
+        },
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+
+# Identifies the encoding a stored feature vector was made with
+FEATURE_SPEC = _feature_spec()
+
+# Stored as little-endian float32; every value the maps produce is exact in it
+FEATURE_DTYPE = "<f4"
+
+
+def pack_features(x):
+    import numpy as np
+
+    return np.asarray(x, dtype=FEATURE_DTYPE).tobytes()
+
+
+def unpack_features(blob):
+    import numpy as np
+
+    return np.frombuffer(blob, dtype=FEATURE_DTYPE).astype(np.float64)
+
+
+def feature_matrix(assessments):
+    """
+    (rows, TRAINING_COLUMNS) matrix for assessments, read from their stored
+    feature_vector where it was written with the current FEATURE_SPEC and
+    encoded on the fly otherwise (rows not yet backfilled).
+    """
+    import numpy as np
+
+    assessments = list(assessments)
+    X = np.empty((len(assessments), len(TRAINING_COLUMNS)))
+    maps = None
+    for i, assessment in enumerate(assessments):
+        blob = getattr(assessment, "feature_vector", None)
+        if blob is not None and getattr(assessment, "feature_spec", None) == FEATURE_SPEC:
+            X[i] = unpack_features(blob)
+        else:
+            maps = maps or get_feature_maps()
+            X[i] = maps.encode(assessment)
+    return X
+
+
+def feature_frame(assessments):
+    """
+    feature_matrix() as a DataFrame with the model's column names.
+    """
+    import pandas as pd
+
+    return pd.DataFrame(feature_matrix(assessments), columns=list(TRAINING_COLUMNS))
@@ -0,0 +1,142 @@
+"""
+Incremental (online) risk model, maintained alongside the batch model.
+
+A StandardScaler + SGDClassifier(loss="log_loss") pipeline updated with
+partial_fit on mini-batches of the assessments that arrived since the
+previous update, so an update costs time proportional to the new rows
+rather than to the whole table. Both steps learn incrementally; note that
+the running scaler keeps adapting, so early coefficients were learned on a
+slightly different scaling than late ones.
+
+Every update that consumed rows is checkpointed in ML_INCREMENTAL_DIR as a
+numbered joblib pickle of the Pipeline, loadable anywhere the batch model
+is (SHADOW_MODEL_PATH, `manage.py promote_model`). state.json next to the
+checkpoints records the last assessment id consumed:
+
+    state.json          {"sequence", "last_seen_id", "rows_seen", "checkpoints"}
+    sgd-0001.pkl
+    sgd-0002.pkl        ...
+
+Run `manage.py update_incremental_model` from cron or a systemd timer.
+"""
+import json
+import os
+
+from ml.predictor import MODEL_PATH, RISK_LABELS, model_version
+from ml.training import encode_labelled
+
+STATE_NAME = "state.json"
+
+
+def new_model():
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("classifier", SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)),
+    ])
+
+
+def read_state(directory):
+    try:
+        with open(os.path.join(directory, STATE_NAME)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"sequence": 0, "last_seen_id": 0, "rows_seen": 0, "checkpoints": []}
+
+
+def _write_json(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+def load_latest(directory):
+    """
+    Returns (model, state): the newest checkpoint, or a fresh unfitted
+    pipeline when there is none yet.
+    """
+    import joblib
+
+    state = read_state(directory)
+    if state["checkpoints"]:
+        return joblib.load(os.path.join(directory, state["checkpoints"][-1])), state
+    return new_model(), state
+
+
+def partial_fit(model, X, y):
+    """
+    One mini-batch step for both pipeline stages.
+    """
+    import numpy as np
+
+    scaler = model.named_steps["scaler"]
+    classifier = model.named_steps["classifier"]
+
+    scaler.partial_fit(X)
+    classifier.partial_fit(scaler.transform(X), y, classes=np.array(list(RISK_LABELS)))
+
+
+def update(queryset, directory, batch_size=500, keep=5):
+    """
+    Feed every assessment in `queryset` with an id above the last one
+    consumed to the model, batch_size rows at a time (keyset pagination on
+    the primary key), then checkpoint it.
+
+    Returns a dict describing the new checkpoint, or None if there were no
+    new labelled rows.
+    """
+    import joblib
+
+    os.makedirs(directory, exist_ok=True)
+    model, state = load_latest(directory)
+
+    last_seen_id = state["last_seen_id"]
+    rows = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_seen_id).order_by("id")[:batch_size])
+        if not batch:
+            break
+        last_seen_id = batch[-1].id
+
+        X, y = encode_labelled(batch)
+        if len(y):
+            partial_fit(model, X, y)
+            rows += len(y)
+
+    state["last_seen_id"] = last_seen_id
+    if not rows:
+        _write_json(os.path.join(directory, STATE_NAME), state)
+        return None
+
+    state["sequence"] += 1
+    name = f"sgd-{state['sequence']:04d}.pkl"
+    path = os.path.join(directory, name)
+    joblib.dump(model, f"{path}.tmp")
+    os.replace(f"{path}.tmp", path)
+
+    state["rows_seen"] += rows
+    state["checkpoints"].append(name)
+    _prune(directory, state, keep)
+    _write_json(os.path.join(directory, STATE_NAME), state)
+
+    return {"path": path, "version": model_version(path), "rows": rows, "rows_seen": state["rows_seen"]}
+
+
+def _prune(directory, state, keep):
+    """
+    Drop all but the newest `keep` checkpoints, never the one being served.
+    """
+    live = os.path.abspath(MODEL_PATH)
+    kept = []
+    for i, name in enumerate(state["checkpoints"]):
+        path = os.path.join(directory, name)
+        if i < len(state["checkpoints"]) - keep and os.path.abspath(path) != live:
+            if os.path.exists(path):
+                os.remove(path)
+        else:
+            kept.append(name)
+    state["checkpoints"] = kept
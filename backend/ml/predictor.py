@@ -1,20 +1,157 @@
 import os
-import joblib
-import numpy as np
-from pathlib import Path
+import json
+import time
+import hashlib
+import threading
 
 from django.conf import settings
-from ml.preprocessing import preprocess_assessment
+from ml.features import feature_frame
+from monitoring.metrics import MODEL_INFO, MODEL_LOAD_SECONDS
 
-# Load pipeline ONCE (VERY IMPORTANT)
-# --------------------------------------
-MODEL_PATH = os.path.join(settings.BASE_DIR, "ml", "logistic_regression.pkl")
+BATCH_MODEL_PATH = os.path.join(settings.BASE_DIR, "ml", "logistic_regression.pkl")
+
+# Written by `manage.py promote_model`; absent means serve the batch model
+ACTIVE_MODEL_FILE = os.path.join(settings.BASE_DIR, "ml", "active_model.json")
+
+
+def active_model_path():
+    """
+    Path of the model to serve: the promoted one if any, else the batch model.
+    Read once at import, so a promotion takes effect as workers restart.
+    """
+    try:
+        with open(ACTIVE_MODEL_FILE) as fh:
+            path = json.load(fh)["path"]
+    except FileNotFoundError:
+        return BATCH_MODEL_PATH
+    return path if os.path.isabs(path) else os.path.join(settings.BASE_DIR, path)
 
 
+MODEL_PATH = active_model_path()
+
 if not os.path.exists(MODEL_PATH):
     raise FileNotFoundError("ML pipeline not found.")
 
-pipeline = joblib.load(MODEL_PATH)
+
+def model_version(path):
+    """
+    Short content hash of a model file, used to tell deployed models apart.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def load_model():
+    """
+    Prefer the memory-mapped array export (see ml/artifact.py) when it was
+    exported from the current pickle; otherwise unpickle the pickle itself.
+
+    Returns (model, artifact_name).
+    """
+    from ml.artifact import MANIFEST_NAME, load_artifact, read_manifest
+
+    artifact_dir = settings.ML_ARTIFACT_DIR
+    if artifact_dir and os.path.exists(os.path.join(artifact_dir, MANIFEST_NAME)):
+        if read_manifest(artifact_dir).get("source_version") == MODEL_VERSION:
+            return load_artifact(artifact_dir), os.path.basename(artifact_dir)
+        print("Model artifact is stale, falling back to", MODEL_PATH)
+
+    import joblib
+
+    return joblib.load(MODEL_PATH), os.path.basename(MODEL_PATH)
+
+
+MODEL_VERSION = model_version(MODEL_PATH)
+
+# Load pipeline ONCE per process, on first use rather than at import, so
+# management commands and pages that never predict don't pay for it.
+# --------------------------------------
+_pipeline = None
+_pipeline_lock = threading.Lock()
+_linear_model = None
+MODEL_ARTIFACT = None
+MODEL_LOAD_SECONDS_VALUE = None
+
+
+def get_pipeline():
+    global _pipeline, _linear_model, MODEL_ARTIFACT, MODEL_LOAD_SECONDS_VALUE
+
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                started = time.perf_counter()
+                model, MODEL_ARTIFACT = load_model()
+                MODEL_LOAD_SECONDS_VALUE = time.perf_counter() - started
+
+                MODEL_LOAD_SECONDS.set(MODEL_LOAD_SECONDS_VALUE)
+                MODEL_INFO.labels(version=MODEL_VERSION, artifact=MODEL_ARTIFACT).set(1)
+
+                # Linear models are scored (and explained) from their arrays
+                from ml.artifact import as_linear_model
+                try:
+                    _linear_model = as_linear_model(model)
+                except ValueError:
+                    _linear_model = None
+                _pipeline = model
+
+    return _pipeline
+
+
+# Imported in the master by preload() so that workers share their pages
+PRELOAD_MODULES = (
+    "numpy",
+    "pandas",
+    "plotly.graph_objects",
+    "plotly.offline",
+)
+
+
+def preload():
+    """
+    Load the model, the compiled feature maps and the libraries the predict
+    path uses into this process, for servers that fork workers from a
+    preloaded master (gunicorn.conf.py with GUNICORN_PRELOAD=1).
+
+    Model and feature arrays are made read-only so nothing in a worker can
+    write to (and so copy) their pages. The caller should gc.freeze()
+    right before forking so the collector in the workers never touches the
+    inherited objects either.
+    """
+    import importlib
+    from ml.drift import get_baseline
+    from ml.features import get_feature_maps
+
+    for name in PRELOAD_MODULES:
+        importlib.import_module(name)
+
+    model = get_pipeline()
+    for attr in ("coef_", "intercept_", "classes_"):
+        array = getattr(model, attr, None)
+        if array is not None and getattr(array, "flags", None) is not None and array.flags.writeable:
+            array.flags.writeable = False
+
+    get_feature_maps()
+    get_baseline()
+
+# Model class -> risk label stored on the assessment
+RISK_LABELS = {
+    0: "Not at Risk",
+    1: "Mild",
+    2: "Moderate",
+    3: "Severe"
+}
+
+# self_rated_da key -> risk label; the student's own rating is the ground
+# truth predictions are evaluated against
+SELF_RATED_RISK = {
+    "not_at_risk": "Not at Risk",
+    "mild": "Mild",
+    "moderate": "Moderate",
+    "severe": "Severe",
+}
 
 
 
@@ -34,27 +171,18 @@ def predict_risk(instance, df=None):
         instance : DigitalAddictionAssessment model instance
         df       : preprocessed DataFrame (optional)
     """
-    from ml.preprocessing import preprocess_assessment
-
-    # Preprocess if not provided
+    # Stored feature vector if no frame is provided
     if df is None:
-        df, _ = preprocess_assessment(instance)
+        df = feature_frame([instance])
 
     # Prevent label leakage
     if "y" in df.columns:
         df = df.drop(columns=["y"])
 
     # Predict class
-    pred_class = pipeline.predict(df)[0]
+    pred_class = get_pipeline().predict(df)[0]
 
-    risk_map = {
-        0: "Not at Risk",
-        1: "Mild",
-        2: "Moderate",
-        3: "Severe"
-    }
-
-    return risk_map.get(int(pred_class), "Unknown")
+    return RISK_LABELS.get(int(pred_class), "Unknown")
 
 
 # --------------------------------------------------
@@ -71,38 +199,72 @@ def predict_risk_with_confidence(instance, df=None):
     Returns:
         (risk_label: str, confidence_score: float | None)
     """
-    from ml.preprocessing import preprocess_assessment
+    risk_label, probability, _ = predict_risk_with_explanation(instance, df=df, top_k=0)
+    return risk_label, probability
 
-    # Use provided DataFrame or preprocess
+
+# --------------------------------------------------
+# Prediction + Confidence + Feature Contributions
+# --------------------------------------------------
+def predict_risk_with_explanation(instance, df=None, top_k=None):
+    """
+    Returns predicted risk label, confidence score and the features that
+    drove the score, all from one vectorized scoring pass.
+
+    Args:
+        instance : DigitalAddictionAssessment model instance
+        df       : preprocessed DataFrame (optional)
+        top_k    : number of risk factors to return (RISK_FACTOR_COUNT)
+
+    Returns:
+        (risk_label: str, confidence_score: float | None, risk_factors: list)
+
+    risk_factors are the top_k features by absolute contribution to the
+    predicted class's score (see LinearModelArtifact.explain), as
+    {"feature", "value", "contribution"} dicts; positive contributions
+    pushed towards the predicted class. Empty for non-linear models and
+    for a model exported without its training stats.
+    """
+    if top_k is None:
+        top_k = settings.RISK_FACTOR_COUNT
+
+    # Use provided DataFrame or the stored feature vector
     if df is None:
-        df, _ = preprocess_assessment(instance)
-    
+        df = feature_frame([instance])
+
     # Drop label column if present
     if "y" in df.columns:
         df = df.drop(columns=["y"])
 
+    pipeline = get_pipeline()
+    linear = _linear_model
+
     # Ensure feature order matches the trained model
     if hasattr(pipeline, "feature_names_in_"):
         df = df.reindex(columns=pipeline.feature_names_in_, fill_value=0)
 
-    # Predict
-    pred_class = pipeline.predict(df)[0]
-
-    # Map to risk label
-    risk_map = {
-        0: "Not at Risk",
-        1: "Mild",
-        2: "Moderate",
-        3: "Severe"
-    }
-    risk_label = risk_map.get(int(pred_class), "Unknown")
-
-    # Get confidence score if available
-    if hasattr(pipeline, "predict_proba"):
-        probability = pipeline.predict_proba(df).max()
-        probability = round(float(probability), 3)
-    else:
-        probability = None
+    if linear is None:
+        pred_class = pipeline.predict(df)[0]
+        risk_label = RISK_LABELS.get(int(pred_class), "Unknown")
+        if hasattr(pipeline, "predict_proba"):
+            probability = round(float(pipeline.predict_proba(df).max()), 3)
+        else:
+            probability = None
+        return risk_label, probability, []
 
-    return risk_label, probability
+    x = df.to_numpy(dtype=float)
+    proba, predicted, contributions = linear.explain(x)
+
+    risk_label = RISK_LABELS.get(int(linear.classes_[predicted[0]]), "Unknown")
+    probability = round(float(proba[0].max()), 3)
+
+    risk_factors = []
+    if top_k and contributions is not None:
+        for i in abs(contributions[0]).argsort()[::-1][:top_k]:
+            risk_factors.append({
+                "feature": str(df.columns[i]),
+                "value": round(float(x[0, i]), 3),
+                "contribution": round(float(contributions[0, i]), 3),
+            })
 
+    return risk_label, probability, risk_factors
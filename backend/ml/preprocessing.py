@@ -1,24 +1,23 @@
-import pandas as pd
-from sklearn.preprocessing import OneHotEncoder
+from ml.features import (
+    ALL_PLATFORMS,
+    GAMING_MAP as gaming_map,
+    NIGHT_MAP as night_map,
+    NOTIF_MAP as notif_map,
+    OWN_SMARTPHONE_MAP as own_smartphone_map,
+    SCREEN_MAP as screen_map,
+    SOCIAL_MAP as social_map,
+    TRAINING_COLUMNS,
+    normalize_platform,
+    normalize_time_string,
+)
 
-def normalize_time_string(s):
-    if not s or pd.isna(s):
-        return ""
-    # Replace en dash and em dash with normal dash
-    s = s.replace("–", "-").replace("—", "-").strip()
-    return s
+# pandas and sklearn are imported inside preprocess_assessment so that
+# importing this module (e.g. from urls.py) stays cheap.
 
 
 def preprocess_assessment(assessment, encoder=None, fit=False):
-    # ✅ Map Yes/No to boolean
-    own_smartphone_map = {"Yes": True, "No": False}
-
-    # ✅ Map ranges to numeric midpoints
-    screen_map = {"<2h": 2, "2–3h": 2.5, "3–4h": 3.5, "4–6h": 5, ">6h": 6}
-    night_map = {"Never": 0, "<30m": 0.25, "30–60m": 0.75, "1–2h": 1.5, ">2h": 3}
-    notif_map = {"<5 times": 4, "5–10 times": 7, "11–20 times": 15, ">20 times": 21}
-    gaming_map = {"None": 0, "<30m": 0.25, "30-60m": 0.75, "1-2h": 1.5, ">2h": 3}
-    social_map = {"<1h": 0.5, "1-2h": 1.5, "2-3h": 2.5, "3-4h": 3.5, ">4h": 5}
+    import pandas as pd
+    from sklearn.preprocessing import OneHotEncoder
 
     gaming_time_str = normalize_time_string(assessment.gaming_time)
     social_time_str = normalize_time_string(assessment.social_time)
@@ -51,12 +50,8 @@ def preprocess_assessment(assessment, encoder=None, fit=False):
     }
 
     # 2️⃣ Encode platforms as separate columns
-    all_platforms = [
-        'youtube','facebook','tiktok','instagram','linkedin',
-        'whatsapp','x','snapchat','live streaming','gaming'
-    ]
-    used_platforms = [p.lower().replace(" ", "") for p in (assessment.platforms or [])]
-    for p in all_platforms:
+    used_platforms = [normalize_platform(p) for p in (assessment.platforms or [])]
+    for p in ALL_PLATFORMS:
         key = f"use_{p}"
         X_raw[key] = int(p in used_platforms)  # ensures numeric 0/1
 
@@ -74,22 +69,10 @@ def preprocess_assessment(assessment, encoder=None, fit=False):
     df_final = pd.concat([df.drop(columns=cat_cols), df_cat], axis=1)
 
     # 4️⃣ Ensure final column order matches model training
-    TRAINING_COLUMNS = [
-        'gender_Female','gender_Male',
-        'primary_device_Desktop','primary_device_Laptop','primary_device_Shared devices',
-        'primary_device_Smartphone','primary_device_Tablet',
-        'own_smartphone_True',
-        'mobile_data_plan_Always','mobile_data_plan_No','mobile_data_plan_Rarely','mobile_data_plan_Sometimes',
-        'age','screen_time_weekdays','screen_time_weekends','night_phone_use','notif_per_hour',
-        'social_media_time','gaming_time','da1_time_loss','da2_restless','da3_failed_cut',
-        'da4_skip_tasks','da5_negative_emotions','da6_morning_check','da7_class_check','da8_family_comment',
-        'use_youtube','use_facebook','use_tiktok','use_instagram','use_linkedin','use_whatsapp',
-        'use_x','use_snapchat','use_live streaming','use_gaming','DAS_weighted'
-    ]
     for col in TRAINING_COLUMNS:
         if col not in df_final.columns:
             df_final[col] = 0
-    df_final = df_final[TRAINING_COLUMNS]
+    df_final = df_final[list(TRAINING_COLUMNS)]
 
     return df_final, encoder
 
@@ -0,0 +1,176 @@
+"""
+Shadow scoring of a candidate model next to the live one.
+
+The predict view hands each scored feature row to submit(), which only
+puts it on an in-memory queue. A daemon thread per worker drains the
+queue in batches, scores them with the candidate in one predict_proba
+call and records the comparison as ShadowPrediction rows, so the
+candidate never adds latency to the user-facing response. When the
+queue is full, rows are dropped rather than blocking the request.
+
+The candidate is unpickled by that thread too, so no request waits for
+it; gunicorn starts the scorer in post_worker_init. A candidate that
+can't be loaded is reported once and turns shadow scoring off for the
+life of the process.
+
+Enable by pointing SHADOW_MODEL_PATH at a joblib-pickled candidate.
+"""
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from ml.predictor import RISK_LABELS, model_version
+
+
+class ShadowScorer:
+
+    def __init__(self, model_path, queue_size=1000, batch_size=32, flush_interval=1.0):
+        self.model_path = model_path
+        self.model = None
+        self.version = None
+        self.failed = False
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="daras-shadow", daemon=True)
+        self._thread.start()
+
+    def submit(self, assessment_id, df, live_risk, live_confidence):
+        """
+        Queue one preprocessed row for shadow scoring. Never blocks.
+        """
+        if self.failed:
+            return False
+        try:
+            self.queue.put_nowait((assessment_id, df, live_risk, live_confidence))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _next_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                break
+        return batch
+
+    def _load(self):
+        import joblib
+
+        try:
+            self.model = joblib.load(self.model_path)
+            self.version = model_version(self.model_path)
+        except Exception as e:
+            print("Shadow model could not be loaded, shadow scoring is off:", e)
+            self.failed = True
+            # Rows queued while loading will never be scored
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            return False
+        return True
+
+    def _run(self):
+        if not self._load():
+            return
+        while True:
+            batch = self._next_batch()
+            try:
+                self.record(batch)
+            except Exception as e:
+                print("Shadow scoring error:", e)
+            finally:
+                close_old_connections()
+
+    def score(self, frames):
+        """
+        Score a list of 1-row feature DataFrames in a single call.
+        Returns (risk_labels, confidences).
+        """
+        import numpy as np
+        import pandas as pd
+
+        X = pd.concat(frames, ignore_index=True)
+        if "y" in X.columns:
+            X = X.drop(columns=["y"])
+        if hasattr(self.model, "feature_names_in_"):
+            X = X.reindex(columns=self.model.feature_names_in_, fill_value=0)
+
+        proba = self.model.predict_proba(X)
+        best = proba.argmax(axis=1)
+        classes = np.asarray(self.model.classes_)[best]
+
+        labels = [RISK_LABELS.get(int(c), "Unknown") for c in classes]
+        confidences = np.round(proba[np.arange(len(best)), best], 3)
+        return labels, confidences.tolist()
+
+    def record(self, batch):
+        from assessment.models import ShadowPrediction
+
+        labels, confidences = self.score([df for _, df, _, _ in batch])
+
+        rows = []
+        for (assessment_id, _, live_risk, live_confidence), shadow_risk, shadow_confidence in zip(batch, labels, confidences):
+            delta = None
+            if live_confidence is not None:
+                delta = round(shadow_confidence - live_confidence, 3)
+
+            rows.append(ShadowPrediction(
+                assessment_id=assessment_id,
+                shadow_version=self.version,
+                live_risk=live_risk,
+                shadow_risk=shadow_risk,
+                live_confidence=live_confidence,
+                shadow_confidence=shadow_confidence,
+                confidence_delta=delta,
+                agrees=(live_risk == shadow_risk),
+            ))
+
+        ShadowPrediction.objects.bulk_create(rows)
+
+
+_scorer = None
+_scorer_lock = threading.Lock()
+
+
+def get_shadow_scorer():
+    """
+    The per-process ShadowScorer, started by gunicorn's post_worker_init
+    or else on first use (always after the fork), or None when shadow
+    mode is off.
+    """
+    global _scorer
+
+    path = settings.SHADOW_MODEL_PATH
+    if not path:
+        return None
+
+    if _scorer is None:
+        with _scorer_lock:
+            if _scorer is None:
+                _scorer = ShadowScorer(
+                    path,
+                    queue_size=settings.SHADOW_QUEUE_SIZE,
+                    batch_size=settings.SHADOW_BATCH_SIZE,
+                    flush_interval=settings.SHADOW_FLUSH_INTERVAL,
+                )
+    return _scorer
+
+
+def submit_for_shadow_scoring(assessment_id, df, live_risk, live_confidence):
+    """
+    Called from the predict view. Shadow problems must never affect the
+    live response, so errors are only logged.
+    """
+    try:
+        scorer = get_shadow_scorer()
+        if scorer is not None:
+            scorer.submit(assessment_id, df, live_risk, live_confidence)
+    except Exception as e:
+        print("Shadow submit error:", e)
@@ -1,162 +1,150 @@
-# import os
-# import django
-# import joblib
-# import pandas as pd
-
-# # ---------------------------------
-# # Setup Django Environment
-# # ---------------------------------
-# os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")  
-# django.setup()
-
-# from assessment.models import DigitalAddictionAssessment
-# from assessment.ml.preprocess import preprocess_assessment
-
-# from sklearn.model_selection import train_test_split
-# from sklearn.compose import ColumnTransformer
-# from sklearn.pipeline import Pipeline
-
-# from sklearn.preprocessing import OneHotEncoder, StandardScaler
-
-# from sklearn.linear_model import LogisticRegression
-# from sklearn.ensemble import RandomForestClassifier
-
-# from xgboost import XGBClassifier
-
-# from sklearn.metrics import accuracy_score, classification_report
-
-
-# # ---------------------------------
-# # 1️⃣ Load Data From DB
-# # ---------------------------------
-# assessments = DigitalAddictionAssessment.objects.all()
-
-# if assessments.count() < 50:
-#     raise Exception("⚠️ Need at least 50 records to train a reliable ML model.")
-
-
-# rows = []
-# for a in assessments:
-#     df = preprocess_assessment(a)
-#     rows.append(df)
-
-# dataset = pd.concat(rows, ignore_index=True)
-
-# print("\nDataset Shape:", dataset.shape)
-
-
-# # ---------------------------------
-# # 2️⃣ Split Features / Label
-# # ---------------------------------
-# X = dataset.drop(columns=["y"])
-# y = dataset["y"]
-
-
-# # ---------------------------------
-# # 3️⃣ Detect Column Types Automatically
-# # ---------------------------------
-# categorical_features = [
-#     "gender",
-#     "primary_device",
-#     "mobile_data_plan"
-# ]
-
-# numeric_features = [col for col in X.columns if col not in categorical_features]
-
-
-# # ---------------------------------
-# # 4️⃣ Preprocessing Pipelines
-# # ---------------------------------
-# numeric_transformer = Pipeline(
-#     steps=[("scaler", StandardScaler())]
-# )
-
-# categorical_transformer = Pipeline(
-#     steps=[("onehot", OneHotEncoder(handle_unknown="ignore"))]
-# )
-
-# preprocessor = ColumnTransformer(
-#     transformers=[
-#         ("num", numeric_transformer, numeric_features),
-#         ("cat", categorical_transformer, categorical_features),
-#     ]
-# )
-
-
-# # ---------------------------------
-# # 5️⃣ Models
-# # ---------------------------------
-# models = {
-#     "Logistic Regression": LogisticRegression(max_iter=2000),
-#     "Random Forest": RandomForestClassifier(
-#         n_estimators=300,
-#         max_depth=12,
-#         random_state=42
-#     ),
-#     "XGBoost": XGBClassifier(
-#         n_estimators=300,
-#         max_depth=8,
-#         learning_rate=0.05,
-#         subsample=0.9,
-#         colsample_bytree=0.9,
-#         eval_metric="mlogloss",
-#         random_state=42
-#     )
-# }
-
-
-# # ---------------------------------
-# # 6️⃣ Train/Test Split
-# # ---------------------------------
-# X_train, X_test, y_train, y_test = train_test_split(
-#     X, y,
-#     test_size=0.2,
-#     random_state=42,
-#     stratify=y
-# )
-
-
-# best_model = None
-# best_score = 0
-# best_name = ""
-
-
-# # ---------------------------------
-# # 7️⃣ Train + Evaluate
-# # ---------------------------------
-# for name, model in models.items():
-
-#     pipeline = Pipeline(
-#         steps=[
-#             ("preprocessor", preprocessor),
-#             ("classifier", model)
-#         ]
-#     )
-
-#     pipeline.fit(X_train, y_train)
-
-#     preds = pipeline.predict(X_test)
-#     acc = accuracy_score(y_test, preds)
-
-#     print(f"\n{name} Accuracy: {acc:.4f}")
-#     print(classification_report(y_test, preds))
-
-#     if acc > best_score:
-#         best_score = acc
-#         best_model = pipeline
-#         best_name = name
-
-
-# # ---------------------------------
-# # 8️⃣ Save Best Pipeline
-# # ---------------------------------
-# save_path = os.path.join(
-#     os.path.dirname(__file__),
-#     "digital_addiction_pipeline.pkl"
-# )
-
-# joblib.dump(best_model, save_path)
-
-# print("\n✅ BEST MODEL:", best_name)
-# print("✅ Accuracy:", best_score)
-# print("✅ Saved to:", save_path)
+"""
+Training and holdout evaluation for the risk model.
+
+Used by `manage.py train_model`; the resulting scores are stored as
+assessment.models.ModelEvaluation rows and shown on the metrics page.
+"""
+from ml.features import feature_frame
+from ml.predictor import RISK_LABELS, SELF_RATED_RISK
+
+MIN_TRAINING_ROWS = 50
+
+# self_rated_da key -> model class
+LABEL_CLASSES = {
+    key: cls
+    for cls, label in RISK_LABELS.items()
+    for key, rated in SELF_RATED_RISK.items()
+    if rated == label
+}
+
+
+def encode_labelled(assessments):
+    """
+    Feature frame X (TRAINING_COLUMNS, from the stored feature vectors) and
+    class vector y taken from self_rated_da, skipping unlabelled rows.
+    """
+    import numpy as np
+
+    assessments = [a for a in assessments if a.self_rated_da in LABEL_CLASSES]
+    X = feature_frame(assessments)
+    y = np.array([LABEL_CLASSES[a.self_rated_da] for a in assessments], dtype=int)
+    return X, y
+
+
+def build_dataset(assessments):
+    """
+    encode_labelled() with the sanity checks needed for a full retrain.
+    """
+    import numpy as np
+
+    X, y = encode_labelled(assessments)
+    if len(y) < MIN_TRAINING_ROWS:
+        raise ValueError(f"Need at least {MIN_TRAINING_ROWS} records to train a reliable ML model.")
+    if len(np.unique(y)) < 2:
+        raise ValueError("Need self-ratings from at least two risk classes to train.")
+    return X, y
+
+
+def split_dataset(X, y, test_size=0.2, random_state=42):
+    from sklearn.model_selection import train_test_split
+
+    try:
+        return train_test_split(X, y, test_size=test_size, random_state=random_state, stratify=y)
+    except ValueError:
+        # A class with a single example can't be stratified
+        return train_test_split(X, y, test_size=test_size, random_state=random_state)
+
+
+def train(X_train, y_train):
+    """
+    Fit the risk model. The mean and std of each feature over X_train are
+    kept on it (feature_mean_, feature_std_) for export_model_artifact,
+    which needs them to explain predictions.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    from ml.artifact import feature_stats
+
+    model = LogisticRegression(C=0.5, class_weight="balanced", max_iter=2000)
+    model.fit(X_train, y_train)
+    model.feature_mean_, model.feature_std_ = feature_stats(X_train)
+    return model
+
+
+def evaluate(model, X_test, y_test):
+    """
+    Score a fitted model on a holdout set.
+
+    Returns a dict with macro accuracy/precision/recall/f1_score, per-class
+    scores keyed by risk label and the confusion matrix (rows = actual).
+    Classes the model predicts outside RISK_LABELS count as wrong answers.
+    """
+    from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+
+    classes = list(RISK_LABELS)
+    labels = [RISK_LABELS[c] for c in classes]
+    y_pred = model.predict(X_test)
+
+    precision, recall, f1, support = precision_recall_fscore_support(
+        y_test, y_pred, labels=classes, zero_division=0,
+    )
+    present = support > 0
+
+    return {
+        "accuracy": float(accuracy_score(y_test, y_pred)),
+        "precision": float(precision[present].mean()) if present.any() else 0.0,
+        "recall": float(recall[present].mean()) if present.any() else 0.0,
+        "f1_score": float(f1[present].mean()) if present.any() else 0.0,
+        "per_class": {
+            label: {
+                "precision": float(precision[i]),
+                "recall": float(recall[i]),
+                "f1_score": float(f1[i]),
+                "support": int(support[i]),
+            }
+            for i, label in enumerate(labels)
+        },
+        "confusion": {
+            "labels": labels,
+            "matrix": confusion_matrix(y_test, y_pred, labels=classes).tolist(),
+        },
+    }
+
+
+def confusion_scores(cells, labels=None):
+    """
+    Per-class precision/recall and overall accuracy from confusion counts.
+
+    cells: iterable of (actual_label, predicted_label, count).
+    Returns {"labels", "matrix", "per_class", "accuracy", "total"}.
+    """
+    labels = list(labels or RISK_LABELS.values())
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = [[0] * len(labels) for _ in labels]
+    total = correct = 0
+
+    for actual, predicted, count in cells:
+        total += count
+        if actual == predicted:
+            correct += count
+        if actual in index and predicted in index:
+            matrix[index[actual]][index[predicted]] += count
+
+    per_class = {}
+    for i, label in enumerate(labels):
+        tp = matrix[i][i]
+        predicted_total = sum(row[i] for row in matrix)
+        actual_total = sum(matrix[i])
+        per_class[label] = {
+            "precision": tp / predicted_total if predicted_total else None,
+            "recall": tp / actual_total if actual_total else None,
+            "support": actual_total,
+        }
+
+    return {
+        "labels": labels,
+        "matrix": matrix,
+        "per_class": per_class,
+        "accuracy": correct / total if total else None,
+        "total": total,
+    }
@@ -0,0 +1,15 @@
+from django.contrib import admin
+from .models import FeatureDriftCount, RequestProfile
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ("path", "view_name", "duration_ms", "sample_count", "trigger", "created_at")
+    list_filter = ("trigger", "view_name")
+    exclude = ("folded_stacks",)
+
+
+@admin.register(FeatureDriftCount)
+class FeatureDriftCountAdmin(admin.ModelAdmin):
+    list_display = ("baseline", "window", "slot", "count")
+    list_filter = ("baseline", "window")
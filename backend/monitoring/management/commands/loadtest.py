@@ -0,0 +1,259 @@
+"""
+HTTP load generator for the predict and dashboard endpoints.
+
+Works against any running instance (runserver, gunicorn, uvicorn):
+
+    python manage.py loadtest --base-url http://127.0.0.1:8000 --users 50 \
+        --concurrency 20 --duration 60 --mix predict=5,dashboard=4,insights=1 \
+        --admin-username admin --admin-password ...
+
+Synthetic students are registered and logged in through the normal
+/auth/register/ and /auth/login/ forms, so every request carries a real
+session cookie. Use --rate for an open-loop test at a fixed request rate
+instead of --concurrency closed-loop workers.
+"""
+import asyncio
+import random
+import time
+from collections import defaultdict
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from assessment.models import DigitalAddictionAssessment as Assessment
+
+
+PLATFORMS = ["YouTube", "TikTok", "Instagram", "Facebook", "WhatsApp", "X", "Snapchat", "Gaming"]
+
+
+def random_assessment():
+    """
+    A valid /api/assessment/predict/ payload with random answers.
+    """
+    def pick(choices):
+        return random.choice(choices)[0]
+
+    data = {
+        "institute": f"Load Test College {random.randint(1, 5)}",
+        "age": random.randint(15, 45),
+        "gender": pick(Assessment.GENDER_CHOICES),
+        "primary_device": pick(Assessment.DEVICE_CHOICES),
+        "own_smartphone": pick(Assessment.YES_NO_CHOICES),
+        "mobile_data": pick(Assessment.MOBILE_DATA_CHOICES),
+        "screen_weekdays": pick(Assessment.SCREEN_TIME_CHOICES),
+        "screen_weekends": pick(Assessment.SCREEN_TIME_CHOICES),
+        "night_phone_use": pick(Assessment.NIGHT_PHONE_USE_CHOICES),
+        "notif_per_hour": pick(Assessment.NOTIF_CHOICES),
+        "social_time": pick(Assessment.SOCIAL_TIME_CHOICES),
+        "gaming_time": pick(Assessment.GAMING_TIME_CHOICES),
+        "platforms": random.sample(PLATFORMS, random.randint(0, 4)),
+        "self_rated_da": pick(Assessment.SELF_RATED_CHOICES),
+    }
+    for i in range(1, 9):
+        data[f"da{i}"] = random.randint(1, 5)
+    return data
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise CommandError(f"Unknown operation '{name}' in --mix (choose from {', '.join(OPERATIONS)}).")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def submit_form(client, path, data):
+    """
+    GET a form page for its CSRF cookie, then POST the form to it.
+    """
+    await client.get(path)
+    data = dict(data, csrfmiddlewaretoken=client.cookies.get("csrftoken", ""))
+    return await client.post(path, data=data)
+
+
+async def log_in(client, username, password):
+    response = await submit_form(client, "/auth/login/", {"username": username, "password": password})
+    if response.status_code != 302:
+        raise CommandError(f"Login failed for '{username}' (HTTP {response.status_code}).")
+
+
+async def predict(students, admin):
+    client = random.choice(students)
+    return await client.post(
+        "/api/assessment/predict/",
+        json=random_assessment(),
+        headers={"X-CSRFToken": client.cookies.get("csrftoken", "")},
+    )
+
+
+async def dashboard(students, admin):
+    return await random.choice(students).get("/dashboards/student/")
+
+
+async def insights(students, admin):
+    return await admin.get("/dashboards/admin/insights/")
+
+
+OPERATIONS = {
+    "predict": predict,
+    "dashboard": dashboard,
+    "insights": insights,
+}
+
+
+class Command(BaseCommand):
+    help = "Drive a mix of predict, student dashboard and admin insights requests and report latency percentiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--users", type=int, default=20, help="Synthetic student accounts to register and log in.")
+        parser.add_argument("--user-prefix", default="loadtest_student")
+        parser.add_argument("--password", default="LoadTest#2024")
+        parser.add_argument("--admin-username", help="Staff account for the insights page.")
+        parser.add_argument("--admin-password")
+        parser.add_argument("--mix", default="predict=5,dashboard=4,insights=1",
+                            help="Relative weights, e.g. predict=5,dashboard=4,insights=1.")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds to run.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Closed-loop workers.")
+        parser.add_argument("--rate", type=float, help="Open-loop target requests per second (overrides --concurrency).")
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+        if "insights" in mix and not options["admin_username"]:
+            self.stdout.write(self.style.WARNING("No --admin-username given; skipping insights requests."))
+            mix.pop("insights")
+        if not mix:
+            raise CommandError("Nothing to run.")
+
+        results, elapsed = asyncio.run(self.run(options, mix))
+        self.report(results, elapsed)
+
+    # --------------------------------------------------
+    # Setup
+    # --------------------------------------------------
+    def new_client(self, options):
+        return httpx.AsyncClient(base_url=options["base_url"], timeout=options["timeout"])
+
+    async def create_students(self, options):
+        password = options["password"]
+        clients = []
+
+        async def setup(i):
+            username = f"{options['user_prefix']}_{i}"
+            client = self.new_client(options)
+            # Registering an existing username just re-renders the form
+            await submit_form(client, "/auth/register/", {
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": password,
+                "confirm_password": password,
+            })
+            await log_in(client, username, password)
+            clients.append(client)
+
+        await asyncio.gather(*(setup(i) for i in range(options["users"])))
+        return clients
+
+    # --------------------------------------------------
+    # Load loops
+    # --------------------------------------------------
+    async def run(self, options, mix):
+        self.stdout.write(f"Registering and logging in {options['users']} students...")
+        students = await self.create_students(options)
+
+        admin = None
+        if "insights" in mix:
+            admin = self.new_client(options)
+            await log_in(admin, options["admin_username"], options["admin_password"])
+
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        results = defaultdict(lambda: {"latencies": [], "errors": 0, "refused": 0})
+
+        async def fire(name, scheduled):
+            try:
+                response = await OPERATIONS[name](students, admin)
+                ok = response.status_code < 400
+                # Throttled (429) or shed (503) by admission control
+                refused = response.status_code in (429, 503)
+            except httpx.HTTPError:
+                ok = refused = False
+            # Measured from the scheduled start, so queueing delay isn't hidden
+            results[name]["latencies"].append(time.perf_counter() - scheduled)
+            if refused:
+                results[name]["refused"] += 1
+            elif not ok:
+                results[name]["errors"] += 1
+
+        started = time.perf_counter()
+        deadline = started + options["duration"]
+
+        if options["rate"]:
+            self.stdout.write(f"Open loop at {options['rate']} req/s for {options['duration']}s...")
+            interval = 1 / options["rate"]
+            pending = set()
+            scheduled = started
+            while scheduled < deadline:
+                await asyncio.sleep(max(0, scheduled - time.perf_counter()))
+                task = asyncio.create_task(fire(random.choices(names, weights)[0], scheduled))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                scheduled += interval
+            await asyncio.gather(*pending)
+        else:
+            self.stdout.write(f"Closed loop with {options['concurrency']} workers for {options['duration']}s...")
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await fire(random.choices(names, weights)[0], time.perf_counter())
+
+            await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+
+        elapsed = time.perf_counter() - started
+
+        for client in students + ([admin] if admin else []):
+            await client.aclose()
+
+        return results, elapsed
+
+    # --------------------------------------------------
+    # Report
+    # --------------------------------------------------
+    def report(self, results, elapsed):
+        header = f"{'operation':<12}{'requests':>10}{'errors':>8}{'refused':>9}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        self.stdout.write("")
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        all_latencies = []
+        total_errors = total_refused = 0
+        for name, result in sorted(results.items()):
+            latencies = sorted(result["latencies"])
+            all_latencies.extend(latencies)
+            total_errors += result["errors"]
+            total_refused += result["refused"]
+            self.stdout.write(self.format_row(name, latencies, result["errors"], result["refused"], elapsed))
+
+        self.stdout.write("-" * len(header))
+        self.stdout.write(self.format_row("total", sorted(all_latencies), total_errors, total_refused, elapsed))
+
+    def format_row(self, name, latencies, errors, refused, elapsed):
+        ms = [percentile(latencies, q) * 1000 for q in (50, 90, 95, 99, 100)]
+        return (
+            f"{name:<12}{len(latencies):>10}{errors:>8}{refused:>9}{len(latencies) / elapsed:>9.1f}"
+            + "".join(f"{value:>9.1f}" for value in ms)
+        )
@@ -0,0 +1,149 @@
+"""
+Prometheus metrics for the prediction and dashboard hot paths.
+
+When PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py does this), every
+worker writes its samples to small mmap'd files in that directory and the
+/metrics view merges them, so counters and histograms add up across all
+gunicorn workers instead of reporting whichever worker served the scrape.
+"""
+import os
+import time
+from functools import wraps
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CONFIDENCE_BUCKETS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0)
+
+
+VIEW_LATENCY = Histogram(
+    "daras_view_latency_seconds",
+    "Time spent in a view, excluding middleware.",
+    ["view"],
+    buckets=LATENCY_BUCKETS,
+)
+
+PREDICTIONS = Counter(
+    "daras_predictions_total",
+    "Predictions served, by predicted risk class.",
+    ["risk"],
+)
+
+RISK_CONFIDENCE = Histogram(
+    "daras_risk_confidence",
+    "Confidence (max class probability) of served predictions.",
+    buckets=CONFIDENCE_BUCKETS,
+)
+
+MODEL_LOAD_SECONDS = Gauge(
+    "daras_model_load_seconds",
+    "Time taken to load the risk model in a worker.",
+    multiprocess_mode="max",
+)
+
+WARMUP_SECONDS = Gauge(
+    "daras_warmup_seconds",
+    "Time taken by a worker's warm-up before it reported ready.",
+    multiprocess_mode="max",
+)
+
+MODEL_INFO = Gauge(
+    "daras_model_info",
+    "Loaded risk model; the value is always 1.",
+    ["version", "artifact"],
+    multiprocess_mode="max",
+)
+
+FEATURE_PSI = Gauge(
+    "daras_feature_psi",
+    "Population stability index of a model feature vs the training baseline.",
+    ["feature"],
+    multiprocess_mode="mostrecent",
+)
+
+FEATURE_KL = Gauge(
+    "daras_feature_kl_divergence",
+    "KL divergence of a model feature's live distribution from the training baseline.",
+    ["feature"],
+    multiprocess_mode="mostrecent",
+)
+
+CACHED_COMPUTATIONS = Counter(
+    "daras_cached_computations_total",
+    "Expensive dashboard computations requested, by outcome: fresh, recomputed, "
+    "stale or waited (coalesced into another worker's recomputation), timed_out.",
+    ["name", "outcome"],
+)
+
+THROTTLED_REQUESTS = Counter(
+    "daras_throttled_requests_total",
+    "Requests refused with 429 by a rate limit, by throttle scope.",
+    ["scope"],
+)
+
+SHED_REQUESTS = Counter(
+    "daras_shed_requests_total",
+    "Predict requests refused with 503 by load shedding, by reason: queue, in_flight or p99.",
+    ["reason"],
+)
+
+JOBS = Counter(
+    "daras_jobs_total",
+    "Background job runs, by task and outcome: succeeded, retried or failed.",
+    ["task", "outcome"],
+)
+
+JOB_DURATION = Histogram(
+    "daras_job_duration_seconds",
+    "Wall time of one background job run.",
+    ["task"],
+    buckets=LATENCY_BUCKETS + (60, 300, 1800),
+)
+
+
+def observe_latency(view_name):
+    """
+    Decorator recording the wrapped view's wall time in VIEW_LATENCY.
+    Works for plain view functions and for APIView handler methods.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                VIEW_LATENCY.labels(view=view_name).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_prediction(risk_label, confidence):
+    PREDICTIONS.labels(risk=risk_label).inc()
+    if confidence is not None:
+        RISK_CONFIDENCE.observe(confidence)
+
+
+def render_latest():
+    """
+    Returns (payload, content_type) for the current metric values,
+    merged across worker processes when running in multiprocess mode.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return generate_latest(registry), CONTENT_TYPE_LATEST
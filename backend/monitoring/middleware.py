@@ -0,0 +1,75 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+
+from monitoring.profiling import StackSampler, fold
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when a staff user asks for it with ``?profile=1``
+    or an ``X-Daras-Profile: 1`` header, or when the request is picked by
+    the 1-in-PROFILING_SAMPLE_RATE sampler. Profiles are stored as
+    RequestProfile rows and browsable at /monitoring/profiles/.
+
+    Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = self.trigger_for(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL).start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+        duration = time.perf_counter() - started
+
+        try:
+            self.save_profile(request, response, trigger, duration, stacks)
+        except Exception as e:
+            # Never fail the request because the profile couldn't be stored
+            print("Profile save error:", e)
+
+        return response
+
+    def trigger_for(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            if request.GET.get("profile") == "1":
+                return "query"
+            if request.headers.get("X-Daras-Profile") == "1":
+                return "header"
+
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate and random.randrange(rate) == 0:
+            return "sampled"
+
+        return None
+
+    def save_profile(self, request, response, trigger, duration, stacks):
+        from monitoring.models import RequestProfile
+
+        match = getattr(request, "resolver_match", None)
+        user = request.user if request.user.is_authenticated else None
+
+        RequestProfile.objects.create(
+            path=request.path[:255],
+            method=request.method,
+            view_name=(match.view_name if match else "")[:100],
+            status_code=response.status_code,
+            trigger=trigger,
+            user=user,
+            duration_ms=round(duration * 1000, 2),
+            sample_count=sum(stacks.values()),
+            folded_stacks=fold(stacks, settings.PROFILING_MAX_BYTES),
+        )
+        RequestProfile.prune(settings.PROFILING_MAX_PROFILES)
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeatureDriftCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('baseline', models.CharField(max_length=32)),
+                ('window', models.DateField()),
+                ('slot', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('baseline', 'window', 'slot'), name='unique_drift_slot')],
+            },
+        ),
+    ]
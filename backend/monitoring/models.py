@@ -0,0 +1,59 @@
+from django.db import models
+from django.conf import settings
+
+
+class RequestProfile(models.Model):
+    """
+    A sampled profile of a single request, in folded-stack format.
+    """
+    TRIGGER_CHOICES = [
+        ('query', 'Query parameter'),
+        ('header', 'Request header'),
+        ('sampled', 'Random sample'),
+    ]
+
+    path = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    view_name = models.CharField(max_length=100, blank=True, db_index=True)
+    status_code = models.PositiveSmallIntegerField()
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    duration_ms = models.FloatField()
+    sample_count = models.PositiveIntegerField()
+    folded_stacks = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    @classmethod
+    def prune(cls, keep):
+        """
+        Delete all but the newest `keep` profiles.
+        """
+        stale = cls.objects.order_by("-id").values_list("id", flat=True)[keep:]
+        cls.objects.filter(id__in=list(stale)).delete()
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms} ms)"
+
+
+class FeatureDriftCount(models.Model):
+    """
+    Live count for one histogram bin ("slot", see ml/drift.py) of one
+    model feature on one day, for one drift baseline.
+    """
+    baseline = models.CharField(max_length=32)
+    window = models.DateField()
+    slot = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["baseline", "window", "slot"], name="unique_drift_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.baseline} {self.window} slot {self.slot}: {self.count}"
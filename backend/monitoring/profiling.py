@@ -0,0 +1,100 @@
+"""
+Low-overhead sampling profiler for individual requests.
+
+A helper thread wakes up every PROFILING_INTERVAL seconds, grabs the
+request thread's current Python stack and counts it. The result is a
+set of "folded" stacks (``outer;inner;leaf count`` per line), the input
+format of flamegraph.pl, speedscope and inferno.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+
+
+def frame_label(code):
+    filename = os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="daras-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            labels = []
+            while frame is not None:
+                labels.append(frame_label(frame.f_code))
+                frame = frame.f_back
+
+            self.stacks[";".join(reversed(labels))] += 1
+
+
+def fold(stacks, max_bytes):
+    """
+    Render sampled stacks in folded format, most frequent first.
+    Stacks that would push the text past max_bytes are summed into
+    a single "[truncated]" line so totals stay correct.
+    """
+    lines = []
+    size = 0
+    dropped = 0
+
+    for stack, count in stacks.most_common():
+        line = f"{stack} {count}"
+        if size + len(line) + 1 > max_bytes:
+            dropped += count
+            continue
+        lines.append(line)
+        size += len(line) + 1
+
+    if dropped:
+        lines.append(f"[truncated] {dropped}")
+
+    return "\n".join(lines)
+
+
+def hottest_frames(folded, limit=25):
+    """
+    Returns (label, self_samples, total_samples) for the busiest frames
+    of a folded profile, ordered by self samples.
+    """
+    self_counts = Counter()
+    total_counts = Counter()
+
+    for line in folded.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if not stack:
+            continue
+        count = int(count)
+        frames = stack.split(";")
+        self_counts[frames[-1]] += count
+        for label in set(frames):
+            total_counts[label] += count
+
+    return [
+        (label, samples, total_counts[label])
+        for label, samples in self_counts.most_common(limit)
+    ]
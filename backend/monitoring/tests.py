@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+from collections import Counter
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from assessment.models import DigitalAddictionAssessment
+from assessment.tests import PAYLOAD
+from dashboards.tests import TEMPLATE_STORAGES
+from ml import drift
+from ml.features import feature_frame
+from monitoring.models import RequestProfile
+from monitoring.profiling import fold
+from monitoring.warmup import WarmUp
+from ml.predictor import RISK_LABELS
+
+
+class PrometheusMetricsTest(TestCase):
+
+    def test_only_allowed_addresses_can_scrape(self):
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.7").status_code, 403)
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"daras_predictions_total", response.content)
+
+    def test_prediction_is_counted_and_timed(self):
+        user = get_user_model().objects.create_user("student1", password="test-password-123", role="student")
+        self.client.force_login(user)
+
+        def sample(name, **labels):
+            return REGISTRY.get_sample_value(name, labels) or 0
+
+        predictions = sum(sample("daras_predictions_total", risk=risk) for risk in RISK_LABELS.values())
+        timed = sample("daras_view_latency_seconds_count", view="predict_assessment")
+
+        response = self.client.post("/api/assessment/predict/", PAYLOAD, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            sum(sample("daras_predictions_total", risk=risk) for risk in RISK_LABELS.values()),
+            predictions + 1,
+        )
+        self.assertEqual(sample("daras_view_latency_seconds_count", view="predict_assessment"), timed + 1)
+
+
+class ProfilingTest(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user("admin1", password="test-password-123", role="admin", is_staff=True)
+        self.student = User.objects.create_user("student1", password="test-password-123", role="student")
+
+    def test_staff_can_ask_for_a_profile(self):
+        self.client.force_login(self.staff)
+        self.client.get("/ready", {"profile": "1"})
+        self.client.get("/ready", HTTP_X_DARAS_PROFILE="1")
+        self.client.get("/ready")
+
+        profiles = RequestProfile.objects.order_by("id")
+        self.assertEqual([profile.trigger for profile in profiles], ["query", "header"])
+        profile = profiles[0]
+        self.assertEqual((profile.path, profile.view_name, profile.user), ("/ready", "readiness", self.staff))
+
+        response = self.client.get(f"/monitoring/profiles/{profile.pk}/folded/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), profile.folded_stacks)
+
+    def test_students_cannot_profile_or_browse(self):
+        self.client.force_login(self.student)
+        self.client.get("/ready", {"profile": "1"})
+        self.assertFalse(RequestProfile.objects.exists())
+
+        profile = RequestProfile.objects.create(
+            path="/ready", method="GET", status_code=200, trigger="query", duration_ms=1, sample_count=0,
+        )
+        self.assertRedirects(
+            self.client.get(f"/monitoring/profiles/{profile.pk}/folded/"), reverse("student_dashboard"),
+            fetch_redirect_response=False,
+        )
+
+    @override_settings(PROFILING_SAMPLE_RATE=1, PROFILING_MAX_PROFILES=3)
+    def test_sampled_profiles_are_pruned_to_the_newest(self):
+        for _ in range(5):
+            self.client.get("/ready")
+
+        self.assertEqual(RequestProfile.objects.count(), 3)
+        self.assertEqual(set(RequestProfile.objects.values_list("trigger", flat=True)), {"sampled"})
+
+    def test_fold_keeps_totals_when_truncating(self):
+        stacks = Counter({"main;view;query": 6, "main;view;render": 3, "main;middleware": 1})
+        self.assertEqual(fold(stacks, 1000), "main;view;query 6\nmain;view;render 3\nmain;middleware 1")
+        self.assertEqual(fold(stacks, 40), "main;view;query 6\nmain;view;render 3\n[truncated] 1")
+
+
+@override_settings(STORAGES=TEMPLATE_STORAGES)
+class FeatureDriftTest(TestCase):
+
+    def setUp(self):
+        # Training data with every DA answer equally common
+        answers = dict(PAYLOAD)
+        del answers["institute"]
+        rows = [
+            DigitalAddictionAssessment(**dict(answers, **{f"da{i}": level for i in range(1, 9)}))
+            for level in range(1, 6) for _ in range(20)
+        ]
+        baseline = drift.build_baseline(feature_frame(rows).to_numpy(dtype=float))
+
+        path = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        with path:
+            json.dump(baseline, path)
+        self.addCleanup(os.remove, path.name)
+
+        settings_override = override_settings(DRIFT_BASELINE_PATH=path.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Loaded once per process: forget the baseline loaded before this test
+        loaded = mock.patch.multiple(drift, _baseline=None, _baseline_loaded=False, _ready_windows=set())
+        loaded.start()
+        self.addCleanup(loaded.stop)
+
+        User = get_user_model()
+        self.staff = User.objects.create_user("admin1", password="test-password-123", role="admin", is_staff=True)
+        self.student = User.objects.create_user("student1", password="test-password-123", role="student")
+
+    def test_divergence(self):
+        psi, kl = drift.divergence([10, 20, 30], [20, 40, 60])
+        self.assertAlmostEqual(psi, 0, places=2)
+        self.assertAlmostEqual(kl, 0, places=2)
+        psi, kl = drift.divergence([50, 50], [100, 0])
+        self.assertGreater(psi, drift.PSI_SIGNIFICANT)
+
+    def test_scored_assessments_are_counted_against_the_baseline(self):
+        self.client.force_login(self.student)
+        for _ in range(3):
+            answers = dict(PAYLOAD, **{f"da{i}": 5 for i in range(1, 9)})
+            self.client.post("/api/assessment/predict/", answers, content_type="application/json")
+
+        report = drift.drift_report(1)
+        self.assertEqual(report["rows"], 3)
+        features = {feature["name"]: feature for feature in report["features"]}
+        # Everyone answered 5: the live counts all fall in the top bin
+        self.assertEqual(features["da1_time_loss"]["actual"], [0, 0, 0, 0, 3])
+        self.assertGreater(features["da1_time_loss"]["psi"], drift.PSI_SIGNIFICANT)
+        self.assertEqual(report["features"][0]["psi"], max(f["psi"] for f in report["features"]))
+
+        self.client.force_login(self.staff)
+        response = self.client.get("/monitoring/drift/", {"days": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.context["shifted"], 0)
+
+
+class ReadinessTest(TestCase):
+
+    def setUp(self):
+        self.warmup = WarmUp()
+        patcher = mock.patch("monitoring.views.warmup", self.warmup)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ready_only_after_warming_up(self):
+        from ml.predictor import MODEL_VERSION
+
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "cold")
+
+        self.assertTrue(self.warmup.run())
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report["status"], report["model_version"]), ("ready", MODEL_VERSION))
+        self.assertEqual(set(report["steps"]), {"model", "scoring", "database", "templates"})
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        # Synthetic assessments are scored, never saved
+        self.assertFalse(DigitalAddictionAssessment.objects.exists())
+
+    def test_failed_warm_up_stays_unready(self):
+        with mock.patch("monitoring.warmup.warm_up", side_effect=RuntimeError("model missing")):
+            self.assertFalse(self.warmup.run())
+
+        response = self.client.get("/ready")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "failed", "error": "model missing"})
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import prometheus_metrics
+from . import views
+
+urlpatterns = [
+    path('metrics', prometheus_metrics, name='prometheus-metrics'),
+    path('ready', views.readiness, name='readiness'),
+
+    # Staff pages
+    path('monitoring/profiles/', views.profile_list, name='profile-list'),
+    path('monitoring/profiles/<int:pk>/', views.profile_detail, name='profile-detail'),
+    path('monitoring/profiles/<int:pk>/folded/', views.profile_folded, name='profile-folded'),
+    path('monitoring/drift/', views.feature_drift, name='feature-drift'),
+]
@@ -0,0 +1,135 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.cache import never_cache
+
+from ml.drift import PSI_MODERATE, PSI_SIGNIFICANT, drift_report, refresh_drift_gauges
+from monitoring.metrics import render_latest
+from monitoring.models import RequestProfile
+from monitoring.profiling import hottest_frames
+from monitoring.warmup import warmup
+
+
+# ================================
+# PROMETHEUS SCRAPE ENDPOINT
+# ================================
+def prometheus_metrics(request):
+    # Only a scraper on an allowed address (localhost by default) may read metrics
+    if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden("Forbidden")
+
+    refresh_drift_gauges()
+    payload, content_type = render_latest()
+    return HttpResponse(payload, content_type=content_type)
+
+
+# ================================
+# READINESS PROBE
+# ================================
+@never_cache
+def readiness(request):
+    """
+    200 once this process has warmed up (monitoring/warmup.py), with its
+    model load and warm-up times; 503 until then. Open to anyone, so load
+    balancers can probe it.
+    """
+    if not warmup.ready:
+        return JsonResponse({"status": warmup.status, "error": warmup.error}, status=503)
+
+    return JsonResponse({"status": "ready", "pid": os.getpid(), **warmup.report})
+
+
+# ================================
+# STAFF – REQUEST PROFILES
+# ================================
+@login_required
+def profile_list(request):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    profiles = RequestProfile.objects.defer("folded_stacks")
+
+    view_name = request.GET.get("view")
+    if view_name:
+        profiles = profiles.filter(view_name=view_name)
+
+    view_names = (
+        RequestProfile.objects.exclude(view_name="")
+        .order_by("view_name")
+        .values_list("view_name", flat=True)
+        .distinct()
+    )
+
+    return render(request, 'admin/profiles.html', {
+        'profiles': profiles[:100],
+        'view_names': view_names,
+        'selected_view': view_name,
+    })
+
+
+@login_required
+def profile_detail(request, pk):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    profile = get_object_or_404(RequestProfile, pk=pk)
+
+    return render(request, 'admin/profile_detail.html', {
+        'profile': profile,
+        'hottest_frames': hottest_frames(profile.folded_stacks),
+    })
+
+
+@login_required
+def profile_folded(request, pk):
+    """
+    Raw folded stacks, ready for flamegraph.pl or speedscope.app.
+    """
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    profile = get_object_or_404(RequestProfile, pk=pk)
+
+    response = HttpResponse(profile.folded_stacks, content_type="text/plain; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="profile-{profile.pk}.folded"'
+    return response
+
+
+# ================================
+# STAFF – FEATURE DRIFT
+# ================================
+@login_required
+def feature_drift(request):
+    if not (request.user.is_staff or request.user.is_superuser):
+        return redirect('student_dashboard')
+
+    try:
+        days = max(1, min(int(request.GET.get("days", settings.DRIFT_WINDOW_DAYS)), 365))
+    except ValueError:
+        days = settings.DRIFT_WINDOW_DAYS
+
+    report = drift_report(days)
+
+    features = []
+    if report:
+        for feature in report["features"]:
+            if feature["psi"] >= PSI_SIGNIFICANT:
+                status = "significant"
+            elif feature["psi"] >= PSI_MODERATE:
+                status = "moderate"
+            else:
+                status = "stable"
+            features.append({**feature, "status": status})
+
+    return render(request, "admin/drift.html", {
+        "report": report,
+        "features": features,
+        "days": days,
+        "day_choices": [1, 7, 30, 90],
+        "shifted": sum(1 for f in features if f["status"] != "stable"),
+        "psi_moderate": PSI_MODERATE,
+        "psi_significant": PSI_SIGNIFICANT,
+    })
@@ -0,0 +1,180 @@
+"""
+Per-process warm-up, and the readiness state behind the /ready probe.
+
+A fresh worker's first prediction pays for the model load (unpickling or
+mapping the artifact), importing numpy and pandas, compiling the feature
+maps and the first calls through the scoring code, and its first pages
+for opening a database connection and compiling templates. warm_up() does
+all of that ahead of time: it loads the model, scores a few synthetic
+assessments without saving them, runs a trivial query and compiles the
+busiest templates.
+
+It always runs before the process serves anything, never alongside
+requests (importing pandas or plotly on a side thread while a request
+uses them half-imported fails that request):
+
+    gunicorn            every worker, in post_worker_init (gunicorn.conf.py)
+    other servers       while daras/wsgi.py or daras/asgi.py loads the
+                        application, with WARMUP_ON_STARTUP on; uvicorn
+                        --workers and runserver load it in each process
+                        before taking connections
+
+/ready answers 503 until this process has warmed up, or when its warm-up
+failed; it never starts one. A process that was never asked to warm up
+stays unready, so only turn on readiness probes where one of the above
+runs.
+"""
+import importlib
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.template.loader import get_template
+
+from monitoring.metrics import WARMUP_SECONDS
+
+# Compiled ahead of the first visitor (kept by the cached template loader
+# when DEBUG is off)
+WARMUP_TEMPLATES = (
+    "auth/login.html",
+    "dashboards/student.html",
+    "dashboards/admin.html",
+    "students/use_model.html",
+    "students/assessment_result.html",
+    "students/history.html",
+    "students/details.html",
+)
+
+
+def synthetic_assessments():
+    """
+    Unsaved assessments spanning the answer scale, lowest to highest.
+    """
+    from assessment.models import DigitalAddictionAssessment as Assessment
+
+    def answers(level):
+        def pick(choices):
+            return choices[round(level * (len(choices) - 1))][0]
+
+        assessment = Assessment(
+            institute_name="Warm-up College",
+            age=16 + round(level * 20),
+            gender=pick(Assessment.GENDER_CHOICES),
+            primary_device=pick(Assessment.DEVICE_CHOICES),
+            own_smartphone=pick(Assessment.YES_NO_CHOICES),
+            mobile_data=pick(Assessment.MOBILE_DATA_CHOICES),
+            screen_weekdays=pick(Assessment.SCREEN_TIME_CHOICES),
+            screen_weekends=pick(Assessment.SCREEN_TIME_CHOICES),
+            night_phone_use=pick(Assessment.NIGHT_PHONE_USE_CHOICES),
+            notif_per_hour=pick(Assessment.NOTIF_CHOICES),
+            social_time=pick(Assessment.SOCIAL_TIME_CHOICES),
+            gaming_time=pick(Assessment.GAMING_TIME_CHOICES),
+            platforms=["YouTube", "TikTok", "Instagram", "WhatsApp"][:round(level * 4)],
+            self_rated_da=pick(Assessment.SELF_RATED_CHOICES),
+            **{f"da{i}": 1 + round(level * 4) for i in range(1, 9)},
+        )
+        assessment.sync_platforms()
+        return assessment
+
+    return [answers(level) for level in (0.0, 0.5, 1.0)]
+
+
+def warm_up():
+    """
+    Load and exercise everything a first prediction or page would
+    otherwise pay for. Returns the model's load time and how long each
+    step took, in seconds.
+    """
+    from ml import predictor
+    from ml.drift import get_baseline
+    from ml.features import feature_frame, get_feature_maps
+
+    steps = {}
+    started = step = time.perf_counter()
+
+    def done(name):
+        nonlocal step
+        now = time.perf_counter()
+        steps[name] = round(now - step, 4)
+        step = now
+
+    for name in predictor.PRELOAD_MODULES:
+        importlib.import_module(name)
+    predictor.get_pipeline()
+    get_feature_maps()
+    get_baseline()
+    done("model")
+
+    for assessment in synthetic_assessments():
+        predictor.predict_risk_with_explanation(assessment, df=feature_frame([assessment]))
+    done("scoring")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    done("database")
+
+    for name in WARMUP_TEMPLATES:
+        get_template(name)
+    done("templates")
+
+    seconds = time.perf_counter() - started
+    WARMUP_SECONDS.set(seconds)
+    return {
+        "model_version": predictor.MODEL_VERSION,
+        "model_artifact": predictor.MODEL_ARTIFACT,
+        # Measured in the master instead when gunicorn preloaded the model
+        "model_load_seconds": round(predictor.MODEL_LOAD_SECONDS_VALUE, 4),
+        "warmup_seconds": round(seconds, 4),
+        "steps": steps,
+    }
+
+
+class WarmUp:
+    """
+    Warm-up state of this process: cold, warming, ready or failed.
+    """
+
+    def __init__(self):
+        self.status = "cold"
+        self.report = {}
+        self.error = ""
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def run(self):
+        """
+        Warm this process up unless it already is. Returns whether it is
+        ready; concurrent callers wait for the one warm-up.
+        """
+        with self._lock:
+            if self.ready:
+                return True
+            self.status = "warming"
+            try:
+                self.report = warm_up()
+            except Exception as e:
+                print("Warm-up failed:", e)
+                self.status, self.error = "failed", str(e)
+                return False
+            self.status, self.error = "ready", ""
+            return True
+
+
+warmup = WarmUp()
+
+
+def warm_up_on_startup():
+    """
+    For daras/wsgi.py and daras/asgi.py: warm up while the application
+    loads, before the server takes requests, when WARMUP_ON_STARTUP is on.
+    """
+    if not settings.WARMUP_ON_STARTUP:
+        return
+    warmup.run()
+    # Opened on the loading thread, which serves no requests (and in a
+    # preloading master, must not be shared with the forked workers)
+    connection.close()
@@ -0,0 +1,93 @@
+// Assessment result page (students/assessment_result.html): fetches the
+// prediction for the assessment named by #predictionSection's data-assessment-id
+const predictionSection = document.getElementById("predictionSection");
+const assessmentId = predictionSection.dataset.assessmentId;
+const riskText = document.getElementById("riskText");
+const riskBadge = document.getElementById("riskBadge");
+const riskDescription = document.getElementById("riskDescription");
+const riskConfidence = document.getElementById("riskConfidence");
+
+const riskColors = {
+  "Not at Risk": { text: "text-green-600", badgeBg: "bg-green-100", badgeText: "text-green-700", description: "You are currently at low risk of digital addiction." },
+  "Mild": { text: "text-yellow-600", badgeBg: "bg-yellow-100", badgeText: "text-yellow-700", description: "You show mild signs of digital addiction. Monitor your usage." },
+  "Moderate": { text: "text-orange-600", badgeBg: "bg-orange-100", badgeText: "text-orange-700", description: "This individual shows behavioral patterns associated with moderate digital addiction risk." },
+  "Severe": { text: "text-red-600", badgeBg: "bg-red-100", badgeText: "text-red-700", description: "High risk of digital addiction. Immediate intervention recommended." }
+};
+
+function renderFactors(factors, risk) {
+  if (!factors.length) return;
+
+  const list = document.getElementById("factorsList");
+  list.innerHTML = "";
+
+  factors.forEach(factor => {
+    const item = document.createElement("li");
+
+    const row = document.createElement("div");
+    row.className = "flex justify-between text-sm";
+    const name = document.createElement("span");
+    name.textContent = factor.label;
+    const direction = document.createElement("span");
+    direction.textContent = factor.raises ? `towards ${risk}` : `away from ${risk}`;
+    direction.className = factor.raises ? "text-red-600" : "text-green-600";
+    row.append(name, direction);
+
+    const track = document.createElement("div");
+    track.className = "h-2 bg-gray-100 rounded mt-1";
+    const bar = document.createElement("div");
+    bar.className = `h-2 rounded ${factor.raises ? "bg-red-400" : "bg-green-400"}`;
+    bar.style.width = `${factor.width}%`;
+    track.append(bar);
+
+    item.append(row, track);
+    list.append(item);
+  });
+
+  document.getElementById("factorsSection").classList.remove("hidden");
+}
+
+async function fetchResult() {
+  try {
+    const response = await fetch(`/api/assessment/${assessmentId}/`, {
+      headers: { "Content-Type": "application/json" },
+    });
+    if (!response.ok) throw new Error("Failed to fetch assessment result");
+
+    const data = await response.json();
+    const risk = data.predicted_risk || "Not at Risk";
+    const confidence = data.risk_confidence || "N/A";
+    const colors = riskColors[risk] || riskColors["Not at Risk"];
+
+    // Update DOM
+    predictionSection.classList.remove("hidden");
+
+    riskText.textContent = risk;
+    riskText.className = `text-2xl font-bold ${colors.text}`;
+
+    riskBadge.textContent = risk === "Not at Risk" ? "Safe" : risk;
+    riskBadge.className = `text-sm px-3 py-1 rounded-full ${colors.badgeBg} ${colors.badgeText}`;
+
+    riskDescription.textContent = colors.description;
+
+    // Confidence with same color as risk label
+    riskConfidence.textContent = `Confidence: ${confidence}`;
+    riskConfidence.className = `text-sm mt-1 ${colors.text}`;
+
+    renderFactors(data.risk_factors || [], risk);
+
+  } catch (error) {
+    console.error(error);
+    predictionSection.classList.remove("hidden");
+
+    riskText.textContent = "Error";
+    riskText.className = "text-2xl font-bold text-red-600";
+
+    riskBadge.textContent = "Failed";
+    riskBadge.className = "text-sm px-3 py-1 rounded-full bg-red-100 text-red-700";
+
+    riskDescription.textContent = "Unable to load assessment result.";
+    riskConfidence.textContent = "";
+  }
+}
+
+fetchResult();
@@ -0,0 +1,123 @@
+// Live updates for the insights page (admin/insights.html): adds each batch
+// of new assessments to the totals the page was drawn from and redraws in
+// place (dashboards/live.py). Batches come from the server-sent event
+// stream at the script tag's data-stream-url when the page has one (the
+// ASGI application serves it), and otherwise by polling data-updates-url
+// every data-poll-seconds.
+(function () {
+  const {streamUrl, updatesUrl, pollSeconds} = document.currentScript.dataset;
+  const totals = JSON.parse(document.getElementById("live-totals").textContent);
+
+  // Add b into a, key by key (numbers, arrays and nested objects)
+  function add(a, b) {
+    for (const key in b) {
+      if (typeof b[key] === "number") {
+        a[key] = (a[key] || 0) + b[key];
+      } else if (Array.isArray(b[key])) {
+        b[key].forEach((value, i) => { a[key][i] += value; });
+      } else if (b[key] !== null && typeof b[key] === "object") {
+        add(a[key] = a[key] || {}, b[key]);
+      }
+    }
+  }
+
+  function round(value, digits) {
+    const scale = Math.pow(10, digits);
+    return Math.round(value * scale) / scale;
+  }
+
+  function chart(id) {
+    return document.querySelector("#" + id + " .plotly-graph-div");
+  }
+
+  function restyle(id, update) {
+    const div = chart(id);
+    if (div && window.Plotly) {
+      Plotly.restyle(div, update);
+    }
+  }
+
+  function average(field, digits) {
+    return totals.count ? round(totals.sums[field] / totals.count, digits) : 0;
+  }
+
+  function redraw() {
+    // Summary cards, as in insights_context()
+    document.getElementById("stat-total").textContent = totals.count;
+    document.getElementById("stat-screen-weekdays").textContent = average("screen_weekdays_total", 1) + " hrs";
+    document.getElementById("stat-screen-weekends").textContent = average("screen_weekends_total", 1) + " hrs";
+    document.getElementById("stat-gaming").textContent = round(average("gaming_total", 2) * 60, 1) + " mins";
+    document.getElementById("stat-social-media").textContent = round(average("social_media_total", 2) * 60, 1) + " mins";
+
+    // Average DAS by age group
+    const das = Object.values(totals.das_by_age);
+    const scores = das.map(([sum, n]) => n ? round(sum / n, 1) : 0);
+    restyle("chart-das-by-age", {
+      y: [scores],
+      text: [scores.map((score, i) => score + " (" + das[i][1] + ")")],
+    });
+
+    // Night-time use: pie, and percentage per age group
+    const night = Object.values(totals.night_use);
+    const responses = night.reduce((a, b) => a + b, 0);
+    restyle("chart-night-use", {values: [responses ? night : night.map((_, i) => i ? 0 : 1)]});
+    const pie = chart("chart-night-use");
+    if (pie && window.Plotly) {
+      Plotly.relayout(pie, {"title.text": "Night-time phone use after lights-off<br>" + responses + " responses"});
+    }
+
+    const groups = Object.values(totals.night_by_age);
+    const percentages = Object.keys(totals.night_use).map(label => groups.map(group => {
+      const n = Object.values(group).reduce((a, b) => a + b, 0);
+      return n ? group[label] / n * 100 : null;
+    }));
+    restyle("chart-night-by-age", {
+      y: percentages,
+      text: percentages.map(values => values.map(value => value === null ? "" : value.toFixed(1) + "%")),
+    });
+
+    // Platforms, overall and by gender
+    const platforms = Object.values(totals.platforms);
+    restyle("chart-platforms", {y: [platforms], text: [platforms]});
+    const byGender = Object.values(totals.platforms_by_gender).map(counts => Object.values(counts));
+    restyle("chart-platforms-by-gender", {y: byGender, text: byGender});
+
+    // Self-rated risk
+    restyle("chart-self-rated", {values: [Object.values(totals.self_rated)]});
+  }
+
+  // Returns whether the batch was applied
+  function apply(delta) {
+    if (delta.after !== totals.last_id) {
+      return false;     // not the batch that follows ours
+    }
+    totals.last_id = delta.last_id;
+    delete delta.after;
+    delete delta.last_id;
+    add(totals, delta);
+    redraw();
+    return true;
+  }
+
+  if (streamUrl && window.EventSource) {
+    const source = new EventSource(streamUrl + "?since=" + totals.last_id);
+    source.addEventListener("delta", event => apply(JSON.parse(event.data)));
+    return;
+  }
+
+  // Ask again straight away while there is a backlog
+  async function poll() {
+    let more = false;
+    try {
+      const response = await fetch(updatesUrl + "?since=" + totals.last_id);
+      if (response.status === 200) {
+        more = apply(await response.json());
+      }
+    } catch (error) {
+      console.error(error);
+    }
+    setTimeout(poll, more ? 0 : pollSeconds * 1000);
+  }
+
+  setTimeout(poll, pollSeconds * 1000);
+})();
@@ -0,0 +1,16 @@
+// Shared by every page: the header's mobile menu toggle and the footer year.
+// Loaded with defer, so the whole page is parsed when this runs.
+(function () {
+  const menuBtn = document.getElementById("menu-btn");
+  const mobileMenu = document.getElementById("mobile-menu");
+  if (menuBtn && mobileMenu) {
+    menuBtn.addEventListener("click", () => {
+      mobileMenu.classList.toggle("hidden");
+    });
+  }
+
+  const year = document.getElementById("year");
+  if (year) {
+    year.textContent = new Date().getFullYear();
+  }
+})();
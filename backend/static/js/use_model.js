@@ -0,0 +1,66 @@
+// Assessment form (students/use_model.html): submits the answers to the
+// predict API and opens the result page
+document
+  .getElementById("behaviorForm")
+  .addEventListener("submit", async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+
+    // Build JSON object with DA1–DA8 as integers
+    const data = {
+      institute: formData.get("institute") || "",
+      age: formData.get("age") || "",
+      gender: formData.get("gender") || "Male", // default to Male
+
+      // Digital Addiction Compulsive Behaviours
+      da1: parseInt(formData.get("da1") || "1"),
+      da2: parseInt(formData.get("da2") || "1"),
+      da3: parseInt(formData.get("da3") || "1"),
+      da4: parseInt(formData.get("da4") || "1"),
+      da5: parseInt(formData.get("da5") || "1"),
+      da6: parseInt(formData.get("da6") || "1"),
+      da7: parseInt(formData.get("da7") || "1"),
+      da8: parseInt(formData.get("da8") || "1"),
+
+      // Digital Addiction multiple-choice fields
+      primary_device: formData.get("primary_device") || "Smartphone",
+      own_smartphone: formData.get("own_smartphone") || "Yes",
+      mobile_data: formData.get("mobile_data") || "Always",
+      screen_weekdays: formData.get("screen_weekdays") || "<2h",
+      screen_weekends: formData.get("screen_weekends") || "<2h",
+      night_phone_use: formData.get("night_phone_use") || "Never",
+      notif_per_hour: formData.get("notif_per_hour") || "<5 times",
+      social_time: formData.get("social_time") || "<1h",
+      gaming_time: formData.get("gaming_time") || "None",
+
+      // Platforms (checkboxes)
+      platforms: Array.from(
+        e.target.querySelectorAll('input[name="platforms"]:checked'),
+      ).map((cb) => cb.value),
+
+      self_rated_da: formData.get("self_rated_da") || "not_at_risk",
+    };
+
+    try {
+      const response = await fetch("/api/assessment/predict/", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": formData.get("csrfmiddlewaretoken"),
+        },
+        body: JSON.stringify(data),
+      });
+
+      const result = await response.json();
+
+      if (response.ok) {
+        window.location.href = `/students/assessment_result/${result.id}/`;
+      } else {
+        alert("Error: " + JSON.stringify(result));
+      }
+    } catch (err) {
+      console.error("Fetch error:", err);
+      alert("An error occurred. Check console for details.");
+    }
+  });